@@ -243,6 +243,33 @@ class Account:
         from .mailbox import MailBox
         return MailBox(parent=self, main_resource=resource, name='MailBox')
 
+    def outbox(self, **kwargs):
+        """ Get a pipeline to send messages concurrently from many mailboxes
+        of this account
+
+        :param kwargs: extra args to be passed to the Outbox instance
+        :return: a new outbox bound to this account connection
+        :rtype: O365.outbox.Outbox
+        """
+        from .outbox import Outbox
+        return Outbox(self, **kwargs)
+
+    def fan_out(self, resources, function, *, restart: bool = False, **kwargs):
+        """ Runs a function concurrently over many mailboxes (eg. every user
+        of the tenant when using client credentials)
+
+        :param resources: the mailbox resources
+        :type resources: iterable[str]
+        :param function: called with (mailbox, checkpoint) for each mailbox
+        :param bool restart: process again the mailboxes completed by a
+         previous run
+        :param kwargs: extra args to be passed to the MailboxFanOut instance
+        :return: the results and errors of each mailbox
+        :rtype: O365.fanout.FanOutResult
+        """
+        from .fanout import MailboxFanOut
+        return MailboxFanOut(self, **kwargs).run(resources, function, restart=restart)
+
     def address_book(self, *, resource: Optional[str] = None, address_book: str = 'personal'):
         """ Get an instance to the specified address book for the
         specified account resource
@@ -1,7 +1,6 @@
 import datetime as dt
 import logging
 
-from dateutil.parser import parse
 from requests.exceptions import HTTPError
 
 from .category import Category
@@ -10,15 +9,19 @@ from .utils import (
     NEXT_LINK_KEYWORD,
     ApiComponent,
     AttachableMixin,
+    FieldTableMixin,
+    ModelField,
     Pagination,
     Recipients,
     TrackerSet,
+    parse_datetime,
+    raw_cloud_values,
 )
 
 log = logging.getLogger(__name__)
 
 
-class Contact(ApiComponent, AttachableMixin):
+class Contact(ApiComponent, AttachableMixin, FieldTableMixin):
     """ Contact manages lists of events on associated contact on Microsoft 365. """
 
     _endpoints = {
@@ -31,6 +34,37 @@ class Contact(ApiComponent, AttachableMixin):
 
     message_constructor = Message  #: :meta private:
 
+    _fields = (
+        ModelField('createdDateTime', '_Contact__created',
+                   parser=ModelField.datetime_parser, read_only=True),
+        ModelField('lastModifiedDateTime', '_Contact__modified',
+                   parser=ModelField.datetime_parser, read_only=True),
+        ModelField('displayName', '_Contact__display_name', default=''),
+        ModelField('fileAs', '_Contact__fileAs', default=''),
+        ModelField('givenName', '_Contact__name', default=''),
+        ModelField('surname', '_Contact__surname', default=''),
+        ModelField('title', '_Contact__title', default=''),
+        ModelField('jobTitle', '_Contact__job_title', default=''),
+        ModelField('companyName', '_Contact__company_name', default=''),
+        ModelField('department', '_Contact__department', default=''),
+        ModelField('officeLocation', '_Contact__office_location', default=''),
+        ModelField('businessPhones', '_Contact__business_phones',
+                   parser=ModelField.list_parser, default=list),
+        ModelField('mobilePhone', '_Contact__mobile_phone', default=''),
+        ModelField('homePhones', '_Contact__home_phones',
+                   parser=ModelField.list_parser, default=list),
+        ModelField('businessAddress', '_Contact__business_address', default=dict),
+        ModelField('homeAddress', '_Contact__home_address', default=dict),
+        ModelField('otherAddress', '_Contact__other_address', default=dict),
+        ModelField('preferredLanguage', '_Contact__preferred_language', read_only=True),
+        ModelField('categories', '_Contact__categories', default=list),
+        ModelField('parentFolderId', '_Contact__folder_id', read_only=True),
+        ModelField('personalNotes', '_Contact__personal_notes', default=''),
+    )
+    _state_fields = (
+        ModelField('id', 'object_id'),
+    )
+
     def __init__(self, *, parent=None, con=None, **kwargs):
         """ Create a contact API component
 
@@ -62,28 +96,7 @@ class Contact(ApiComponent, AttachableMixin):
 
         #: The contact's unique identifier. |br| **Type:** str
         self.object_id = cloud_data.get(cc('id'), None)
-        self.__created = cloud_data.get(cc('createdDateTime'), None)
-        self.__modified = cloud_data.get(cc('lastModifiedDateTime'), None)
-
-        local_tz = self.protocol.timezone
-        self.__created = parse(self.__created).astimezone(
-            local_tz) if self.__created else None
-        self.__modified = parse(self.__modified).astimezone(
-            local_tz) if self.__modified else None
-
-        self.__display_name = cloud_data.get(cc('displayName'), '')
-        self.__fileAs = cloud_data.get(cc('fileAs'), '')
-        self.__name = cloud_data.get(cc('givenName'), '')
-        self.__surname = cloud_data.get(cc('surname'), '')
-
-        self.__title = cloud_data.get(cc('title'), '')
-        self.__job_title = cloud_data.get(cc('jobTitle'), '')
-        self.__company_name = cloud_data.get(cc('companyName'), '')
-        self.__department = cloud_data.get(cc('department'), '')
-        self.__office_location = cloud_data.get(cc('officeLocation'), '')
-        self.__business_phones = cloud_data.get(cc('businessPhones'), []) or []
-        self.__mobile_phone = cloud_data.get(cc('mobilePhone'), '')
-        self.__home_phones = cloud_data.get(cc('homePhones'), []) or []
+        self._load_fields(cloud_data)
 
         emails = cloud_data.get(cc('emailAddresses'), [])
         self.__emails = Recipients(
@@ -95,16 +108,6 @@ class Contact(ApiComponent, AttachableMixin):
         if email and email not in self.__emails:
             # a Contact from OneDrive?
             self.__emails.add(email)
-        self.__business_address = cloud_data.get(cc('businessAddress'), {})
-        self.__home_address = cloud_data.get(cc('homeAddress'), {})
-        self.__other_address = cloud_data.get(cc('otherAddress'), {})
-        self.__preferred_language = cloud_data.get(cc('preferredLanguage'),
-                                                   None)
-
-        self.__categories = cloud_data.get(cc('categories'), [])
-        self.__folder_id = cloud_data.get(cc('parentFolderId'), None)
-
-        self.__personal_notes = cloud_data.get(cc('personalNotes'), '')
 
         # When using Users endpoints (GAL)
         # Missing keys: ['mail', 'userPrincipalName']
@@ -475,28 +478,10 @@ class Contact(ApiComponent, AttachableMixin):
         """
         cc = self._cc  # alias
 
-        data = {
-            cc('displayName'): self.__display_name,
-            cc('fileAs'): self.__fileAs,
-            cc('givenName'): self.__name,
-            cc('surname'): self.__surname,
-            cc('title'): self.__title,
-            cc('jobTitle'): self.__job_title,
-            cc('companyName'): self.__company_name,
-            cc('department'): self.__department,
-            cc('officeLocation'): self.__office_location,
-            cc('businessPhones'): self.__business_phones,
-            cc('mobilePhone'): self.__mobile_phone,
-            cc('homePhones'): self.__home_phones,
-            cc('emailAddresses'): [{self._cc('name'): recipient.name or '',
-                                    self._cc('address'): recipient.address}
-                                   for recipient in self.emails],
-            cc('businessAddress'): self.__business_address,
-            cc('homeAddress'): self.__home_address,
-            cc('otherAddress'): self.__other_address,
-            cc('categories'): self.__categories,
-            cc('personalNotes'): self.__personal_notes,
-        }
+        data = self._dump_fields()
+        data[cc('emailAddresses')] = [{cc('name'): recipient.name or '',
+                                       cc('address'): recipient.address}
+                                      for recipient in self.emails]
 
         if restrict_keys:
             restrict_keys.add(cc(
@@ -564,9 +549,9 @@ class Contact(ApiComponent, AttachableMixin):
                                           None)
 
             local_tz = self.protocol.timezone
-            self.__created = parse(self.created).astimezone(
+            self.__created = parse_datetime(self.created).astimezone(
                 local_tz) if self.__created else None
-            self.__modified = parse(self.modified).astimezone(
+            self.__modified = parse_datetime(self.modified).astimezone(
                 local_tz) if self.__modified else None
         else:
             self.__modified = dt.datetime.now().replace(tzinfo=self.protocol.timezone)
@@ -695,7 +680,7 @@ class BaseContactFolder(ApiComponent):
     def __eq__(self, other):
         return self.folder_id == other.folder_id
 
-    def get_contacts(self, limit=100, *, query=None, order_by=None, batch=None):
+    def get_contacts(self, limit=100, *, query=None, order_by=None, batch=None, raw=False):
         """ Gets a list of contacts from this address book
 
         To use query an order_by check the OData specification here:
@@ -711,8 +696,11 @@ class BaseContactFolder(ApiComponent):
         :type order_by: Query or str
         :param int batch: batch size, retrieves items in
          batches allowing to retrieve more items than the limit.
+        :param raw: return the cloud dicts instead of Contact objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
         :return: list of contacts
-        :rtype: list[Contact] or Pagination
+        :rtype: list[Contact] or list[dict] or Pagination
         """
 
         if self.root:
@@ -742,17 +730,20 @@ class BaseContactFolder(ApiComponent):
 
         data = response.json()
 
-        # Everything received from cloud must be passed as self._cloud_data_key
-        contacts = (self.contact_constructor(parent=self,
-                                             **{self._cloud_data_key: contact})
-                    for contact in data.get('value', []))
+        if raw:
+            contacts = raw_cloud_values(data.get('value', []), raw)
+        else:
+            # Everything received from cloud must be passed as self._cloud_data_key
+            contacts = (self.contact_constructor(parent=self,
+                                                 **{self._cloud_data_key: contact})
+                        for contact in data.get('value', []))
 
         next_link = data.get(NEXT_LINK_KEYWORD, None)
 
         if batch and next_link:
             return Pagination(parent=self, data=contacts,
                               constructor=self.contact_constructor,
-                              next_link=next_link, limit=limit)
+                              next_link=next_link, limit=limit, raw=raw)
         else:
             return contacts
 
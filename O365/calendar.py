@@ -5,7 +5,6 @@ from zoneinfo import ZoneInfo
 
 # noinspection PyPep8Naming
 from bs4 import BeautifulSoup as bs
-from dateutil.parser import parse
 
 from .category import Category
 from .utils import (
@@ -15,10 +14,16 @@ from .utils import (
     BaseAttachment,
     BaseAttachments,
     CaseEnum,
+    FieldTableMixin,
     HandleRecipientsMixin,
     ImportanceLevel,
+    LazyDecodeMixin,
+    LearnedProjection,
+    ModelField,
     Pagination,
     TrackerSet,
+    parse_datetime,
+    raw_cloud_values,
 )
 from .utils.windows_tz import get_windows_tz
 
@@ -93,6 +98,7 @@ class EventAttachments(BaseAttachments):
     _endpoints = {
         'attachments': '/events/{id}/attachments',
         'attachment': '/events/{id}/attachments/{ida}',
+        'get_mime': '/events/{id}/attachments/{ida}/$value',
         'create_upload_session': '/events/{id}/attachments/createUploadSession'
     }
 
@@ -151,9 +157,9 @@ class EventRecurrence(ApiComponent):
         # Sending a startDate datetime to the server results in an Error:
         # Cannot convert the literal 'datetime' to the expected type 'Edm.Date'
         if recurrence_range:
-            self.__start_date = parse(
+            self.__start_date = parse_datetime(
                 self.__start_date).date() if self.__start_date else None
-            self.__end_date = parse(
+            self.__end_date = parse_datetime(
                 self.__end_date).date() if self.__end_date else None
 
     def __repr__(self):
@@ -573,7 +579,7 @@ class ResponseStatus(ApiComponent):
                 self.response_time = None
             if self.response_time:
                 try:
-                    self.response_time = parse(self.response_time).astimezone(self.protocol.timezone)
+                    self.response_time = parse_datetime(self.response_time).astimezone(self.protocol.timezone)
                 except OverflowError:
                     log.debug(f"Couldn't parse event response time: {self.response_time}")
                     self.response_time = None
@@ -583,6 +589,16 @@ class ResponseStatus(ApiComponent):
     def __repr__(self):
         return self.status or 'None'
 
+    def to_api_data(self):
+        """ Returns a dict in cloud format
+
+        :rtype: dict
+        """
+        return {
+            self._cc('response'): self._cc(self.status.value) if self.status else 'none',
+            self._cc('time'): self.response_time.isoformat() if self.response_time else None,
+        }
+
     def __str__(self):
         return self.__repr__()
 
@@ -590,6 +606,9 @@ class ResponseStatus(ApiComponent):
 class Attendee:
     """ A Event attendee """
 
+    __slots__ = ('_untrack', '_address', '_name', '_event',
+                 '__response_status', '__attendee_type')
+
     def __init__(self, address, *, name=None, attendee_type=None,
                  response_status=None, event=None):
         """ Create a event attendee
@@ -832,7 +851,8 @@ class Attendees(ApiComponent):
 
 
 # noinspection PyAttributeOutsideInit
-class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
+class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin, LazyDecodeMixin,
+            FieldTableMixin):
     """ A Calendar event """
 
     _endpoints = {
@@ -842,6 +862,101 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         'event_calendar': '/calendars/{id}/events',
         'occurrences': '/events/{id}/instances',
     }
+    _lazy_fields = {
+        '_Event__created': lambda self, data: self._datetime_from_cloud(data, 'createdDateTime'),
+        '_Event__modified': lambda self, data: self._datetime_from_cloud(data, 'lastModifiedDateTime'),
+        '_Event__start': lambda self, data: self._parse_date_time_time_zone(
+            data.get(self._cc('start'), {}), data.get(self._cc('isAllDay'), False)),
+        '_Event__end': lambda self, data: self._parse_date_time_time_zone(
+            data.get(self._cc('end'), {}), data.get(self._cc('isAllDay'), False)),
+        '_Event__attendees': lambda self, data: Attendees(event=self, attendees={
+            self._cloud_data_key: data.get(self._cc('attendees'), [])}),
+        '_Event__organizer': lambda self, data: self._recipient_from_cloud(
+            data.get(self._cc('organizer'), None), field=self._cc('organizer')),
+        '_Event__recurrence': lambda self, data: EventRecurrence(
+            event=self, recurrence=data.get(self._cc('recurrence'), None)),
+        '_Event__response_status': lambda self, data: ResponseStatus(
+            parent=self, response_status=data.get(self._cc('responseStatus'), {})),
+    }  #: :meta private:
+    _select_map = {
+        'object_id': ('id',),
+        'created': ('createdDateTime',),
+        'modified': ('lastModifiedDateTime',),
+        'start': ('start', 'isAllDay'),
+        'end': ('end', 'isAllDay'),
+        'remind_before_minutes': ('reminderMinutesBeforeStart',),
+        'event_type': ('type',),
+        'attachments': ('hasAttachments',),
+        'no_forwarding': (),
+        'subject': ('subject',),
+        'body': ('body',),
+        'body_type': ('body',),
+        'attendees': ('attendees',),
+        'recurrence': ('recurrence',),
+        'get_body_text': ('body',),
+        'get_body_soup': ('body',),
+    }  #: :meta private:
+    _fields = (
+        ModelField('transactionId', '_Event__transaction_id'),
+        ModelField('categories', '_Event__categories', default=list),
+        ModelField('isAllDay', '_Event__is_all_day', default=False),
+        ModelField('hasAttachments', 'has_attachments', default=False),
+        ModelField('iCalUId', 'ical_uid'),
+        ModelField('importance', '_Event__importance',
+                   parser=ModelField.enum_parser(ImportanceLevel, 'normal'),
+                   default=ImportanceLevel.Normal),
+        ModelField('isCancelled', 'is_cancelled', default=False),
+        ModelField('isOrganizer', 'is_organizer', default=True),
+        ModelField('location', '_Event__location', default=dict),
+        ModelField('locations', 'locations', default=list),  # TODO
+        ModelField('onlineMeetingUrl', 'online_meeting_url'),
+        ModelField('isOnlineMeeting', '_Event__is_online_meeting', default=False),
+        ModelField('onlineMeetingProvider', '_Event__online_meeting_provider',
+                   parser=ModelField.enum_parser(OnlineMeetingProviderType),
+                   default=OnlineMeetingProviderType.TeamsForBusiness),
+        ModelField('onlineMeeting', 'online_meeting'),
+        ModelField('isReminderOn', '_Event__is_reminder_on', default=True),
+        ModelField('reminderMinutesBeforeStart', '_Event__remind_before_minutes', default=15),
+        ModelField('responseRequested', '_Event__response_requested', default=True),
+        ModelField('sensitivity', '_Event__sensitivity',
+                   parser=ModelField.enum_parser(EventSensitivity),
+                   default=EventSensitivity.Normal),
+        ModelField('seriesMasterId', 'series_master_id'),
+        ModelField('showAs', '_Event__show_as', parser=ModelField.enum_parser(EventShowAs),
+                   default=EventShowAs.Busy),
+        ModelField('type', '_Event__event_type', parser=ModelField.enum_parser(EventType),
+                   default=EventType.SingleInstance),
+        ModelField('webLink', 'web_link'),
+    )  #: :meta private:
+    _state_fields = (
+        ModelField('id', 'object_id'),
+        ModelField('createdDateTime', '_Event__created'),
+        ModelField('lastModifiedDateTime', '_Event__modified'),
+        ModelField('organizer', '_Event__organizer',
+                   serializer=lambda value, event: event._recipient_to_cloud(value)),
+        ModelField('responseStatus', '_Event__response_status'),
+    )  #: :meta private:
+
+    #: Set to true if the event has attachments.  |br| **Type:** bool
+    has_attachments = False
+    #: A unique identifier for an event across calendars. This ID is different for each occurrence in a recurring series.  |br| **Type:** str
+    ical_uid = None
+    #: Set to true if the event has been cancelled.  |br| **Type:** bool
+    is_cancelled = False
+    #: Set to true if the calendar owner (specified by the owner property of the calendar) is the organizer of the event
+    #: (specified by the organizer property of the event). It also applies if a delegate organized the event on behalf of the owner.
+    #: |br| **Type:** bool
+    is_organizer = True
+    #: The locations where the event is held or attended from.  |br| **Type:** list
+    locations = None
+    #: A URL for an online meeting.  |br| **Type:** str
+    online_meeting_url = None
+    #: Details for an attendee to join the meeting online. The default is null. |br| **Type:** OnlineMeetingInfo
+    online_meeting = None
+    #: The ID for the recurring series master item, if this event is part of a recurring series. |br| **Type:** str
+    series_master_id = None
+    #: The URL to open the event in Outlook on the web. |br| **Type:** str
+    web_link = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """ Create a calendar event representation
@@ -858,6 +973,9 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         :param bool download_attachments: whether or not to download attachments
          (kwargs)
         :param str subject: subject of the event (kwargs)
+        :param bool lazy: keep the raw cloud data and decode dates, attendees,
+         organizer, recurrence and response status the first time
+         they are accessed (kwargs)
         """
         if parent and con:
             raise ValueError('Need a parent or a connection but not both')
@@ -881,7 +999,7 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
 
         #: Unique identifier for the event.  |br| **Type:** str
         self.object_id = cloud_data.get(cc('id'), None)
-        self.__transaction_id = cloud_data.get(cc("transactionId"), None)
+        self._load_fields(cloud_data)
         self.__subject = cloud_data.get(cc('subject'),
                                         kwargs.get('subject', '') or '')
         body = (
@@ -892,84 +1010,25 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         self.body_type = body.get(cc('contentType'),
                                   'HTML')  # default to HTML for new messages
 
-        self.__attendees = Attendees(event=self, attendees={
-            self._cloud_data_key: cloud_data.get(cc('attendees'), [])})
-        self.__categories = cloud_data.get(cc('categories'), [])
-
-        self.__created = cloud_data.get(cc('createdDateTime'), None)
-        self.__modified = cloud_data.get(cc('lastModifiedDateTime'), None)
-
-        local_tz = self.protocol.timezone
-        self.__created = parse(self.__created).astimezone(
-            local_tz) if self.__created else None
-        self.__modified = parse(self.__modified).astimezone(
-            local_tz) if self.__modified else None
-
-        self.__is_all_day = cloud_data.get(cc('isAllDay'), False)
-
-        start_obj = cloud_data.get(cc('start'), {})
-        self.__start = self._parse_date_time_time_zone(start_obj, self.__is_all_day)
-
-        end_obj = cloud_data.get(cc('end'), {})
-        self.__end = self._parse_date_time_time_zone(end_obj, self.__is_all_day)
-
-        #: Set to true if the event has attachments.  |br| **Type:** bool
-        self.has_attachments = cloud_data.get(cc('hasAttachments'), False)
         self.__attachments = EventAttachments(parent=self, attachments=[])
         if self.has_attachments and download_attachments:
             self.attachments.download_attachments()
-        self.__categories = cloud_data.get(cc('categories'), [])
-        #: A unique identifier for an event across calendars. This ID is different for each occurrence in a recurring series.  |br| **Type:** str
-        self.ical_uid = cloud_data.get(cc('iCalUId'), None)
-        self.__importance = ImportanceLevel.from_value(
-            cloud_data.get(cc('importance'), 'normal') or 'normal')
-        #: Set to true if the event has been cancelled.  |br| **Type:** bool
-        self.is_cancelled = cloud_data.get(cc('isCancelled'), False)
-        #: Set to true if the calendar owner (specified by the owner property of the calendar) is the organizer of the event
-        #: (specified by the organizer property of the event). It also applies if a delegate organized the event on behalf of the owner.
-        #: |br| **Type:** bool
-        self.is_organizer = cloud_data.get(cc('isOrganizer'), True)
-        self.__location = cloud_data.get(cc('location'), {})
-        #: The locations where the event is held or attended from.  |br| **Type:** list
-        self.locations = cloud_data.get(cc('locations'), [])  # TODO
-
-        #: A URL for an online meeting.  |br| **Type:** str
-        self.online_meeting_url = cloud_data.get(cc('onlineMeetingUrl'), None)
-        self.__is_online_meeting = cloud_data.get(cc('isOnlineMeeting'), False)
-        self.__online_meeting_provider = OnlineMeetingProviderType.from_value(
-            cloud_data.get(cc('onlineMeetingProvider'), 'teamsForBusiness'))
-        #: Details for an attendee to join the meeting online. The default is null. |br| **Type:** OnlineMeetingInfo
-        self.online_meeting = cloud_data.get(cc('onlineMeeting'), None)
         if not self.online_meeting_url and self.is_online_meeting:
             self.online_meeting_url = self.online_meeting.get(cc('joinUrl'), None) \
                 if self.online_meeting else None
-
-        self.__organizer = self._recipient_from_cloud(
-            cloud_data.get(cc('organizer'), None), field=cc('organizer'))
-        self.__recurrence = EventRecurrence(event=self,
-                                            recurrence=cloud_data.get(
-                                                cc('recurrence'), None))
-        self.__is_reminder_on = cloud_data.get(cc('isReminderOn'), True)
-        self.__remind_before_minutes = cloud_data.get(
-            cc('reminderMinutesBeforeStart'), 15)
-        self.__response_requested = cloud_data.get(cc('responseRequested'),
-                                                   True)
-        self.__response_status = ResponseStatus(parent=self,
-                                                response_status=cloud_data.get(
-                                                    cc('responseStatus'), {}))
-        self.__sensitivity = EventSensitivity.from_value(
-            cloud_data.get(cc('sensitivity'), 'normal'))
-        #: The ID for the recurring series master item, if this event is part of a recurring series. |br| **Type:** str
-        self.series_master_id = cloud_data.get(cc('seriesMasterId'), None)
-        self.__show_as = EventShowAs.from_value(cloud_data.get(cc('showAs'), 'busy'))
-        self.__event_type = EventType.from_value(cloud_data.get(cc('type'), 'singleInstance'))
         self.__no_forwarding = False
-        #: The URL to open the event in Outlook on the web. |br| **Type:** str
-        self.web_link = cloud_data.get(cc('webLink'), None)
+
+        # dates, attendees, recurrence, etc. are decoded now or on first access
+        self._init_lazy_fields(cloud_data, lazy=kwargs.get('lazy', False))
 
     def __str__(self):
         return self.__repr__()
 
+    def _datetime_from_cloud(self, cloud_data, key):
+        """ Parses a cloud datetime into the protocol timezone """
+        value = cloud_data.get(self._cc(key), None)
+        return parse_datetime(value).astimezone(self.protocol.timezone) if value else None
+
     def __repr__(self):
         if self.start.date() == self.end.date():
             return 'Subject: {} (on: {} from: {} to: {})'.format(self.subject, self.start.date(), self.start.time(),
@@ -1495,6 +1554,8 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         if self.object_id is None:
             raise RuntimeError('Attempting to delete an unsaved event')
 
+        self._identity_invalidate('message_event')
+
         url = self.build_url(self._endpoints.get('event').format(id=self.object_id))
 
         response = self.con.delete(url)
@@ -1513,6 +1574,7 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
             # update event
             if not self._track_changes:
                 return True  # there's nothing to update
+            self._identity_invalidate('message_event')
             url = self.build_url(self._endpoints.get('event').format(id=self.object_id))
             method = self.con.patch
             data = self.to_api_data(restrict_keys=self._track_changes)
@@ -1540,9 +1602,9 @@ class Event(ApiComponent, AttachableMixin, HandleRecipientsMixin):
             self.__created = event.get(self._cc('createdDateTime'), None)
             self.__modified = event.get(self._cc('lastModifiedDateTime'), None)
 
-            self.__created = parse(self.__created).astimezone(
+            self.__created = parse_datetime(self.__created).astimezone(
                 self.protocol.timezone) if self.__created else None
-            self.__modified = parse(self.__modified).astimezone(
+            self.__modified = parse_datetime(self.__modified).astimezone(
                 self.protocol.timezone) if self.__modified else None
 
             self.ical_uid = event.get(self._cc('iCalUId'), None)
@@ -1782,7 +1844,8 @@ class Calendar(ApiComponent, HandleRecipientsMixin):
 
     def get_events(self, limit: int = 25, *, query=None, order_by=None, batch=None,
                    download_attachments=False, include_recurring=True,
-                   start_recurring=None, end_recurring=None):
+                   start_recurring=None, end_recurring=None, lazy=False, raw=False,
+                   fields=None):
         """ Get events from this Calendar
 
         :param int limit: max no. of events to get. Over 999 uses batch.
@@ -1796,8 +1859,15 @@ class Calendar(ApiComponent, HandleRecipientsMixin):
         :param bool include_recurring: whether to include recurring events or not
         :param start_recurring: a string datetime or a Query object with just a start condition
         :param end_recurring: a string datetime or a Query object with just an end condition
+        :param bool lazy: decode the expensive event fields on first access
+        :param raw: return the cloud dicts instead of Event objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
+        :param fields: only request the cloud data needed by these properties
+         (ie. ['subject', 'start', 'end']) or a LearnedProjection
+        :type fields: list[str] or LearnedProjection
         :return: list of events in this calendar
-        :rtype: list[Event] or Pagination
+        :rtype: list[Event] or list[dict] or Pagination
         """
 
         if self.calendar_id is None:
@@ -1861,6 +1931,8 @@ class Calendar(ApiComponent, HandleRecipientsMixin):
             else:
                 params.update(query.as_params())
 
+        self._apply_fields(params, self.event_constructor, fields)
+
         response = self.con.get(url, params=params)
 
         if not response:
@@ -1868,17 +1940,24 @@ class Calendar(ApiComponent, HandleRecipientsMixin):
 
         data = response.json()
 
-        # Everything received from cloud must be passed as self._cloud_data_key
-        events = (self.event_constructor(parent=self,
-                                         download_attachments=
-                                         download_attachments,
-                                         **{self._cloud_data_key: event})
-                  for event in data.get('value', []))
+        if raw:
+            events = raw_cloud_values(data.get('value', []), raw)
+        else:
+            # Everything received from cloud must be passed as self._cloud_data_key
+            events = (self.event_constructor(parent=self,
+                                             download_attachments=
+                                             download_attachments,
+                                             lazy=lazy,
+                                             **{self._cloud_data_key: event})
+                      for event in data.get('value', []))
+            if isinstance(fields, LearnedProjection):
+                events = fields.watch(events)
         next_link = data.get(NEXT_LINK_KEYWORD, None)
         if batch and next_link:
             return Pagination(parent=self, data=events,
                               constructor=self.event_constructor,
-                              next_link=next_link, limit=limit)
+                              next_link=next_link, limit=limit, lazy=lazy,
+                              raw=raw)
         else:
             return events
 
@@ -2118,6 +2197,8 @@ class Schedule(ApiComponent):
         include_recurring=True,
         start_recurring=None,
         end_recurring=None,
+        lazy=False,
+        raw=False,
     ):
         """Get events from the default Calendar
 
@@ -2132,8 +2213,12 @@ class Schedule(ApiComponent):
         :param bool include_recurring: whether to include recurring events or not
         :param start_recurring: a string datetime or a Query object with just a start condition
         :param end_recurring: a string datetime or a Query object with just an end condition
+        :param bool lazy: decode the expensive event fields on first access
+        :param raw: return the cloud dicts instead of Event objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
         :return: list of items in this folder
-        :rtype: list[Event] or Pagination
+        :rtype: list[Event] or list[dict] or Pagination
         """
 
         default_calendar = self.calendar_constructor(parent=self)
@@ -2147,6 +2232,8 @@ class Schedule(ApiComponent):
             include_recurring=include_recurring,
             start_recurring=start_recurring,
             end_recurring=end_recurring,
+            lazy=lazy,
+            raw=raw,
         )
 
     def new_event(self, subject=None):
@@ -26,6 +26,7 @@ from .utils import (
     ME_RESOURCE,
     BaseTokenBackend,
     FileSystemTokenBackend,
+    IdentityMap,
     get_windows_tz,
     to_camel_case,
     to_pascal_case,
@@ -386,6 +387,7 @@ class Connection:
         verify_ssl: bool = True,
         default_headers: dict = None,
         store_token_after_refresh: bool = True,
+        identity_map: Union[bool, IdentityMap, None] = None,
         **kwargs,
     ):
         """Creates an API connection object
@@ -429,6 +431,9 @@ class Connection:
         :param JSONEncoder json_encoder: The JSONEncoder to use during the JSON serialization on the request.
         :param bool verify_ssl: set the verify flag on the requests library
         :param bool store_token_after_refresh: if after a token refresh the token backend should call save_token
+        :param identity_map: cache the objects looked up by id (parent folders, drives,
+         plans...). True creates a default IdentityMap
+        :type identity_map: bool or IdentityMap
         :param dict kwargs: any extra params passed to Connection
         :raises ValueError: if credentials is not tuple of (client_id, client_secret)
 
@@ -510,6 +515,11 @@ class Connection:
         self.verify_ssl: bool = verify_ssl
         #: JSONEncoder to use. |br| **Type:** json.JSONEncoder
         self.json_encoder: Optional[json.JSONEncoder] = json_encoder
+        #: Cache of objects looked up by id. |br| **Type:** IdentityMap
+        self.identity_map: Optional[IdentityMap] = (
+            IdentityMap() if identity_map is True
+            else identity_map if isinstance(identity_map, IdentityMap) else None
+        )
 
         #: the naive session. |br| **Type:** Session
         self.naive_session: Optional[Session] = (
@@ -0,0 +1,282 @@
+import base64
+import datetime as dt
+import logging
+import threading
+import uuid
+
+from .utils import RemovedItem
+
+log = logging.getLogger(__name__)
+
+HEADER_SIZE = 22  # reserved byte, 5 bytes of FILETIME and a 16 bytes GUID
+CHILD_BLOCK_SIZE = 5
+FILETIME_EPOCH = dt.datetime(1601, 1, 1, tzinfo=dt.timezone.utc)
+
+
+class ConversationIndex:
+    """ A parsed conversationIndex of a message.
+
+    The header identifies the conversation and holds the time it started
+    and each reply adds a 5 bytes child block, so the raw bytes sort in
+    thread order and a message's parent index is its own minus the last
+    block.
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, value):
+        """
+        :param value: the conversationIndex as returned by the api (base64)
+         or its raw bytes
+        :type value: str or bytes
+        """
+        raw = base64.b64decode(value) if isinstance(value, str) else bytes(value)
+        if len(raw) < HEADER_SIZE or (len(raw) - HEADER_SIZE) % CHILD_BLOCK_SIZE:
+            raise ValueError('Invalid conversation index')
+        #: The raw bytes. |br| **Type:** bytes
+        self.raw = raw
+
+    def __repr__(self):
+        return 'ConversationIndex: depth {} of {}'.format(self.depth, self.guid)
+
+    def __eq__(self, other):
+        return isinstance(other, ConversationIndex) and self.raw == other.raw
+
+    def __lt__(self, other):
+        return self.raw < other.raw
+
+    def __hash__(self):
+        return hash(self.raw)
+
+    @property
+    def depth(self):
+        """ Number of replies from the conversation root (0 for the root)
+
+        :rtype: int
+        """
+        return (len(self.raw) - HEADER_SIZE) // CHILD_BLOCK_SIZE
+
+    @property
+    def guid(self):
+        """ The conversation GUID
+
+        :rtype: uuid.UUID
+        """
+        return uuid.UUID(bytes=self.raw[6:HEADER_SIZE])
+
+    @property
+    def started(self):
+        """ When the conversation started
+
+        :rtype: datetime
+        """
+        # the header stores the 5 high order bytes of a FILETIME
+        filetime = int.from_bytes(self.raw[1:6], 'big') << 24
+        return FILETIME_EPOCH + dt.timedelta(microseconds=filetime // 10)
+
+    @property
+    def parent(self):
+        """ The index of the message this one replies to (None for the root)
+
+        :rtype: ConversationIndex
+        """
+        if not self.depth:
+            return None
+        return ConversationIndex(self.raw[:-CHILD_BLOCK_SIZE])
+
+
+class MessageRef:
+    """ The data kept by the ThreadIndex about a message """
+
+    __slots__ = ('object_id', 'conversation_id', 'index', 'received', 'subject', 'sender')
+
+    def __init__(self, object_id, conversation_id, index=None, received=None,
+                 subject=None, sender=None):
+        #: The message id. |br| **Type:** str
+        self.object_id = object_id
+        #: The conversation id. |br| **Type:** str
+        self.conversation_id = conversation_id
+        #: The position in the thread. |br| **Type:** ConversationIndex
+        self.index = index
+        #: When the message was received. |br| **Type:** datetime
+        self.received = received
+        #: The message subject. |br| **Type:** str
+        self.subject = subject
+        #: The sender address. |br| **Type:** str
+        self.sender = sender
+
+    def __repr__(self):
+        return 'MessageRef: {} ({})'.format(self.subject, self.object_id)
+
+    @property
+    def depth(self):
+        """ Number of replies from the conversation root
+
+        :rtype: int
+        """
+        return self.index.depth if self.index is not None else 0
+
+    def sort_key(self):
+        """ Thread order: by conversation index, then by received date """
+        return (self.index.raw if self.index is not None else b'\xff',
+                self.received or dt.datetime.max.replace(tzinfo=dt.timezone.utc))
+
+    @classmethod
+    def from_message(cls, message):
+        """ Builds a ref from a Message
+
+        :param Message message: the message
+        :rtype: MessageRef
+        """
+        index = None
+        if message.conversation_index:
+            try:
+                index = ConversationIndex(message.conversation_index)
+            except ValueError:
+                log.debug('Invalid conversation index on message {}'.format(message.object_id))
+        return cls(message.object_id, message.conversation_id, index=index,
+                   received=message.received, subject=message.subject,
+                   sender=message.sender.address if message.sender else None)
+
+
+class ThreadIndex:
+    """ A local index of conversations (threads) fed from message listings
+    or delta results. Answers which messages make the thread of a message
+    without querying the api, and only fetches the members it's missing.
+    """
+
+    #: The message properties requested when fetching missing members
+    fetch_fields = ('conversation_id', 'conversation_index', 'received', 'subject', 'sender')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = {}
+        self._conversations = {}
+        # gaps still missing after fetching the conversation: not in the mailbox
+        self._unresolvable = {}
+
+    def __repr__(self):
+        return 'ThreadIndex: {} messages in {} conversations'.format(
+            len(self._messages), len(self._conversations))
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __contains__(self, object_id):
+        return object_id in self._messages
+
+    def _remove(self, object_id):
+        ref = self._messages.pop(object_id, None)
+        if ref is not None:
+            conversation = self._conversations.get(ref.conversation_id)
+            if conversation is not None:
+                conversation.pop(object_id, None)
+                if not conversation:
+                    del self._conversations[ref.conversation_id]
+                    self._unresolvable.pop(ref.conversation_id, None)
+
+    def add(self, messages):
+        """ Adds or updates messages. RemovedItems (from delta results)
+        remove the message from the index.
+
+        :param messages: Messages from a listing or delta sync
+        :type messages: iterable[Message or RemovedItem]
+        :return: number of messages added, updated or removed
+        :rtype: int
+        """
+        count = 0
+        with self._lock:
+            for message in messages:
+                count += 1
+                self._remove(message.object_id)
+                if isinstance(message, RemovedItem) or not message.conversation_id:
+                    continue
+                ref = MessageRef.from_message(message)
+                self._messages[ref.object_id] = ref
+                self._conversations.setdefault(ref.conversation_id, {})[ref.object_id] = ref
+        return count
+
+    def remove(self, object_id):
+        """ Removes a message from the index
+
+        :param str object_id: the message id
+        """
+        with self._lock:
+            self._remove(object_id)
+
+    def get_conversation(self, conversation_id):
+        """ Returns the indexed messages of a conversation in thread order
+
+        :param str conversation_id: the conversation id
+        :rtype: list[MessageRef]
+        """
+        with self._lock:
+            refs = list(self._conversations.get(conversation_id, {}).values())
+        return sorted(refs, key=MessageRef.sort_key)
+
+    def missing_members(self, conversation_id):
+        """ Returns the indexes of the replied messages that are not in the
+        index (gaps in the thread)
+
+        :param str conversation_id: the conversation id
+        :rtype: list[ConversationIndex]
+        """
+        refs = self.get_conversation(conversation_id)
+        known = {ref.index for ref in refs if ref.index is not None}
+        missing = set()
+        for index in known:
+            parent = index.parent
+            while parent is not None and parent not in known:
+                missing.add(parent)
+                parent = parent.parent
+        return sorted(missing)
+
+    def get_thread(self, message, *, mailbox=None, fetch_missing=True):
+        """ Returns the thread of a message in thread order.
+
+        :param message: the message or its id (must be indexed when an id)
+        :type message: Message or str
+        :param MailBox mailbox: the mailbox used to fetch missing members
+        :param bool fetch_missing: when the thread has gaps (a message replies
+         to one not indexed) fetch the conversation members from the mailbox
+        :rtype: list[MessageRef]
+        """
+        if isinstance(message, str):
+            ref = self._messages.get(message)
+            if ref is None:
+                raise ValueError('Message {} is not indexed'.format(message))
+            conversation_id = ref.conversation_id
+        else:
+            conversation_id = message.conversation_id
+            if message.object_id not in self._messages:
+                self.add([message])
+
+        if fetch_missing and mailbox is not None:
+            with self._lock:
+                unresolvable = self._unresolvable.get(conversation_id, ())
+            if set(self.missing_members(conversation_id)).difference(unresolvable):
+                self.fetch_conversation(mailbox, conversation_id)
+        return self.get_conversation(conversation_id)
+
+    def fetch_conversation(self, mailbox, conversation_id):
+        """ Fetches the members of a conversation not yet indexed. The gaps
+        that remain are not fetched again by :meth:`get_thread`
+
+        :param MailBox mailbox: the mailbox (or folder) to query
+        :param str conversation_id: the conversation id
+        :return: number of messages added
+        :rtype: int
+        """
+        query = "{} eq '{}'".format(mailbox._cc('conversationId'),
+                                    conversation_id.replace("'", "''"))
+        messages = mailbox.get_messages(limit=None, query=query, fields=list(self.fetch_fields))
+        # the listing pages are requested here, not while holding the lock
+        messages = [message for message in messages if message.object_id not in self]
+        count = self.add(messages)
+        missing = set(self.missing_members(conversation_id))
+        with self._lock:
+            if missing:
+                self._unresolvable[conversation_id] = missing
+            else:
+                self._unresolvable.pop(conversation_id, None)
+        return count
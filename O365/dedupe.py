@@ -0,0 +1,201 @@
+import datetime as dt
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from .utils import parse_datetime
+
+log = logging.getLogger(__name__)
+
+DIGEST_SIZE = 16  # bytes kept per message
+
+
+class DedupeIndex:
+    """ A persistent set of the messages already seen, used to skip
+    duplicated mail (journaling, shared mailboxes, several copies of the
+    same message in different folders or mailboxes).
+
+    Messages are identified by a 16 bytes digest of their
+    internetMessageId (or of their sender, sent date, subject and body
+    preview when they don't have one) stored in a SQLite table, so the
+    index stays compact on disk and can be shared by several processes.
+
+    .. code-block:: python
+
+        dedupe = DedupeIndex('seen.db')
+        for mailbox in mailboxes:
+            for message in dedupe.new_messages(mailbox.inbox_folder(), fetch=True):
+                process(message)
+    """
+
+    #: The message properties requested to compute the keys
+    fields = ('internet_message_id', 'sender', 'sent', 'subject', 'body_preview')
+
+    def __init__(self, database='o365_dedupe.db'):
+        """
+        :param str database: the SQLite database path. Use ':memory:' for a
+         temporary index
+        """
+        #: The SQLite database path. |br| **Type:** str
+        self.database = str(database)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.database, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+
+    def __repr__(self):
+        return 'DedupeIndex: {}'.format(self.database)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def __contains__(self, message):
+        return self.seen(message)
+
+    def close(self):
+        """ Closes the database connection """
+        self._connection.close()
+
+    @staticmethod
+    def _value(data, key):
+        # cloud dicts use the protocol casing
+        value = data.get(key)
+        if value is None:
+            value = data.get(key[0].upper() + key[1:])
+        return value
+
+    @classmethod
+    def key_of(cls, message):
+        """ Returns the digest identifying a message
+
+        :param message: the message or its cloud data
+        :type message: Message or dict
+        :rtype: bytes
+        """
+        if isinstance(message, dict):
+            data = message
+        else:
+            cc = message._cc
+            data = message._dump_state(keys={cc('internetMessageId'), cc('from'),
+                                             cc('sentDateTime'), cc('subject'), cc('bodyPreview')})
+        message_id = cls._value(data, 'internetMessageId')
+        if message_id:
+            parts = [message_id.strip()]
+        else:
+            sender = cls._value(data, 'from') or {}
+            sender = cls._value(sender, 'emailAddress') or {}
+            sent = cls._value(data, 'sentDateTime')
+            # the same instant is written differently by the api and the models
+            sent = parse_datetime(sent).astimezone(dt.timezone.utc).isoformat() if sent else ''
+            parts = ['', (cls._value(sender, 'address') or '').lower(), sent,
+                     cls._value(data, 'subject') or '',
+                     cls._value(data, 'bodyPreview') or '']
+        return hashlib.blake2b('\x00'.join(parts).encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+    def seen(self, message):
+        """ Returns if a message was already seen
+
+        :param message: the message, its cloud data or its key
+        :type message: Message or dict or bytes
+        :rtype: bool
+        """
+        digest = message if isinstance(message, bytes) else self.key_of(message)
+        with self._lock:
+            return self._connection.execute(
+                'SELECT 1 FROM seen WHERE digest = ?', (digest,)).fetchone() is not None
+
+    def add(self, messages):
+        """ Marks messages as seen
+
+        :param messages: the messages, their cloud data or their keys
+        :type messages: iterable[Message or dict or bytes]
+        :return: no. of messages not seen before
+        :rtype: int
+        """
+        digests = [(message if isinstance(message, bytes) else self.key_of(message),)
+                   for message in messages]
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany('INSERT OR IGNORE INTO seen (digest) VALUES (?)', digests)
+            return self._connection.total_changes - before
+
+    def clear(self):
+        """ Forgets every message """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM seen')
+
+    def filter_new(self, messages, *, mark=True, batch=500):
+        """ Yields the messages not seen before (nor earlier in messages)
+
+        :param messages: the messages or their cloud data
+        :type messages: iterable[Message or dict]
+        :param bool mark: mark the yielded messages as seen
+        :param int batch: no. of yielded messages marked as seen per commit.
+         The rest are committed when the generator is exhausted or closed
+        :rtype: generator
+        """
+        yielded = set()
+        pending = []
+        try:
+            for message in messages:
+                digest = self.key_of(message)
+                if digest in yielded or self.seen(digest):
+                    continue
+                yielded.add(digest)
+                if mark:
+                    pending.append(digest)
+                    if len(pending) >= batch:
+                        self.add(pending)
+                        pending = []
+                yield message
+        finally:
+            if pending:
+                self.add(pending)
+
+    def new_messages(self, folder, *, query=None, limit=None, mark=True, fetch=False,
+                     download_attachments=False, batch=500):
+        """ Lists the messages of a folder not seen before, selecting only
+        the properties needed to identify them
+
+        :param folder: the folder (or mailbox) to list
+        :type folder: mailbox.Folder
+        :param query: only list the messages matching this filter
+        :type query: Query or str
+        :param int limit: max no. of messages to list (None for all)
+        :param bool mark: mark the messages as seen. When fetching, messages
+         are only marked once fetched
+        :param bool fetch: yield the complete messages instead of the listed
+         ones (fetched one by one, only the new ones)
+        :param bool download_attachments: download the attachments of the
+         fetched messages
+        :param int batch: no. of messages marked as seen per commit
+        :rtype: generator[Message]
+        """
+        messages = folder.get_messages(limit=limit, query=query,
+                                       batch=folder.protocol.max_top_value,
+                                       fields=list(self.fields))
+        new = self.filter_new(messages, mark=mark and not fetch, batch=batch)
+        if not fetch:
+            yield from new
+            return
+        fetched = []
+        try:
+            for message in new:
+                full_message = folder.get_message(object_id=message.object_id,
+                                                  download_attachments=download_attachments)
+                if full_message is None:
+                    log.debug('Message {} could not be fetched'.format(message.object_id))
+                    continue
+                if mark:
+                    fetched.append(self.key_of(message))
+                    if len(fetched) >= batch:
+                        self.add(fetched)
+                        fetched = []
+                yield full_message
+        finally:
+            new.close()
+            if fetched:
+                self.add(fetched)
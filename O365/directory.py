@@ -1,17 +1,25 @@
 import logging
 
-from dateutil.parser import parse
 from requests.exceptions import HTTPError
 
 from .message import Message, RecipientType
-from .utils import ME_RESOURCE, NEXT_LINK_KEYWORD, ApiComponent, Pagination
+from .utils import (
+    ME_RESOURCE,
+    NEXT_LINK_KEYWORD,
+    ApiComponent,
+    FieldTableMixin,
+    LearnedProjection,
+    ModelField,
+    Pagination,
+    raw_cloud_values,
+)
 
 USERS_RESOURCE = 'users'
 
 log = logging.getLogger(__name__)
 
 
-class User(ApiComponent):
+class User(ApiComponent, FieldTableMixin):
 
     _endpoints = {
         'photo': '/photo/$value',
@@ -19,6 +27,197 @@ class User(ApiComponent):
     }
 
     message_constructor = Message  #: :meta private:
+    _select_map = {
+        'object_id': ('id',),
+        'type': (),
+        'full_name': ('givenName', 'surname'),
+        'created': ('createdDateTime',),
+        'last_password_change': ('lastPasswordChangeDateTime',),
+        'sign_in_sessions_valid_from': ('signInSessionsValidFromDateTime',),
+    }  #: :meta private:
+    _fields = (
+        ModelField('userPrincipalName', 'user_principal_name'),
+        ModelField('displayName', 'display_name'),
+        ModelField('givenName', 'given_name', default=''),
+        ModelField('surname', 'surname', default=''),
+        ModelField('mail', 'mail', read_only=True),
+        ModelField('businessPhones', 'business_phones', default=list),
+        ModelField('jobTitle', 'job_title'),
+        ModelField('mobilePhone', 'mobile_phone'),
+        ModelField('officeLocation', 'office_location'),
+        ModelField('preferredLanguage', 'preferred_language'),
+        ModelField('aboutMe', 'about_me'),
+        ModelField('accountEnabled', 'account_enabled'),
+        ModelField('ageGroup', 'age_group'),
+        ModelField('assignedLicenses', 'assigned_licenses'),
+        ModelField('assignedPlans', 'assigned_plans', read_only=True),
+        ModelField('birthday', 'birthday', parser=ModelField.datetime_parser),
+        ModelField('city', 'city'),
+        ModelField('companyName', 'company_name'),
+        ModelField('consentProvidedForMinor', 'consent_provided_for_minor'),
+        ModelField('country', 'country'),
+        ModelField('createdDateTime', 'created', parser=ModelField.datetime_parser),
+        ModelField('department', 'department'),
+        ModelField('employeeId', 'employee_id'),
+        ModelField('faxNumber', 'fax_number'),
+        ModelField('hireDate', 'hire_date', parser=ModelField.datetime_parser),
+        ModelField('imAddresses', 'im_addresses', read_only=True),
+        ModelField('interests', 'interests'),
+        ModelField('isResourceAccount', 'is_resource_account'),
+        ModelField('lastPasswordChangeDateTime', 'last_password_change',
+                   parser=ModelField.datetime_parser),
+        ModelField('legalAgeGroupClassification', 'legal_age_group_classification'),
+        ModelField('licenseAssignmentStates', 'license_assignment_states', read_only=True),
+        ModelField('mailboxSettings', 'mailbox_settings'),
+        ModelField('mailNickname', 'mail_nickname'),
+        ModelField('mySite', 'my_site'),
+        ModelField('otherMails', 'other_mails'),
+        ModelField('passwordPolicies', 'password_policies'),
+        ModelField('passwordProfile', 'password_profile'),
+        ModelField('pastProjects', 'past_projects'),
+        ModelField('postalCode', 'postal_code'),
+        ModelField('preferredDataLocation', 'preferred_data_location'),
+        ModelField('preferredName', 'preferred_name'),
+        ModelField('provisionedPlans', 'provisioned_plans', read_only=True),
+        ModelField('proxyAddresses', 'proxy_addresses', read_only=True),
+        ModelField('responsibilities', 'responsibilities'),
+        ModelField('schools', 'schools'),
+        ModelField('showInAddressList', 'show_in_address_list', default=True),
+        ModelField('skills', 'skills'),
+        ModelField('signInSessionsValidFromDateTime', 'sign_in_sessions_valid_from',
+                   parser=ModelField.datetime_parser, read_only=True),
+        ModelField('state', 'state'),
+        ModelField('streetAddress', 'street_address'),
+        ModelField('usageLocation', 'usage_location'),
+        ModelField('userType', 'user_type'),
+        ModelField('onPremisesSamAccountName', 'on_premises_sam_account_name'),
+    )  #: :meta private:
+
+    #: The user principal name (UPN) of the user.
+    #: The UPN is an Internet-style sign-in name for the user based on the Internet
+    #: standard RFC 822. |br| **Type:** str
+    user_principal_name = None
+    #: The name displayed in the address book for the user. |br| **Type:** str
+    display_name = None
+    #: The given name (first name) of the user. |br| **Type:** str
+    given_name = None
+    #: The user's surname (family name or last name). |br| **Type:** str
+    surname = None
+    #: The SMTP address for the user, for example, jeff@contoso.com. |br| **Type:** str
+    mail = None
+    #: The telephone numbers for the user. |br| **Type:** list[str]
+    business_phones = None
+    #: The user's job title. |br| **Type:** str
+    job_title = None
+    #: The primary cellular telephone number for the user. |br| **Type:** str
+    mobile_phone = None
+    #: The office location in the user's place of business. |br| **Type:** str
+    office_location = None
+    #: The preferred language for the user. The preferred language format is based on RFC 4646.
+    #: |br| **Type:** str
+    preferred_language = None
+    #: A freeform text entry field for the user to describe themselves. |br| **Type:** str
+    about_me = None
+    #: true if the account is enabled; otherwise, false. |br| **Type:** str
+    account_enabled = None
+    #: The age group of the user. |br| **Type:** ageGroup
+    age_group = None
+    #: The licenses that are assigned to the user, including inherited (group-based) licenses.
+    #: |br| **Type:** list[assignedLicenses]
+    assigned_licenses = None
+    #: The plans that are assigned to the user. |br| **Type:** list[assignedPlans]
+    assigned_plans = None
+    #: The birthday of the user.  |br| **Type:** datetime
+    birthday = None
+    #: The city where the user is located. |br| **Type:** str
+    city = None
+    #: The name of the company that the user is associated with. |br| **Type:** str
+    company_name = None
+    #: Whether consent was obtained for minors. |br| **Type:** consentProvidedForMinor
+    consent_provided_for_minor = None
+    #: The country or region where the user is located; for example, US or UK.
+    #: |br| **Type:** str
+    country = None
+    #: The date and time the user was created. |br| **Type:** datetime
+    created = None
+    #: The name of the department in which the user works. |br| **Type:** str
+    department = None
+    #: The employee identifier assigned to the user by the organization. |br| **Type:** str
+    employee_id = None
+    #: The fax number of the user. |br| **Type:** str
+    fax_number = None
+    #: The type of the user. |br| **Type:** str
+    hire_date = None
+    #: The instant message voice-over IP (VOIP) session initiation protocol (SIP)
+    #: addresses for the user. |br| **Type:** str
+    im_addresses = None
+    #: A list for the user to describe their interests. |br| **Type:** list[str]
+    interests = None
+    #: Don't use – reserved for future use. |br| **Type:** bool
+    is_resource_account = None
+    #: The time when this Microsoft Entra user last changed their password or
+    #: when their password was created, whichever date the latest action was performed.
+    #: |br| **Type:** str
+    last_password_change = None
+    #: Used by enterprise applications to determine the legal age group of the user.
+    #: |br| **Type:** legalAgeGroupClassification
+    legal_age_group_classification = None
+    #: State of license assignments for this user.
+    #: Also indicates licenses that are directly assigned or the user inherited through
+    #: group memberships. |br| **Type:** list[licenseAssignmentState]
+    license_assignment_states = None
+    #: Settings for the primary mailbox of the signed-in user. |br| **Type:** MailboxSettings
+    mailbox_settings = None
+    #: The mail alias for the user. |br| **Type:** str
+    mail_nickname = None
+    #: The URL for the user's site. |br| **Type:** str
+    my_site = None
+    #: A list of other email addresses for the user; for example:
+    #: ["bob@contoso.com", "Robert@fabrikam.com"]. |br| **Type:** list[str]
+    other_mails = None
+    #: Specifies password policies for the user. |br| **Type:** str
+    password_policies = None
+    #: Specifies the password profile for the user. |br| **Type:** passwordProfile
+    password_profile = None
+    #: A list for the user to enumerate their past projects. |br| **Type:** list[str]
+    past_projects = None
+    #: The postal code for the user's postal address. |br| **Type:** str
+    postal_code = None
+    #: The preferred data location for the user. |br| **Type:** str
+    preferred_data_location = None
+    #: The preferred name for the user.
+    #: **Not Supported. This attribute returns an empty string**.
+    #: |br| **Type:** str
+    preferred_name = None
+    #: The plans that are provisioned for the user.. |br| **Type:** list[provisionedPlan]
+    provisioned_plans = None
+    #: For example: ["SMTP: bob@contoso.com", "smtp: bob@sales.contoso.com"].
+    #: |br| **Type:** list[str]
+    proxy_addresses = None
+    #: A list for the user to enumerate their responsibilities. |br| **Type:** list[str]
+    responsibilities = None
+    #: A list for the user to enumerate the schools they attended |br| **Type:** list[str]
+    schools = None
+    #: Represents whether the user should be included in the Outlook global address list.
+    #: |br| **Type:** bool
+    show_in_address_list = None
+    #: A list for the user to enumerate their skills. |br| **Type:** list[str]
+    skills = None
+    #: Any refresh tokens or session tokens (session cookies) issued before
+    #: this time are invalid. |br| **Type:** datetime
+    sign_in_sessions_valid_from = None
+    #: The state or province in the user's address. |br| **Type:** str
+    state = None
+    #: The street address of the user's place of business. |br| **Type:** str
+    street_address = None
+    #: A two-letter country code (ISO standard 3166). |br| **Type:** str
+    usage_location = None
+    #: A string value that can be used to classify user types in your directory.
+    #: |br| **Type:** str
+    user_type = None
+    #: Contains the on-premises samAccountName synchronized from the on-premises directory.
+    #: |br| **Type:** str
+    on_premises_sam_account_name = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """ Represents an Azure AD user account
@@ -52,147 +251,9 @@ class User(ApiComponent):
             protocol=parent.protocol if parent else kwargs.get('protocol'),
             main_resource=main_resource)
 
-        local_tz = self.protocol.timezone
-        cc = self._cc
-
         #: The type of the user. |br| **Type:** str
         self.type = cloud_data.get('@odata.type')
-        #: The user principal name (UPN) of the user.
-        #: The UPN is an Internet-style sign-in name for the user based on the Internet
-        #: standard RFC 822. |br| **Type:** str
-        self.user_principal_name = cloud_data.get(cc('userPrincipalName'))
-        #: The name displayed in the address book for the user. |br| **Type:** str
-        self.display_name = cloud_data.get(cc('displayName'))
-        #: The given name (first name) of the user. |br| **Type:** str
-        self.given_name = cloud_data.get(cc('givenName'), '')
-        #: The user's surname (family name or last name). |br| **Type:** str
-        self.surname = cloud_data.get(cc('surname'), '')
-        #: The SMTP address for the user, for example, jeff@contoso.com. |br| **Type:** str
-        self.mail = cloud_data.get(cc('mail'))  # read only
-        #: The telephone numbers for the user. |br| **Type:** list[str]
-        self.business_phones = cloud_data.get(cc('businessPhones'), [])
-        #: The user's job title. |br| **Type:** str
-        self.job_title = cloud_data.get(cc('jobTitle'))
-        #: The primary cellular telephone number for the user. |br| **Type:** str
-        self.mobile_phone = cloud_data.get(cc('mobilePhone'))
-        #: The office location in the user's place of business. |br| **Type:** str
-        self.office_location = cloud_data.get(cc('officeLocation'))
-        #: The preferred language for the user. The preferred language format is based on RFC 4646.
-        #: |br| **Type:** str
-        self.preferred_language = cloud_data.get(cc('preferredLanguage'))
-        # End of default properties. Next properties must be selected
-
-        #: A freeform text entry field for the user to describe themselves. |br| **Type:** str
-        self.about_me = cloud_data.get(cc('aboutMe'))
-        #: true if the account is enabled; otherwise, false. |br| **Type:** str
-        self.account_enabled = cloud_data.get(cc('accountEnabled'))
-        #: The age group of the user. |br| **Type:** ageGroup
-        self.age_group = cloud_data.get(cc('ageGroup'))
-        #: The licenses that are assigned to the user, including inherited (group-based) licenses.
-        #: |br| **Type:** list[assignedLicenses]
-        self.assigned_licenses = cloud_data.get(cc('assignedLicenses'))
-        #: The plans that are assigned to the user. |br| **Type:** list[assignedPlans]
-        self.assigned_plans = cloud_data.get(cc('assignedPlans'))  # read only
-        birthday = cloud_data.get(cc('birthday'))
-        #: The birthday of the user.  |br| **Type:** datetime
-        self.birthday = parse(birthday).astimezone(local_tz) if birthday else None
-        #: The city where the user is located. |br| **Type:** str
-        self.city = cloud_data.get(cc('city'))
-        #: The name of the company that the user is associated with. |br| **Type:** str
-        self.company_name = cloud_data.get(cc('companyName'))
-        #: Whether consent was obtained for minors. |br| **Type:** consentProvidedForMinor
-        self.consent_provided_for_minor = cloud_data.get(cc('consentProvidedForMinor'))
-        #: The country or region where the user is located; for example, US or UK.
-        #: |br| **Type:** str
-        self.country = cloud_data.get(cc('country'))
-        created = cloud_data.get(cc('createdDateTime'))
-        #: The date and time the user was created. |br| **Type:** datetime
-        self.created = parse(created).astimezone(
-            local_tz) if created else None
-        #: The name of the department in which the user works. |br| **Type:** str
-        self.department = cloud_data.get(cc('department'))
-        #: The employee identifier assigned to the user by the organization. |br| **Type:** str
-        self.employee_id = cloud_data.get(cc('employeeId'))
-        #: The fax number of the user. |br| **Type:** str
-        self.fax_number = cloud_data.get(cc('faxNumber'))
-        hire_date = cloud_data.get(cc('hireDate'))
-        #: The type of the user. |br| **Type:** str
-        self.hire_date = parse(hire_date).astimezone(
-            local_tz) if hire_date else None
-        #: The instant message voice-over IP (VOIP) session initiation protocol (SIP)
-        #: addresses for the user. |br| **Type:** str
-        self.im_addresses = cloud_data.get(cc('imAddresses'))  # read only
-        #: A list for the user to describe their interests. |br| **Type:** list[str]
-        self.interests = cloud_data.get(cc('interests'))
-        #: Don't use – reserved for future use. |br| **Type:** bool
-        self.is_resource_account = cloud_data.get(cc('isResourceAccount'))
-        last_password_change = cloud_data.get(cc('lastPasswordChangeDateTime'))
-        #: The time when this Microsoft Entra user last changed their password or
-        #: when their password was created, whichever date the latest action was performed.
-        #: |br| **Type:** str
-        self.last_password_change = parse(last_password_change).astimezone(
-            local_tz) if last_password_change else None
-        #: Used by enterprise applications to determine the legal age group of the user.
-        #: |br| **Type:** legalAgeGroupClassification
-        self.legal_age_group_classification = cloud_data.get(cc('legalAgeGroupClassification'))
-        #: State of license assignments for this user.
-        #: Also indicates licenses that are directly assigned or the user inherited through
-        #: group memberships. |br| **Type:** list[licenseAssignmentState]
-        self.license_assignment_states = cloud_data.get(cc('licenseAssignmentStates'))  # read only
-        #: Settings for the primary mailbox of the signed-in user. |br| **Type:** MailboxSettings
-        self.mailbox_settings = cloud_data.get(cc('mailboxSettings'))
-        #: The mail alias for the user. |br| **Type:** str
-        self.mail_nickname = cloud_data.get(cc('mailNickname'))
-        #: The URL for the user's site. |br| **Type:** str
-        self.my_site = cloud_data.get(cc('mySite'))
-        #: A list of other email addresses for the user; for example:
-        #: ["bob@contoso.com", "Robert@fabrikam.com"]. |br| **Type:** list[str]
-        self.other_mails = cloud_data.get(cc('otherMails'))
-        #: Specifies password policies for the user. |br| **Type:** str
-        self.password_policies = cloud_data.get(cc('passwordPolicies'))
-        #: Specifies the password profile for the user. |br| **Type:** passwordProfile
-        self.password_profile = cloud_data.get(cc('passwordProfile'))
-        #: A list for the user to enumerate their past projects. |br| **Type:** list[str]
-        self.past_projects = cloud_data.get(cc('pastProjects'))
-        #: The postal code for the user's postal address. |br| **Type:** str
-        self.postal_code = cloud_data.get(cc('postalCode'))
-        #: The preferred data location for the user. |br| **Type:** str
-        self.preferred_data_location = cloud_data.get(cc('preferredDataLocation'))
-        #: The preferred name for the user.
-        #: **Not Supported. This attribute returns an empty string**.
-        #: |br| **Type:** str
-        self.preferred_name = cloud_data.get(cc('preferredName'))
-        #: The plans that are provisioned for the user.. |br| **Type:** list[provisionedPlan]
-        self.provisioned_plans = cloud_data.get(cc('provisionedPlans'))  # read only
-        #: For example: ["SMTP: bob@contoso.com", "smtp: bob@sales.contoso.com"].
-        #: |br| **Type:** list[str]
-        self.proxy_addresses = cloud_data.get(cc('proxyAddresses'))  # read only
-        #: A list for the user to enumerate their responsibilities. |br| **Type:** list[str]
-        self.responsibilities = cloud_data.get(cc('responsibilities'))
-        #: A list for the user to enumerate the schools they attended |br| **Type:** list[str]
-        self.schools = cloud_data.get(cc('schools'))
-        #: Represents whether the user should be included in the Outlook global address list.
-        #: |br| **Type:** bool
-        self.show_in_address_list = cloud_data.get(cc('showInAddressList'), True)
-        #: A list for the user to enumerate their skills. |br| **Type:** list[str]
-        self.skills = cloud_data.get(cc('skills'))
-        sign_in_sessions_valid_from = cloud_data.get(cc('signInSessionsValidFromDateTime'))  # read only
-        #: Any refresh tokens or session tokens (session cookies) issued before
-        #: this time are invalid. |br| **Type:** datetime
-        self.sign_in_sessions_valid_from = parse(sign_in_sessions_valid_from).astimezone(
-            local_tz) if sign_in_sessions_valid_from else None
-        #: The state or province in the user's address. |br| **Type:** str
-        self.state = cloud_data.get(cc('state'))
-        #: The street address of the user's place of business. |br| **Type:** str
-        self.street_address = cloud_data.get(cc('streetAddress'))
-        #: A two-letter country code (ISO standard 3166). |br| **Type:** str
-        self.usage_location = cloud_data.get(cc('usageLocation'))
-        #: A string value that can be used to classify user types in your directory.
-        #: |br| **Type:** str
-        self.user_type = cloud_data.get(cc('userType'))
-        #: Contains the on-premises samAccountName synchronized from the on-premises directory.
-        #: |br| **Type:** str
-        self.on_premises_sam_account_name = cloud_data.get(cc('onPremisesSamAccountName'))
+        self._load_fields(cloud_data)
 
     def __str__(self):
         return self.__repr__()
@@ -306,7 +367,8 @@ class Directory(ApiComponent):
     def __repr__(self):
         return 'Active Directory'
 
-    def get_users(self, limit=100, *, query=None, order_by=None, batch=None):
+    def get_users(self, limit=100, *, query=None, order_by=None, batch=None, raw=False,
+                  fields=None):
         """ Gets a list of users from the active directory
 
         When querying the Active Directory the Users endpoint will be used.
@@ -329,8 +391,14 @@ class Directory(ApiComponent):
         :type order_by: Query or str
         :param int batch: batch size, retrieves items in
          batches allowing to retrieve more items than the limit.
+        :param raw: return the cloud dicts instead of User objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
+        :param fields: only request the cloud data needed by these properties
+         (ie. ['display_name', 'mail']) or a LearnedProjection
+        :type fields: list[str] or LearnedProjection
         :return: list of users
-        :rtype: list[User] or Pagination
+        :rtype: list[User] or list[dict] or Pagination
         """
 
         url = self.build_url('')  # target the main_resource
@@ -349,22 +417,29 @@ class Directory(ApiComponent):
             else:
                 params.update(query.as_params())
 
+        self._apply_fields(params, self.user_constructor, fields)
+
         response = self.con.get(url, params=params)
         if not response:
             return iter(())
 
         data = response.json()
 
-        # Everything received from cloud must be passed as self._cloud_data_key
-        users = (self.user_constructor(parent=self, **{self._cloud_data_key: user})
-                 for user in data.get('value', []))
+        if raw:
+            users = raw_cloud_values(data.get('value', []), raw)
+        else:
+            # Everything received from cloud must be passed as self._cloud_data_key
+            users = (self.user_constructor(parent=self, **{self._cloud_data_key: user})
+                     for user in data.get('value', []))
+            if isinstance(fields, LearnedProjection):
+                users = fields.watch(users)
 
         next_link = data.get(NEXT_LINK_KEYWORD, None)
 
         if batch and next_link:
             return Pagination(parent=self, data=users,
                               constructor=self.user_constructor,
-                              next_link=next_link, limit=limit)
+                              next_link=next_link, limit=limit, raw=raw)
         else:
             return users
 
@@ -6,16 +6,20 @@ from typing import Union, Optional
 from urllib.parse import quote, urlparse
 from io import BytesIO
 
-from dateutil.parser import parse
 
 from .address_book import Contact
 from .utils import (
     NEXT_LINK_KEYWORD,
     ApiComponent,
+    FieldTableMixin,
+    LearnedProjection,
+    ModelField,
     OneDriveWellKnowFolderNames,
     Pagination,
     QueryBuilder,
-    CompositeFilter
+    CompositeFilter,
+    parse_datetime,
+    raw_cloud_values,
 )
 
 log = logging.getLogger(__name__)
@@ -283,7 +287,7 @@ class DriveItemVersion(ApiComponent, DownloadableMixin):
         modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
         local_tz = self.protocol.timezone
         #: Date and time the version was last modified. |br| **Type:** datetime
-        self.modified = parse(modified).astimezone(
+        self.modified = parse_datetime(modified).astimezone(
             local_tz) if modified else None
         #: Indicates the size of the content stream for this version of the item.
         #: |br| **Type:** int
@@ -462,7 +466,7 @@ class DriveItemPermission(ApiComponent):
         return True
 
 
-class DriveItem(ApiComponent):
+class DriveItem(ApiComponent, FieldTableMixin):
     """ A DriveItem representation. Groups all functionality """
 
     _endpoints = {
@@ -481,6 +485,61 @@ class DriveItem(ApiComponent):
         'share_invite': '/items/{id}/invite',
         'permissions': '/items/{id}/permissions',
     }
+    _select_map = {
+        'object_id': ('id',),
+        'parent_id': ('parentReference',),
+        'drive_id': ('parentReference',),
+        'parent_path': ('parentReference',),
+        'drive': ('parentReference', 'remoteItem'),
+        'remote_item': ('remoteItem',),
+        'created_by': ('createdBy',),
+        'modified_by': ('lastModifiedBy',),
+        'created': ('createdDateTime',),
+        'modified': ('lastModifiedDateTime',),
+        # the facets (file, folder, image, photo) are always selected
+        **dict.fromkeys((
+            'is_file', 'is_folder', 'is_image', 'is_photo', 'mime_type', 'hashes',
+            'child_count', 'height', 'width', 'taken_datetime', 'camera_make',
+            'camera_model', 'exposure_denominator', 'exposure_numerator',
+            'fnumber', 'focal_length', 'iso'), ()),
+    }  #: :meta private:
+    # the facets are needed to classify the items
+    _select_required = ('id', 'file', 'folder', 'image', 'photo')  #: :meta private:
+    _fields = (
+        ModelField('name', 'name', default=''),
+        ModelField('webUrl', 'web_url'),
+        ModelField('createdDateTime', 'created', parser=ModelField.datetime_parser),
+        ModelField('lastModifiedDateTime', 'modified', parser=ModelField.datetime_parser),
+        ModelField('description', 'description', default=''),
+        ModelField('size', 'size', default=0),
+        ModelField('thumbnails', 'thumbnails', default=list),
+    )  #: :meta private:
+    _state_fields = (
+        ModelField('id', 'object_id'),
+        ModelField('parentReference', 'parent_id', serializer=lambda value, item: {
+            'id': value, item._cc('driveId'): item.drive_id, item._cc('path'): item.parent_path}),
+        ModelField('remoteItem', 'remote_item'),
+        ModelField('createdBy', 'created_by', serializer=lambda value, item: {
+            'user': value._dump_state() if value else None}),
+        ModelField('lastModifiedBy', 'modified_by', serializer=lambda value, item: {
+            'user': value._dump_state() if value else None}),
+        ModelField('shared', 'shared', serializer=lambda value, item: {'scope': value}),
+    )  #: :meta private:
+
+    #: The name of the item (filename and extension). |br| **Type:** str
+    name = ''
+    #: URL that displays the resource in the browser.  |br| **Type:** str
+    web_url = None
+    #: Date and time of item creation. |br| **Type:** datetime
+    created = None
+    #: Date and time the item was last modified. |br| **Type:** datetime
+    modified = None
+    #: Provides a user-visible description of the item. |br| **Type:** str
+    description = ''
+    #: Size of the item in bytes. |br| **Type:** int
+    size = 0
+    #: The thumbnails. |br| **Type:** any
+    thumbnails = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """ Create a DriveItem
@@ -546,10 +605,7 @@ class DriveItem(ApiComponent):
                     'drive', None))
             self.remote_item = None
 
-        #: The name of the item (filename and extension). |br| **Type:** str
-        self.name = cloud_data.get(self._cc('name'), '')
-        #: URL that displays the resource in the browser.  |br| **Type:** str
-        self.web_url = cloud_data.get(self._cc('webUrl'))
+        self._load_fields(cloud_data)
         created_by = cloud_data.get(self._cc('createdBy'), {}).get('user', None)
         #: Identity of the user, device, and application which created the item. |br| **Type:** Contact
         self.created_by = Contact(con=self.con, protocol=self.protocol, **{
@@ -561,27 +617,10 @@ class DriveItem(ApiComponent):
         self.modified_by = Contact(con=self.con, protocol=self.protocol, **{
             self._cloud_data_key: modified_by}) if modified_by else None
 
-        created = cloud_data.get(self._cc('createdDateTime'), None)
-        modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
-        local_tz = self.protocol.timezone
-        #: Date and time of item creation. |br| **Type:** datetime
-        self.created = parse(created).astimezone(local_tz) if created else None
-        #: Date and time the item was last modified. |br| **Type:** datetime
-        self.modified = parse(modified).astimezone(
-            local_tz) if modified else None
-
-        #: Provides a user-visible description of the item. |br| **Type:** str
-        self.description = cloud_data.get(self._cc('description'), '')
-        #: Size of the item in bytes. |br| **Type:** int
-        self.size = cloud_data.get(self._cc('size'), 0)
         #: Indicates that the item has been shared with others and
         #: provides information about the shared state of the item. |br| **Type:** str
         self.shared = cloud_data.get(self._cc('shared'), {}).get('scope', None)
 
-        # Thumbnails
-        #: The thumbnails. |br| **Type:** any
-        self.thumbnails = cloud_data.get(self._cc('thumbnails'), [])
-
     def __str__(self):
         return self.__repr__()
 
@@ -636,7 +675,9 @@ class DriveItem(ApiComponent):
             return self._parent
         else:
             if self.parent_id:
-                return self.drive.get_item(self.parent_id)
+                return self._identity_lookup(
+                    'drive_item', self.parent_id,
+                    lambda: self.drive.get_item(self.parent_id))
             else:
                 # return the drive
                 return self.drive
@@ -650,14 +691,17 @@ class DriveItem(ApiComponent):
         if not self.drive_id:
             return None
 
-        url = self.build_url('')
-        response = self.con.get(url)
-        if not response:
-            return None
+        def fetch():
+            url = self.build_url('')
+            response = self.con.get(url)
+            if not response:
+                return None
 
-        drive = response.json()
+            drive = response.json()
+
+            return Drive(parent=self, main_resource='', **{self._cloud_data_key: drive})
 
-        return Drive(parent=self, main_resource='', **{self._cloud_data_key: drive})
+        return self._identity_lookup('drive', self.drive_id, fetch)
 
     def get_thumbnails(self, size=None):
         """ Returns this Item Thumbnails. Thumbnails are not supported on
@@ -700,6 +744,8 @@ class DriveItem(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate('drive_item', self.object_id)
+
         url = self.build_url(
             self._endpoints.get('item').format(id=self.object_id))
 
@@ -732,6 +778,8 @@ class DriveItem(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate('drive_item', self.object_id)
+
         url = self.build_url(
             self._endpoints.get('item').format(id=self.object_id))
 
@@ -774,6 +822,8 @@ class DriveItem(ApiComponent):
         if target_id == 'root':
             raise ValueError("When moving, target id can't be 'root'")
 
+        self._identity_invalidate('drive_item', self.object_id)
+
         url = self.build_url(
             self._endpoints.get('item').format(id=self.object_id))
 
@@ -1032,6 +1082,11 @@ class DriveItem(ApiComponent):
 class File(DriveItem, DownloadableMixin):
     """ A File """
 
+    _state_fields = DriveItem._state_fields + (
+        ModelField('file', 'mime_type', serializer=lambda value, item: {
+            item._cc('mimeType'): value, item._cc('hashes'): item.hashes}),
+    )  #: :meta private:
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         cloud_data = kwargs.get(self._cloud_data_key, {})
@@ -1057,6 +1112,11 @@ class File(DriveItem, DownloadableMixin):
 class Image(File):
     """ An Image """
 
+    _state_fields = File._state_fields + (
+        ModelField('image', 'height', serializer=lambda value, item: {
+            item._cc('height'): value, item._cc('width'): item.width}),
+    )  #: :meta private:
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         cloud_data = kwargs.get(self._cloud_data_key, {})
@@ -1080,6 +1140,18 @@ class Image(File):
 class Photo(Image):
     """ Photo Object. Inherits from Image but has more attributes """
 
+    _state_fields = Image._state_fields + (
+        ModelField('photo', 'taken_datetime', serializer=lambda value, item: {
+            item._cc('takenDateTime'): value.isoformat() if value else None,
+            item._cc('cameraMake'): item.camera_make,
+            item._cc('cameraModel'): item.camera_model,
+            item._cc('exposureDenominator'): item.exposure_denominator,
+            item._cc('exposureNumerator'): item.exposure_numerator,
+            item._cc('fNumber'): item.fnumber,
+            item._cc('focalLength'): item.focal_length,
+            item._cc('iso'): item.iso}),
+    )  #: :meta private:
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         cloud_data = kwargs.get(self._cloud_data_key, {})
@@ -1089,7 +1161,7 @@ class Photo(Image):
         taken = photo.get(self._cc('takenDateTime'), None)
         local_tz = self.protocol.timezone
         #: Represents the date and time the photo was taken. |br| **Type:** datetime
-        self.taken_datetime = parse(taken).astimezone(
+        self.taken_datetime = parse_datetime(taken).astimezone(
             local_tz) if taken else None
         #: Camera manufacturer. |br| **Type:** str
         self.camera_make = photo.get(self._cc('cameraMake'), None)
@@ -1111,6 +1183,13 @@ class Photo(Image):
 class Folder(DriveItem):
     """ A Folder inside a Drive """
 
+    _state_fields = DriveItem._state_fields + (
+        ModelField('folder', 'child_count', serializer=lambda value, item: {
+            item._cc('childCount'): value}),
+        ModelField('specialFolder', 'special_folder', serializer=lambda value, item: {
+            'name': value}),
+    )  #: :meta private:
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         cloud_data = kwargs.get(self._cloud_data_key, {})
@@ -1122,7 +1201,8 @@ class Folder(DriveItem):
         self.special_folder = cloud_data.get(self._cc('specialFolder'), {}).get(
             'name', None)
 
-    def get_items(self, limit=None, *, query=None, order_by=None, batch=None):
+    def get_items(self, limit=None, *, query=None, order_by=None, batch=None, raw=False,
+                  fields=None):
         """ Returns generator all the items inside this folder
 
         :param int limit: max no. of folders to get. Over 999 uses batch.
@@ -1132,8 +1212,14 @@ class Folder(DriveItem):
         :type order_by: Query or str
         :param int batch: batch size, retrieves items in
          batches allowing to retrieve more items than the limit.
+        :param raw: return the cloud dicts instead of DriveItem objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
+        :param fields: only request the cloud data needed by these properties
+         (ie. ['name', 'size', 'modified']) or a LearnedProjection
+        :type fields: list[str] or LearnedProjection
         :return: items in this folder
-        :rtype: generator of DriveItem or Pagination
+        :rtype: generator of DriveItem or list[dict] or Pagination
         """
 
         url = self.build_url(
@@ -1153,21 +1239,28 @@ class Folder(DriveItem):
             else:
                 params.update(query.as_params())
 
+        self._apply_fields(params, DriveItem, fields)
+
         response = self.con.get(url, params=params)
         if not response:
             return iter(())
 
         data = response.json()
 
-        # Everything received from cloud must be passed as self._cloud_data_key
-        items = (
-            self._classifier(item)(parent=self, **{self._cloud_data_key: item})
-            for item in data.get('value', []))
+        if raw:
+            items = raw_cloud_values(data.get('value', []), raw)
+        else:
+            # Everything received from cloud must be passed as self._cloud_data_key
+            items = (
+                self._classifier(item)(parent=self, **{self._cloud_data_key: item})
+                for item in data.get('value', []))
+            if isinstance(fields, LearnedProjection):
+                items = fields.watch(items)
         next_link = data.get(NEXT_LINK_KEYWORD, None)
         if batch and next_link:
             return Pagination(parent=self, data=items,
                               constructor=self._classifier,
-                              next_link=next_link, limit=limit)
+                              next_link=next_link, limit=limit, raw=raw)
         else:
             return items
 
@@ -1536,8 +1629,8 @@ class Drive(ApiComponent):
         created = cloud_data.get(self._cc('createdDateTime'), None)
         modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
         local_tz = self.protocol.timezone
-        self.created = parse(created).astimezone(local_tz) if created else None
-        self.modified = parse(modified).astimezone(
+        self.created = parse_datetime(created).astimezone(local_tz) if created else None
+        self.modified = parse_datetime(modified).astimezone(
             local_tz) if modified else None
 
     def __str__(self):
@@ -10,7 +10,7 @@ import re
 from urllib.parse import quote
 
 from .drive import File
-from .utils import ApiComponent, TrackerSet, to_snake_case, col_index_to_label
+from .utils import ApiComponent, TrackerSet, to_snake_case, col_index_to_label, raw_cloud_values
 
 log = logging.getLogger(__name__)
 
@@ -1543,11 +1543,14 @@ class Table(ApiComponent):
 
         return self.column_constructor(parent=self, **{self._cloud_data_key: data})
 
-    def get_rows(self, *, top=None, skip=None):
+    def get_rows(self, *, top=None, skip=None, raw=False):
         """
         Return the rows of this table
         :param int top: specify n rows to retrieve
         :param int skip: specify n rows to skip
+        :param raw: return the cloud dicts instead of TableRow objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
         :rtype: TableRow
         """
         url = self.build_url(self._endpoints.get("get_rows"))
@@ -1565,6 +1568,9 @@ class Table(ApiComponent):
 
         data = response.json()
 
+        if raw:
+            return iter(raw_cloud_values(data.get("value", []), raw))
+
         return (
             self.row_constructor(parent=self, **{self._cloud_data_key: row})
             for row in data.get("value", [])
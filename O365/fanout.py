@@ -0,0 +1,273 @@
+import heapq
+import logging
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .utils import MemoryDeltaStateBackend
+from .utils.batch import is_retryable_read, retry_delay
+
+log = logging.getLogger(__name__)
+
+
+class MailboxCheckpoint:
+    """ The saved progress of a mailbox processed by a :class:`MailboxFanOut`.
+
+    The per mailbox function can save any json serializable state (a
+    deltaLink, the last processed date...) and read it back when the mailbox
+    is retried after a throttling or on a later run after a crash.
+    """
+
+    def __init__(self, backend, key):
+        self._backend = backend
+        self._key = key
+        data = backend.load_checkpoint(key) or {}
+        self._done = data.get('done', False)
+        self._state = data.get('state')
+
+    def __repr__(self):
+        return 'MailboxCheckpoint: {} ({})'.format(self._key, 'done' if self._done else 'pending')
+
+    @property
+    def done(self):
+        """ Whether the mailbox was completely processed
+
+        :rtype: bool
+        """
+        return self._done
+
+    @property
+    def state(self):
+        """ The last saved state (None if nothing was saved) """
+        return self._state
+
+    def _store(self):
+        self._backend.save_checkpoint(self._key, {'done': self._done, 'state': self._state})
+
+    def save(self, state):
+        """ Saves the progress of the mailbox
+
+        :param state: any json serializable value
+        """
+        self._state = state
+        self._store()
+
+    def complete(self):
+        """ Marks the mailbox as completely processed """
+        self._done = True
+        self._store()
+
+    def reset(self):
+        """ Forgets the saved progress """
+        self._done = False
+        self._state = None
+        self._backend.delete_checkpoint(self._key)
+
+
+class FanOutError(RuntimeError):
+    """ Raised by :meth:`FanOutResult.raise_for_errors` when some mailboxes failed """
+
+    def __init__(self, errors):
+        super().__init__('{} mailboxes failed: {}'.format(
+            len(errors), ', '.join(list(errors)[:10])))
+        #: The exception of each failed mailbox. |br| **Type:** dict
+        self.errors = errors
+
+
+class FanOutResult:
+    """ The outcome of a fan out run """
+
+    def __init__(self):
+        #: The value returned for each processed mailbox. |br| **Type:** dict
+        self.results = {}
+        #: The exception of each failed mailbox. |br| **Type:** dict
+        self.errors = {}
+        #: The mailboxes skipped because a previous run completed them. |br| **Type:** list
+        self.skipped = []
+        #: No. of throttled (and retried) mailbox runs. |br| **Type:** int
+        self.throttled = 0
+        #: Seconds taken by the run. |br| **Type:** float
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return 'FanOutResult: {} processed, {} failed, {} skipped'.format(
+            len(self.results), len(self.errors), len(self.skipped))
+
+    @property
+    def ok(self):
+        """ Whether no mailbox failed
+
+        :rtype: bool
+        """
+        return not self.errors
+
+    def raise_for_errors(self):
+        """ Raises a FanOutError with the errors of the failed mailboxes
+
+        :raises FanOutError: if any mailbox failed
+        """
+        if self.errors:
+            raise FanOutError(self.errors)
+
+
+class MailboxFanOut:
+    """ Runs a function over many mailboxes concurrently. Meant for app only
+    (client credentials) workloads that process every mailbox of a tenant.
+
+    Mailboxes are processed by a bounded pool of threads, pulling the
+    resources lazily so a generator over the whole tenant can be used. A
+    throttled mailbox (or a server error, timeout or dropped connection, as
+    the scans only read) is retried later, after the time requested by the
+    service or an exponential backoff, while the other mailboxes keep
+    running. The progress of each mailbox is checkpointed, so a run can be
+    repeated after a crash and only the mailboxes not completed are
+    processed again.
+
+    .. code-block:: python
+
+        def scan(mailbox, checkpoint):
+            folder = mailbox.inbox_folder()
+            ...
+            return count
+
+        fan_out = MailboxFanOut(account, state_backend=FileSystemDeltaStateBackend('scan.json'))
+        result = fan_out.run(('users/{}'.format(upn) for upn in upns), scan)
+        result.raise_for_errors()
+    """
+
+    def __init__(self, account, *, max_workers=8, state_backend=None, checkpoint_key='fan_out',
+                 max_retries=5, backoff=2.0, max_backoff=120.0, progress=None):
+        """
+        :param Account account: the account used to build the mailboxes
+        :param int max_workers: max no. of mailboxes processed at the same time
+        :param state_backend: where the checkpoints are stored (apart from
+         the delta links). Defaults to memory (the checkpoints only survive
+         the retries of a run)
+        :type state_backend: BaseDeltaStateBackend
+        :param str checkpoint_key: prefix of the checkpoint keys. Use a
+         different one for each job sharing a backend
+        :param int max_retries: max no. of retries of a throttled mailbox
+        :param float backoff: seconds to wait after the first throttling when
+         the service does not tell (doubles on each retry)
+        :param float max_backoff: max seconds to wait between retries
+        :param progress: called with (resource, result) after each mailbox
+         completes or fails for good
+        """
+        #: The account used to build the mailboxes. |br| **Type:** Account
+        self.account = account
+        #: Max no. of mailboxes processed at the same time. |br| **Type:** int
+        self.max_workers = max(1, max_workers)
+        #: Where the checkpoints are stored. |br| **Type:** BaseDeltaStateBackend
+        self.state_backend = state_backend or MemoryDeltaStateBackend()
+        #: Prefix of the checkpoint keys. |br| **Type:** str
+        self.checkpoint_key = checkpoint_key
+        #: Max no. of retries of a throttled mailbox. |br| **Type:** int
+        self.max_retries = max_retries
+        #: Initial backoff in seconds. |br| **Type:** float
+        self.backoff = backoff
+        #: Max backoff in seconds. |br| **Type:** float
+        self.max_backoff = max_backoff
+        self.progress = progress
+
+    def __repr__(self):
+        return 'MailboxFanOut: {} workers'.format(self.max_workers)
+
+    def checkpoint(self, resource):
+        """ Returns the checkpoint of a mailbox
+
+        :param str resource: the mailbox resource
+        :rtype: MailboxCheckpoint
+        """
+        return MailboxCheckpoint(self.state_backend, '{}:{}'.format(self.checkpoint_key, resource))
+
+    def _process(self, resource, function, checkpoint):
+        mailbox = self.account.mailbox(resource=resource)
+        value = function(mailbox, checkpoint)
+        if isinstance(value, Iterator):
+            value = list(value)  # listings are consumed inside the pool
+        checkpoint.complete()
+        return value
+
+    def run(self, resources, function, *, restart=False):
+        """ Processes the mailboxes
+
+        :param resources: the mailbox resources (eg. 'users/{upn}' or the
+         user principal names)
+        :type resources: iterable[str]
+        :param function: called with (mailbox, checkpoint) for each mailbox.
+         Its return value (a returned generator is consumed into a list) is
+         kept in the result
+        :param bool restart: process again the mailboxes completed by a
+         previous run
+        :rtype: FanOutResult
+        """
+        result = FanOutResult()
+        started = time.monotonic()
+        resources = iter(resources)
+        exhausted = False
+        seen = set()
+        retries = []  # heap of (ready at, sequence, resource, attempts, checkpoint)
+        sequence = 0
+        running = {}
+
+        def finished(resource, value):
+            if self.progress is not None:
+                self.progress(resource, value)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                now = time.monotonic()
+                while len(running) < self.max_workers and retries and retries[0][0] <= now:
+                    _, _, resource, attempts, checkpoint = heapq.heappop(retries)
+                    future = executor.submit(self._process, resource, function, checkpoint)
+                    running[future] = (resource, attempts, checkpoint)
+
+                while len(running) < self.max_workers and not exhausted:
+                    resource = next(resources, None)
+                    if resource is None:
+                        exhausted = True
+                        break
+                    if resource in seen:
+                        continue
+                    seen.add(resource)
+                    checkpoint = self.checkpoint(resource)
+                    if restart:
+                        checkpoint.reset()
+                    elif checkpoint.done:
+                        result.skipped.append(resource)
+                        continue
+                    future = executor.submit(self._process, resource, function, checkpoint)
+                    running[future] = (resource, 0, checkpoint)
+
+                if not running:
+                    if not retries:
+                        break
+                    time.sleep(max(0.0, retries[0][0] - time.monotonic()))
+                    continue
+
+                timeout = max(0.0, retries[0][0] - now) if retries else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resource, attempts, checkpoint = running.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        attempts += 1
+                        if is_retryable_read(e) and attempts <= self.max_retries:
+                            delay = retry_delay(e, attempts, self.backoff, self.max_backoff)
+                            log.debug('Mailbox {} throttled. Retrying in {:.1f} seconds'.format(
+                                resource, delay))
+                            result.throttled += 1
+                            sequence += 1
+                            heapq.heappush(retries, (time.monotonic() + delay, sequence,
+                                                     resource, attempts, checkpoint))
+                        else:
+                            log.error('Error processing mailbox {}: {}'.format(resource, e))
+                            result.errors[resource] = e
+                            finished(resource, e)
+                    else:
+                        result.results[resource] = value
+                        finished(resource, value)
+
+        result.elapsed = time.monotonic() - started
+        return result
@@ -0,0 +1,205 @@
+import json
+import logging
+import sqlite3
+import threading
+
+from bs4 import BeautifulSoup as bs
+
+from .message import Message
+from .utils import RemovedItem, SQLiteDeltaStateBackend
+
+log = logging.getLogger(__name__)
+
+
+class MailIndex:
+    """ A local full text index of messages stored in SQLite (FTS5).
+
+    Keeps the subject, sender, recipients, body text and categories of the
+    indexed messages so they can be searched without calling the api.
+    The index is fed from message listings (:meth:`add`) or kept up to date
+    from a folder delta sync (:meth:`sync`).
+    """
+
+    message_constructor = Message  #: :meta private:
+
+    def __init__(self, database='o365_mail_index.db'):
+        """
+        :param str database: the SQLite database path. Use ':memory:' for a
+         temporary index
+        """
+        #: The SQLite database path. |br| **Type:** str
+        self.database = str(database)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.database, check_same_thread=False)
+        try:
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS messages ('
+                    'rowid INTEGER PRIMARY KEY, message_id TEXT UNIQUE NOT NULL, '
+                    'folder_id TEXT, received TEXT, data TEXT NOT NULL)')
+                self._connection.execute(
+                    'CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5('
+                    'subject, sender, recipients, body, categories)')
+        except sqlite3.OperationalError as e:
+            self._connection.close()
+            raise RuntimeError('The SQLite library does not support this index: {}'.format(e)) from e
+
+    def __repr__(self):
+        return 'MailIndex: {}'.format(self.database)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+
+    def close(self):
+        """ Closes the database connection """
+        self._connection.close()
+
+    @staticmethod
+    def _body_text(message):
+        if not message.body:
+            return message.body_preview or ''
+        if message.body_type.upper() != 'HTML':
+            return message.body
+        return bs(message.body, 'html.parser').get_text(' ', strip=True)
+
+    @staticmethod
+    def _recipient_text(recipients):
+        return ' '.join('{} {}'.format(recipient.name or '', recipient.address or '')
+                        for recipient in recipients)
+
+    def _remove(self, message_id):
+        row = self._connection.execute(
+            'SELECT rowid FROM messages WHERE message_id = ?', (message_id,)).fetchone()
+        if row:
+            self._connection.execute('DELETE FROM messages_fts WHERE rowid = ?', row)
+            self._connection.execute('DELETE FROM messages WHERE rowid = ?', row)
+
+    def _add(self, message):
+        if not message.object_id:
+            raise ValueError('Only messages received from the cloud can be indexed')
+        cloud_data = message._dump_state()
+        self._remove(message.object_id)
+        cursor = self._connection.execute(
+            'INSERT INTO messages (message_id, folder_id, received, data) VALUES (?, ?, ?, ?)',
+            (message.object_id, message.folder_id,
+             message.received.isoformat() if message.received else None,
+             json.dumps(cloud_data, separators=(',', ':'))))
+        self._connection.execute(
+            'INSERT INTO messages_fts (rowid, subject, sender, recipients, body, categories) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (cursor.lastrowid, message.subject or '',
+             self._recipient_text([message.sender]) if message.sender else '',
+             ' '.join(self._recipient_text(recipients)
+                      for recipients in (message.to, message.cc, message.bcc)),
+             self._body_text(message), ' '.join(message.categories)))
+
+    def add(self, messages):
+        """ Adds or updates messages in the index. RemovedItems (from delta
+        results) remove the message from the index.
+
+        :param messages: Messages from a listing or delta sync
+        :type messages: iterable[Message or RemovedItem]
+        :return: number of messages added, updated or removed
+        :rtype: int
+        """
+        if isinstance(messages, (Message, RemovedItem)):
+            messages = [messages]
+        count = 0
+        with self._lock, self._connection:
+            for message in messages:
+                if isinstance(message, RemovedItem):
+                    self._remove(message.object_id)
+                else:
+                    self._add(message)
+                count += 1
+        return count
+
+    def remove(self, object_id):
+        """ Removes a message from the index
+
+        :param str object_id: the message id
+        """
+        with self._lock, self._connection:
+            self._remove(object_id)
+
+    def clear(self):
+        """ Removes every message from the index """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM messages_fts')
+            self._connection.execute('DELETE FROM messages')
+
+    def sync(self, folder, *, state_key=None, batch=None):
+        """ Brings the index up to date with the changes in a folder since the
+        last sync. The sync state is stored in the same database and only
+        moves past a page once its changes are committed to the index.
+
+        :param Folder folder: the mail folder to sync
+        :param str state_key: the key of the sync state. Defaults to the folder
+        :param int batch: preferred page size
+        :return: number of messages added, updated or removed
+        :rtype: int
+        """
+        state_backend = SQLiteDeltaStateBackend(self.database, connection=self._connection,
+                                                lock=self._lock)
+        page = []
+        count = 0
+
+        def commit_page():
+            nonlocal count
+            count += self.add(page)
+            page.clear()
+
+        for change in folder.get_messages_delta(state_backend=state_backend, state_key=state_key,
+                                                batch=batch, on_page_processed=commit_page):
+            page.append(change)
+        return count
+
+    def search(self, text, *, parent=None, con=None, protocol=None, folder_id=None,
+               limit=25, fetch=False):
+        """ Searches the index. Matches are sorted by relevance.
+
+        :param str text: an FTS5 query (ie. 'invoice', 'subject:invoice',
+         'sender:contoso AND body:"due date"')
+        :param parent: the parent of the messages (ie. the MailBox)
+        :param Connection con: connection to use if no parent specified
+        :param Protocol protocol: protocol to use if no parent specified
+        :param str folder_id: only return messages of this folder
+        :param int limit: max no. of messages to return (None for all)
+        :param bool fetch: request each message by id from the api instead of
+         building it from the index. Needs a parent mail Folder
+        :return: the matching messages, lazily decoded from the index
+        :rtype: generator[Message]
+        :raises ValueError: if fetch is set without a parent
+        """
+        if fetch and parent is None:
+            raise ValueError('Fetching the messages needs a parent mail Folder')
+        sql = ('SELECT messages.message_id, messages.data FROM messages_fts '
+               'JOIN messages ON messages.rowid = messages_fts.rowid '
+               'WHERE messages_fts MATCH ?')
+        params = [text]
+        if folder_id:
+            sql += ' AND messages.folder_id = ?'
+            params.append(folder_id)
+        sql += ' ORDER BY rank'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return self._messages(rows, parent, con, protocol, fetch)
+
+    def _messages(self, rows, parent, con, protocol, fetch):
+        """ Yields the messages of the matching rows """
+        for message_id, data in rows:
+            if fetch:
+                message = parent.get_message(message_id)
+                if message is not None:
+                    yield message
+            elif parent is not None:
+                yield self.message_constructor(parent=parent, lazy=True,
+                                               **{self.message_constructor._cloud_data_key: json.loads(data)})
+            else:
+                yield self.message_constructor(con=con, protocol=protocol, lazy=True,
+                                               **{self.message_constructor._cloud_data_key: json.loads(data)})
@@ -1,17 +1,36 @@
+import base64
 import datetime as dt
 import logging
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
+from pathlib import Path
+
+from requests.exceptions import HTTPError
 
 from .message import Message
 from .utils import (
+    DELTA_LINK_KEYWORD,
     NEXT_LINK_KEYWORD,
     ApiComponent,
+    LearnedProjection,
+    MemoryDeltaStateBackend,
     OutlookWellKnowFolderNames,
     Pagination,
+    RemovedItem,
+    execute_batch,
+    parse_datetime,
+    raw_cloud_values,
 )
 
 log = logging.getLogger(__name__)
 
+#: Max size of the attachments whose content is prefetched with the messages
+ATTACHMENT_PREFETCH_SIZE_LIMIT = 1024 * 1024
+
 
 class ExternalAudience(Enum):
     """Valid values for externalAudience."""
@@ -256,13 +275,19 @@ class Folder(ApiComponent):
 
     _endpoints = {
         "root_folders": "/mailFolders",
+        "root_folders_delta": "/mailFolders/delta",
         "child_folders": "/mailFolders/{id}/childFolders",
         "get_folder": "/mailFolders/{id}",
         "root_messages": "/messages",
         "folder_messages": "/mailFolders/{id}/messages",
+        "folder_messages_delta": "/mailFolders/{id}/messages/delta",
         "copy_folder": "/mailFolders/{id}/copy",
         "move_folder": "/mailFolders/{id}/move",
         "message": "/messages/{id}",
+        "message_mime": "/messages/{id}/$value",
+        "message_attachment": "/messages/{id}/attachments/{ida}",
+        "move_message": "/messages/{id}/move",
+        "copy_message": "/messages/{id}/copy",
     }
     message_constructor = Message  #: :meta private:
 
@@ -326,6 +351,8 @@ class Folder(ApiComponent):
             #: The mailFolder's unique identifier. |br| **Type:** str
             self.folder_id = "root"
 
+        self._delta_state = None
+
     def __str__(self):
         return self.__repr__()
 
@@ -335,6 +362,15 @@ class Folder(ApiComponent):
     def __eq__(self, other):
         return self.folder_id == other.folder_id
 
+    def _invalidate_folder_tree(self):
+        """ Marks the folder tree cached in the mailbox as outdated """
+        folder = self
+        while folder.parent is not None:
+            folder = folder.parent
+        tree = getattr(folder, "_folder_tree", None)
+        if tree is not None:
+            tree.invalidate()
+
     def get_folders(self, limit=None, *, query=None, order_by=None, batch=None):
         """Return a list of child folders matching the query.
 
@@ -394,7 +430,7 @@ class Folder(ApiComponent):
         else:
             return folders
 
-    def get_message(self, object_id=None, query=None, *, download_attachments=False):
+    def get_message(self, object_id=None, query=None, *, download_attachments=False, lazy=False):
         """
         Get one message from the query result.
         A shortcut to get_messages with limit=1
@@ -404,6 +440,7 @@ class Folder(ApiComponent):
          "displayName eq 'HelloFolder'"
         :type query: Query or str
         :param bool download_attachments: whether or not to download attachments
+        :param bool lazy: decode the expensive message fields on first access
         :return: one Message
         :rtype: Message or None
         """
@@ -425,13 +462,15 @@ class Folder(ApiComponent):
             return self.message_constructor(
                 parent=self,
                 download_attachments=download_attachments,
+                lazy=lazy,
                 **{self._cloud_data_key: message},
             )
 
         else:
             messages = list(
                 self.get_messages(
-                    limit=1, query=query, download_attachments=download_attachments
+                    limit=1, query=query, download_attachments=download_attachments,
+                    lazy=lazy
                 )
             )
 
@@ -445,6 +484,11 @@ class Folder(ApiComponent):
         order_by=None,
         batch=None,
         download_attachments=False,
+        lazy=False,
+        raw=False,
+        fields=None,
+        prefetch_attachments=False,
+        attachment_size_limit=ATTACHMENT_PREFETCH_SIZE_LIMIT,
     ):
         """
         Downloads messages from this folder
@@ -458,8 +502,23 @@ class Folder(ApiComponent):
         :param int batch: batch size, retrieves items in
          batches allowing to retrieve more items than the limit.
         :param bool download_attachments: whether or not to download attachments
+         (one request per message). See prefetch_attachments
+        :param bool lazy: decode the expensive message fields (dates, recipients,
+         attachments, flag...) the first time they are accessed
+        :param raw: return the cloud dicts instead of Message objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
+        :param fields: only request the cloud data needed by these properties
+         (ie. ['subject', 'sender', 'received']) or a LearnedProjection
+        :type fields: list[str] or LearnedProjection
+        :param bool prefetch_attachments: get the attachments with the
+         messages: their metadata is expanded in the listing and the content
+         of the small file attachments is fetched with one $batch per page
+        :param int attachment_size_limit: attachments over this size (bytes)
+         are prefetched without content (use attachments.download_attachment
+         to stream them). None gets every content in the listing itself
         :return: list of messages
-        :rtype: list[Message] or Pagination
+        :rtype: list[Message] or list[dict] or Pagination
         """
 
         if self.root:
@@ -483,21 +542,45 @@ class Folder(ApiComponent):
             else:
                 params.update(query.as_params())
 
+        self._apply_fields(params, self.message_constructor, fields)
+
+        on_page = None
+        if prefetch_attachments:
+            expand = self._cc("attachments")
+            if attachment_size_limit is not None:
+                expand = "{}($select={})".format(expand, ",".join(
+                    self._cc(field) for field in self._attachment_metadata_fields))
+            params["$expand"] = (
+                "{},{}".format(params["$expand"], expand) if params.get("$expand") else expand
+            )
+            download_attachments = False
+            if attachment_size_limit is not None:
+                def on_page(values):
+                    self._prefetch_attachment_contents(values, attachment_size_limit)
+
         response = self.con.get(url, params=params)
         if not response:
             return iter(())
 
         data = response.json()
+        if on_page is not None:
+            on_page(data.get("value", []))
 
-        # Everything received from cloud must be passed as self._cloud_data_key
-        messages = (
-            self.message_constructor(
-                parent=self,
-                download_attachments=download_attachments,
-                **{self._cloud_data_key: message},
+        if raw:
+            messages = raw_cloud_values(data.get("value", []), raw)
+        else:
+            # Everything received from cloud must be passed as self._cloud_data_key
+            messages = (
+                self.message_constructor(
+                    parent=self,
+                    download_attachments=download_attachments,
+                    lazy=lazy,
+                    **{self._cloud_data_key: message},
+                )
+                for message in data.get("value", [])
             )
-            for message in data.get("value", [])
-        )
+            if isinstance(fields, LearnedProjection):
+                messages = fields.watch(messages)
 
         next_link = data.get(NEXT_LINK_KEYWORD, None)
         if batch and next_link:
@@ -508,10 +591,507 @@ class Folder(ApiComponent):
                 next_link=next_link,
                 limit=limit,
                 download_attachments=download_attachments,
+                lazy=lazy,
+                raw=raw,
+                on_page=on_page,
             )
         else:
             return messages
 
+    _attachment_metadata_fields = (
+        "id", "name", "contentType", "size", "isInline", "lastModifiedDateTime",
+    )
+
+    def _prefetch_attachment_contents(self, messages, size_limit, *, max_workers=1):
+        """ Fetches the content of the small file attachments expanded in
+        a page of messages (cloud data), using $batch requests """
+        file_type = "#microsoft.graph.fileAttachment"
+        targets = []
+        for message in messages:
+            attachments = message.get(self._cc("attachments")) or []
+            for index, attachment in enumerate(attachments):
+                if (attachment.get("@odata.type", file_type).lower() == file_type.lower()
+                        and (attachment.get(self._cc("size")) or 0) <= size_limit):
+                    targets.append((attachments, index, message.get(self._cc("id")),
+                                    attachment.get(self._cc("id"))))
+        if not targets:
+            return
+
+        requests = [
+            {"method": "GET", "url": self.build_url(
+                self._endpoints.get("message_attachment").format(id=message_id, ida=attachment_id))}
+            for _, _, message_id, attachment_id in targets
+        ]
+        responses = execute_batch(self.con, self.protocol, requests, max_workers=max_workers)
+        for (attachments, index, message_id, _), response in zip(targets, responses):
+            if response.ok and response.body:
+                attachments[index] = response.body
+            else:
+                # the content is left to be downloaded on demand
+                log.debug("Could not prefetch an attachment of message {}: {}".format(
+                    message_id, response.error))
+
+    def get_messages_delta(
+        self,
+        *,
+        state_backend=None,
+        state_key=None,
+        query=None,
+        fields=None,
+        batch=None,
+        download_attachments=False,
+        lazy=False,
+        on_page_processed=None,
+    ):
+        """
+        Downloads the messages changed in this folder since the last sync.
+        The first sync returns every message in the folder.
+
+        The sync state (the deltaLink of the last completed sync or the
+        nextLink of the last fully processed page) is kept in the state
+        backend, so an interrupted sync resumes at the page where it stopped
+        and the next one only returns the changes.
+
+        :param BaseDeltaStateBackend state_backend: where to store the sync
+         state. Defaults to an in memory backend that lives with this Folder
+        :param str state_key: the key of this sync in the state backend.
+         Defaults to the mailbox resource and folder id. Use a new key when
+         changing the query or fields, as they are embedded in the state
+        :param query: applies a filter to the first sync (only
+         receivedDateTime filters are supported by the delta api)
+        :type query: Query or str
+        :param fields: only request the cloud data needed by these properties
+        :type fields: list[str] or LearnedProjection
+        :param int batch: preferred page size
+        :param bool download_attachments: whether or not to download attachments
+        :param bool lazy: decode the expensive message fields the first time
+         they are accessed
+        :param on_page_processed: called without arguments once every change
+         of a page was consumed, right before the sync state moves past the
+         page. Use it to commit the changes stored so far
+        :return: the changed messages and a RemovedItem for each message
+         deleted or moved out of the folder
+        :rtype: generator[Message or RemovedItem]
+        """
+        if self.root:
+            raise RuntimeError("Delta sync is only available for a specific folder")
+
+        if state_backend is None:
+            if self._delta_state is None:
+                self._delta_state = MemoryDeltaStateBackend()
+            state_backend = self._delta_state
+        if state_key is None:
+            state_key = "{}/mailFolders/{}/messages".format(
+                self.main_resource, self.folder_id
+            )
+
+        def request_options():
+            # a new dict each time: the connection merges its default headers into it
+            if batch:
+                return {"headers": {"Prefer": "odata.maxpagesize={}".format(batch)}}
+            return {}
+
+        link = state_backend.load_link(state_key)
+        if link:
+            try:
+                response = self.con.get(link, **request_options())
+            except HTTPError as e:
+                if e.response is None or e.response.status_code != 410:
+                    raise
+                # the sync state expired: start again from scratch
+                log.debug("Delta state expired for {}".format(state_key))
+                state_backend.delete_link(state_key)
+                link = None
+        if not link:
+            url = self.build_url(
+                self._endpoints.get("folder_messages_delta").format(id=self.folder_id)
+            )
+            params = {}
+            if query:
+                if isinstance(query, str):
+                    params["$filter"] = query
+                else:
+                    params.update(query.as_params())
+            self._apply_fields(params, self.message_constructor, fields)
+            response = self.con.get(url, params=params or None, **request_options())
+
+        while response:
+            data = response.json()
+            messages = []
+            for message in data.get("value", []):
+                removed = message.get("@removed")
+                if removed is not None:
+                    messages.append(
+                        RemovedItem(message.get(self._cc("id")), removed.get("reason"))
+                    )
+                else:
+                    # Everything received from cloud must be passed as self._cloud_data_key
+                    messages.append(
+                        self.message_constructor(
+                            parent=self,
+                            download_attachments=download_attachments,
+                            lazy=lazy,
+                            **{self._cloud_data_key: message},
+                        )
+                    )
+            if isinstance(fields, LearnedProjection):
+                messages = fields.watch(messages)
+            yield from messages
+
+            # the page is processed: a new sync continues after it
+            next_link = data.get(NEXT_LINK_KEYWORD)
+            delta_link = data.get(DELTA_LINK_KEYWORD)
+            if on_page_processed is not None:
+                on_page_processed()
+            if next_link:
+                state_backend.save_link(state_key, next_link)
+                response = self.con.get(next_link, **request_options())
+            else:
+                if delta_link:
+                    state_backend.save_link(state_key, delta_link)
+                break
+
+    def _bulk(self, messages, method, endpoint, data=None, *, max_workers=1):
+        requests = []
+        for message in messages:
+            message_id = message if isinstance(message, str) else message.object_id
+            if not message_id:
+                raise RuntimeError("Attempting a bulk operation on an unsaved Message")
+            request = {
+                "method": method,
+                "url": self.build_url(self._endpoints.get(endpoint).format(id=message_id)),
+            }
+            if data is not None:
+                request["body"] = data
+            requests.append(request)
+
+        return execute_batch(self.con, self.protocol, requests, max_workers=max_workers)
+
+    @staticmethod
+    def _destination_id(folder):
+        folder_id = folder if isinstance(folder, str) else getattr(folder, "folder_id", None)
+        if not folder_id:
+            raise RuntimeError("Must Provide a valid folder_id")
+        return folder_id
+
+    def bulk_move(self, messages, to_folder, *, max_workers=1):
+        """
+        Moves many messages to a given folder using $batch requests
+
+        :param messages: the messages or message ids to move
+        :type messages: list[Message] or list[str]
+        :param to_folder: Folder object or Folder id or Well-known name to
+         move the messages to
+        :type to_folder: str or mailbox.Folder
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order. The body of a
+         successful result is the moved message data (with its new id)
+        :rtype: list[BatchResponse]
+        """
+        data = {self._cc("destinationId"): self._destination_id(to_folder)}
+        return self._bulk(messages, "POST", "move_message", data, max_workers=max_workers)
+
+    def bulk_copy(self, messages, to_folder, *, max_workers=1):
+        """
+        Copies many messages to a given folder using $batch requests
+
+        :param messages: the messages or message ids to copy
+        :type messages: list[Message] or list[str]
+        :param to_folder: Folder object or Folder id or Well-known name to
+         copy the messages to
+        :type to_folder: str or mailbox.Folder
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order
+        :rtype: list[BatchResponse]
+        """
+        data = {self._cc("destinationId"): self._destination_id(to_folder)}
+        return self._bulk(messages, "POST", "copy_message", data, max_workers=max_workers)
+
+    def bulk_mark_read(self, messages, *, max_workers=1):
+        """
+        Marks many messages as read using $batch requests
+
+        :param messages: the messages or message ids to mark as read
+        :type messages: list[Message] or list[str]
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order
+        :rtype: list[BatchResponse]
+        """
+        return self._bulk(messages, "PATCH", "message", {self._cc("isRead"): True},
+                          max_workers=max_workers)
+
+    def bulk_mark_unread(self, messages, *, max_workers=1):
+        """
+        Marks many messages as unread using $batch requests
+
+        :param messages: the messages or message ids to mark as unread
+        :type messages: list[Message] or list[str]
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order
+        :rtype: list[BatchResponse]
+        """
+        return self._bulk(messages, "PATCH", "message", {self._cc("isRead"): False},
+                          max_workers=max_workers)
+
+    def bulk_set_categories(self, messages, categories, *, max_workers=1):
+        """
+        Sets the categories of many messages using $batch requests
+
+        :param messages: the messages or message ids to update
+        :type messages: list[Message] or list[str]
+        :param categories: the categories to set (an empty list removes them)
+        :type categories: list[str or Category]
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order
+        :rtype: list[BatchResponse]
+        """
+        categories = [getattr(category, "name", category) for category in categories]
+        return self._bulk(messages, "PATCH", "message", {self._cc("categories"): categories},
+                          max_workers=max_workers)
+
+    def bulk_delete(self, messages, *, max_workers=1):
+        """
+        Deletes many messages using $batch requests
+
+        :param messages: the messages or message ids to delete
+        :type messages: list[Message] or list[str]
+        :param int max_workers: max no. of $batch requests sent at the same time
+        :return: the result of each message, in the same order
+        :rtype: list[BatchResponse]
+        """
+        return self._bulk(messages, "DELETE", "message", max_workers=max_workers)
+
+    @staticmethod
+    def _mime_file_name(message_id):
+        # message ids are case sensitive base64: base32 keeps them apart on
+        # case insensitive file systems and only uses file name characters
+        name = base64.b32encode(message_id.encode("utf-8")).decode("ascii").rstrip("=")
+        return "{}.eml".format(name.lower())
+
+    def _download_mime(self, message_id, output, chunk_size):
+        """ Streams the MIME content of a message into output """
+        url = self.build_url(self._endpoints.get("message_mime").format(id=message_id))
+        with self.con.get(url, stream=True) as response:
+            if not response:
+                raise RuntimeError(
+                    "MIME download failed with status {}".format(response.status_code))
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    output.write(chunk)
+
+    @staticmethod
+    def _write_mbox_message(mbox, mime, received):
+        """ Appends a message to an mbox file (mboxrd escaping) """
+        date = received or dt.datetime.now(dt.timezone.utc)
+        mbox.write("From MAILER-DAEMON {}\n".format(
+            date.strftime("%a %b %d %H:%M:%S %Y")).encode("ascii"))
+        last = b"\n"
+        for line in mime:
+            line = line.replace(b"\r\n", b"\n")
+            if line.lstrip(b">").startswith(b"From "):
+                line = b">" + line
+            mbox.write(line)
+            last = line
+        mbox.write(b"\n" if last.endswith(b"\n") else b"\n\n")
+
+    def export_mime(
+        self,
+        to_path,
+        *,
+        query=None,
+        limit=None,
+        archive=None,
+        max_workers=4,
+        chunk_size=1024 * 1024,
+        progress=None,
+        dedupe=None,
+    ):
+        """
+        Exports the MIME (eml) content of the messages of this folder.
+        Messages are listed selecting only their ids and their content is
+        streamed to disk, several messages at the same time.
+
+        The export is resumable: messages already exported to to_path are
+        skipped, so an interrupted export can be run again.
+
+        :param to_path: the folder where to write one .eml file per message
+         (named after the base32 of the message id) or the archive file when
+         archive is set
+        :type to_path: str or Path
+        :param query: only export the messages matching this filter
+        :type query: Query or str
+        :param int limit: max no. of messages to export (None for all)
+        :param str archive: write every message to a single 'mbox' or 'zip'
+         file instead of one file per message
+        :param int max_workers: max no. of messages downloaded at the same time
+        :param int chunk_size: size of the chunks read from the responses
+        :param progress: called with (message id, exported count) after each
+         exported message
+        :param dedupe: skip the messages already seen by this index (before
+         downloading them) and mark the exported ones as seen
+        :type dedupe: O365.dedupe.DedupeIndex
+        :return: the no. of 'exported' and 'skipped' messages, the 'failed'
+         message ids with their error and with dedupe the no. of
+         'duplicated' messages
+        :rtype: dict
+        """
+        if archive not in (None, "mbox", "zip"):
+            raise ValueError("archive must be None, 'mbox' or 'zip'")
+        to_path = Path(to_path)
+
+        if archive is None:
+            to_path.mkdir(parents=True, exist_ok=True)
+            done = {path.name for path in to_path.glob("*.eml")}
+        elif archive == "zip":
+            done = set()
+            if to_path.exists():
+                with zipfile.ZipFile(to_path) as zip_file:
+                    done = set(zip_file.namelist())
+        else:
+            ids_path = to_path.with_name(to_path.name + ".ids")
+            done = set(ids_path.read_text().split()) if ids_path.exists() else set()
+
+        result = {"exported": 0, "skipped": 0, "failed": {}}
+        fields = ["received"]
+        if dedupe is not None:
+            result["duplicated"] = 0
+            fields.extend(dedupe.fields)
+        messages = self.get_messages(
+            limit=limit, query=query, batch=self.protocol.max_top_value,
+            raw=True, fields=fields,
+        )
+        # dedupe keys of the messages being exported, released once written or failed
+        in_flight = {}
+        in_flight_keys = set()
+        exported_keys = []  # written but not yet committed to the dedupe index
+
+        def mark_exported():
+            if exported_keys:
+                dedupe.add(exported_keys)
+                in_flight_keys.difference_update(exported_keys)
+                exported_keys.clear()
+
+        def pending():
+            for message in messages:
+                message_id = message.get(self._cc("id"))
+                if self._mime_file_name(message_id) in done or message_id in done:
+                    result["skipped"] += 1
+                    continue
+                if dedupe is not None:
+                    key = dedupe.key_of(message)
+                    if key in in_flight_keys or dedupe.seen(key):
+                        result["duplicated"] += 1
+                        continue
+                    in_flight[message_id] = key
+                    in_flight_keys.add(key)
+                received = message.get(self._cc("receivedDateTime"))
+                yield message_id, parse_datetime(received) if received else None
+
+        def exported(message_id):
+            key = in_flight.pop(message_id, None)
+            if key is not None:
+                exported_keys.append(key)
+                if len(exported_keys) >= 500:
+                    mark_exported()
+            result["exported"] += 1
+            if progress is not None:
+                progress(message_id, result["exported"])
+
+        def failed(message_id, error):
+            log.error("Error exporting message {}: {}".format(message_id, error))
+            result["failed"][message_id] = str(error)
+            in_flight_keys.discard(in_flight.pop(message_id, None))
+
+        if archive is None:
+            def download(message_id):
+                path = to_path / self._mime_file_name(message_id)
+                part = path.with_name(path.name + ".part")
+                try:
+                    with part.open("wb") as file:
+                        self._download_mime(message_id, file, chunk_size)
+                    part.replace(path)  # only complete files count as exported
+                except Exception:
+                    part.unlink(missing_ok=True)
+                    raise
+
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                    futures = {}
+                    for message_id, _ in pending():
+                        futures[executor.submit(download, message_id)] = message_id
+                        if len(futures) >= max_workers * 4:
+                            self._collect_exports(futures, exported, failed, wait_all=False)
+                    self._collect_exports(futures, exported, failed, wait_all=True)
+            finally:
+                mark_exported()
+            return result
+
+        def download(message_id):
+            # spooled: small messages stay in memory, large ones go to disk
+            spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            try:
+                self._download_mime(message_id, spool, chunk_size)
+            except Exception:
+                spool.close()
+                raise
+            spool.seek(0)
+            return spool
+
+        if archive == "zip":
+            writer = zipfile.ZipFile(to_path, "a", compression=zipfile.ZIP_DEFLATED)
+            ids_file = None
+        else:
+            writer = to_path.open("ab")
+            ids_file = ids_path.open("a")
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                window = deque()
+
+                def write_next():
+                    message_id, received, future = window.popleft()
+                    try:
+                        spool = future.result()
+                    except Exception as e:
+                        failed(message_id, e)
+                        return
+                    with spool:
+                        if archive == "zip":
+                            with writer.open(self._mime_file_name(message_id), "w") as entry:
+                                shutil.copyfileobj(spool, entry, chunk_size)
+                        else:
+                            self._write_mbox_message(writer, spool, received)
+                            writer.flush()
+                            ids_file.write(message_id + "\n")
+                            ids_file.flush()
+                    exported(message_id)
+
+                # downloads run ahead while the messages are written in order
+                for message_id, received in pending():
+                    window.append((message_id, received, executor.submit(download, message_id)))
+                    if len(window) >= max_workers * 2:
+                        write_next()
+                while window:
+                    write_next()
+        finally:
+            mark_exported()
+            writer.close()
+            if ids_file is not None:
+                ids_file.close()
+        return result
+
+    @staticmethod
+    def _collect_exports(futures, exported, failed, wait_all):
+        done, _ = wait(futures, return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+        for future in done:
+            message_id = futures.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                failed(message_id, e)
+            else:
+                exported(message_id)
+
     def create_child_folder(self, folder_name):
         """Creates a new child folder under this folder
 
@@ -533,6 +1113,8 @@ class Folder(ApiComponent):
         if not response:
             return None
 
+        self._invalidate_folder_tree()
+
         folder = response.json()
 
         self_class = getattr(self, "folder_constructor", type(self))
@@ -638,7 +1220,9 @@ class Folder(ApiComponent):
             return self.parent
 
         if self.parent_id:
-            self.parent = self.get_folder(folder_id=self.parent_id)
+            self.parent = self._identity_lookup(
+                "mail_folder", self.parent_id,
+                lambda: self.get_folder(folder_id=self.parent_id))
         return self.parent
 
     def update_folder_name(self, name, update_folder_data=True):
@@ -654,6 +1238,9 @@ class Folder(ApiComponent):
         if not name:
             return False
 
+        self._identity_invalidate("mail_folder", self.folder_id)
+        self._invalidate_folder_tree()
+
         url = self.build_url(
             self._endpoints.get("get_folder").format(id=self.folder_id)
         )
@@ -687,6 +1274,9 @@ class Folder(ApiComponent):
         if self.root or not self.folder_id:
             return False
 
+        self._identity_invalidate("mail_folder", self.folder_id)
+        self._invalidate_folder_tree()
+
         url = self.build_url(
             self._endpoints.get("get_folder").format(id=self.folder_id)
         )
@@ -721,6 +1311,8 @@ class Folder(ApiComponent):
         if not response:
             return None
 
+        self._invalidate_folder_tree()
+
         folder = response.json()
 
         self_class = getattr(self, "folder_constructor", type(self))
@@ -748,6 +1340,9 @@ class Folder(ApiComponent):
         if self.root or not self.folder_id or not to_folder_id:
             return False
 
+        self._identity_invalidate("mail_folder", self.folder_id)
+        self._invalidate_folder_tree()
+
         url = self.build_url(
             self._endpoints.get("move_folder").format(id=self.folder_id)
         )
@@ -806,6 +1401,116 @@ class Folder(ApiComponent):
         return bool(response)
 
 
+class FolderTree:
+    """ The whole folder hierarchy of a mailbox, indexed by path and id.
+
+    Paths are the folder names joined by '/' (ie. 'Inbox/Customers/ACME')
+    and are matched case insensitively, as Exchange does.
+    """
+
+    separator = "/"
+
+    def __init__(self, mailbox, folders):
+        """
+        :param MailBox mailbox: the mailbox of the folders
+        :param folders: every folder of the mailbox. Folders whose parent is
+         not in the list are placed at the top level
+        :type folders: list[mailbox.Folder]
+        """
+        #: The mailbox root folder. |br| **Type:** MailBox
+        self.mailbox = mailbox
+        #: When the tree was fetched. |br| **Type:** datetime
+        self.updated_at = dt.datetime.now()
+        #: Whether the tree is outdated. |br| **Type:** bool
+        self.stale = False
+        self._by_id = {folder.folder_id: folder for folder in folders}
+        self._children = {}
+        for folder in folders:
+            parent = self._by_id.get(folder.parent_id)
+            folder.parent = parent or mailbox
+            self._children.setdefault(parent.folder_id if parent else None, []).append(folder)
+
+        self._paths = {}
+        self._by_path = {}
+        pending = [(folder, folder.name) for folder in self._children.get(None, [])]
+        while pending:
+            folder, path = pending.pop()
+            self._paths[folder.folder_id] = path
+            self._by_path[path.lower()] = folder
+            pending.extend((child, path + self.separator + child.name)
+                           for child in self._children.get(folder.folder_id, []))
+
+    def __repr__(self):
+        return "Folder tree of {} ({} folders)".format(self.mailbox.main_resource, len(self))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def __getitem__(self, path):
+        folder = self.get(path)
+        if folder is None:
+            raise KeyError(path)
+        return folder
+
+    def get(self, path):
+        """ Returns the folder at path or None
+
+        :param str path: the folder path (ie. 'Inbox/Customers/ACME')
+        :rtype: mailbox.Folder
+        """
+        return self._by_path.get(path.strip(self.separator).lower())
+
+    def get_by_id(self, folder_id):
+        """ Returns the folder with this id or None
+
+        :param str folder_id: the folder id
+        :rtype: mailbox.Folder
+        """
+        return self._by_id.get(folder_id)
+
+    def path_of(self, folder):
+        """ Returns the path of a folder or None if it's not in the tree
+
+        :param folder: the folder or folder id
+        :type folder: mailbox.Folder or str
+        :rtype: str
+        """
+        folder_id = folder.folder_id if isinstance(folder, Folder) else folder
+        return self._paths.get(folder_id)
+
+    def children_of(self, folder=None):
+        """ Returns the child folders of a folder
+
+        :param folder: the folder, folder id or path. None for the top level
+        :type folder: mailbox.Folder or str
+        :rtype: list[mailbox.Folder]
+        """
+        if isinstance(folder, str):
+            folder = self.get_by_id(folder) or self.get(folder)
+            if folder is None:
+                return []
+        return list(self._children.get(folder.folder_id if folder is not None else None, []))
+
+    def walk(self):
+        """ Yields every (path, folder) of the tree, sorted by path
+
+        :rtype: generator[tuple[str, mailbox.Folder]]
+        """
+        for folder_id, path in sorted(self._paths.items(), key=lambda item: item[1].lower()):
+            yield path, self._by_id[folder_id]
+
+    def invalidate(self):
+        """ Marks the tree as outdated: the next
+        :meth:`MailBox.get_folder_tree` call fetches it again """
+        self.stale = True
+
+
 class MailBox(Folder):
     """The mailbox folder."""
 
@@ -815,6 +1520,91 @@ class MailBox(Folder):
     def __init__(self, *, parent=None, con=None, **kwargs):
         super().__init__(parent=parent, con=con, root=True, **kwargs)
         self._endpoints["settings"] = "/mailboxSettings"
+        self._folder_tree = None
+
+    def _fetch_child_folders(self, folder, params):
+        """ Returns the cloud data of every child folder of folder """
+        if folder.root:
+            url = self.build_url(self._endpoints.get("root_folders"))
+        else:
+            url = self.build_url(
+                self._endpoints.get("child_folders").format(id=folder.folder_id)
+            )
+        children = []
+        while url:
+            response = self.con.get(url, params=params)
+            if not response:
+                break
+            data = response.json()
+            children.extend(data.get("value", []))
+            url, params = data.get(NEXT_LINK_KEYWORD), None
+        return children
+
+    def get_folder_tree(self, *, refresh=False, max_age=None, include_hidden=False,
+                        use_delta=False, max_workers=4):
+        """ Returns the whole folder hierarchy of this mailbox with path and id
+        lookups. The tree is cached until invalidated (also by the changes
+        made through Folder methods) or older than max_age.
+
+        :param bool refresh: fetch the tree even if there is a cached one
+        :param int max_age: max seconds to use the cached tree
+        :param bool include_hidden: include the hidden folders
+        :param bool use_delta: fetch every folder through mailFolders/delta
+         pages instead of the child folders of each folder
+        :param int max_workers: max no. of folders whose children are
+         fetched at the same time
+        :rtype: FolderTree
+        """
+        tree = self._folder_tree
+        if (tree is not None and not refresh and not tree.stale and
+                (max_age is None or
+                 (dt.datetime.now() - tree.updated_at).total_seconds() <= max_age)):
+            return tree
+
+        self_class = getattr(self, "folder_constructor", type(self))
+
+        def build(data):
+            # Everything received from cloud must be passed as self._cloud_data_key
+            return self_class(parent=self, **{self._cloud_data_key: data})
+
+        if use_delta:
+            folders = [build(data) for data in self._fetch_child_folders_delta()]
+        else:
+            params = {"$top": self.protocol.max_top_value}
+            if include_hidden:
+                params["includeHiddenFolders"] = "true"
+            folders = []
+            level = [self]
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                while level:
+                    pending = [folder for folder in level
+                               if folder.root or folder.child_folders_count]
+                    children = executor.map(
+                        lambda folder: self._fetch_child_folders(folder, params), pending)
+                    level = [build(data) for page in children for data in page]
+                    folders.extend(level)
+
+        self._folder_tree = FolderTree(self, folders)
+        return self._folder_tree
+
+    def _fetch_child_folders_delta(self):
+        url = self.build_url(self._endpoints.get("root_folders_delta"))
+        params = {"$top": self.protocol.max_top_value}
+        folders = {}
+        while url:
+            response = self.con.get(url, params=params)
+            if not response:
+                break
+            data = response.json()
+            for folder in data.get("value", []):
+                if "@removed" not in folder:
+                    folders[folder.get(self._cc("id"))] = folder
+            url, params = data.get(NEXT_LINK_KEYWORD), None
+        return list(folders.values())
+
+    def invalidate_folder_tree(self):
+        """ Discards the cached folder tree """
+        self._folder_tree = None
 
     def set_automatic_reply(
         self,
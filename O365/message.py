@@ -5,7 +5,6 @@ from pathlib import Path
 
 # noinspection PyPep8Naming
 from bs4 import BeautifulSoup as bs
-from dateutil.parser import parse
 
 from .calendar import Event
 from .category import Category
@@ -15,11 +14,15 @@ from .utils import (
     BaseAttachment,
     BaseAttachments,
     CaseEnum,
+    FieldTableMixin,
     HandleRecipientsMixin,
     ImportanceLevel,
+    LazyDecodeMixin,
+    ModelField,
     OutlookWellKnowFolderNames,
     Recipient,
     TrackerSet,
+    parse_datetime,
 )
 
 log = logging.getLogger(__name__)
@@ -288,7 +291,8 @@ class MessageFlag(ApiComponent):
 
         return data
 
-class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
+class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin, LazyDecodeMixin,
+              FieldTableMixin):
     """Management of the process of sending, receiving, reading, and
     editing emails."""
 
@@ -305,6 +309,104 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         "forward_message": "/messages/{id}/createForward",
         "get_mime": "/messages/{id}/$value",
     }
+    _lazy_fields = {
+        "_Message__created": lambda self, data: self._datetime_from_cloud(data, "createdDateTime"),
+        "_Message__modified": lambda self, data: self._datetime_from_cloud(data, "lastModifiedDateTime"),
+        "_Message__received": lambda self, data: self._datetime_from_cloud(data, "receivedDateTime"),
+        "_Message__sent": lambda self, data: self._datetime_from_cloud(data, "sentDateTime"),
+        "_Message__attachments": lambda self, data: self._attachments_from_cloud(data),
+        "_Message__sender": lambda self, data: self._recipient_from_cloud(
+            data.get(self._cc("from"), None), field=self._cc("from")),
+        "_Message__to": lambda self, data: self._recipients_from_cloud(
+            data.get(self._cc("toRecipients"), []), field=self._cc("toRecipients")),
+        "_Message__cc": lambda self, data: self._recipients_from_cloud(
+            data.get(self._cc("ccRecipients"), []), field=self._cc("ccRecipients")),
+        "_Message__bcc": lambda self, data: self._recipients_from_cloud(
+            data.get(self._cc("bccRecipients"), []), field=self._cc("bccRecipients")),
+        "_Message__reply_to": lambda self, data: self._recipients_from_cloud(
+            data.get(self._cc("replyTo"), []), field=self._cc("replyTo")),
+        "_Message__importance": lambda self, data: ImportanceLevel.from_value(
+            data.get(self._cc("importance"), "normal") or "normal"),
+        "_Message__meeting_message_type": lambda self, data: self._meeting_message_type_from_cloud(data),
+        "_Message__flag": lambda self, data: MessageFlag(
+            parent=self, flag_data=data.get(self._cc("flag"), {})),
+    }  #: :meta private:
+    _select_map = {
+        "object_id": ("id",),
+        "created": ("createdDateTime",),
+        "modified": ("lastModifiedDateTime",),
+        "received": ("receivedDateTime",),
+        "sent": ("sentDateTime",),
+        "sender": ("from",),
+        "to": ("toRecipients",),
+        "cc": ("ccRecipients",),
+        "bcc": ("bccRecipients",),
+        "reply_to": ("replyTo",),
+        "attachments": ("hasAttachments",),
+        "folder_id": ("parentFolderId",),
+        "message_headers": ("internetMessageHeaders",),
+        "meeting_message_type": ("meetingMessageType",),
+        "is_event_message": ("meetingMessageType",),
+        "body": ("body",),
+        "body_type": ("body",),
+        "unique_body_type": ("uniqueBody",),
+        "importance": ("importance",),
+        "flag": ("flag",),
+        "get_body_text": ("body",),
+        "get_body_soup": ("body",),
+    }  #: :meta private:
+    _select_required = ("id", "isDraft")  #: :meta private:
+    _fields = (
+        ModelField("inferenceClassification", "_Message__inference_classification"),
+        ModelField("hasAttachments", "_Message__has_attachments", default=False),
+        ModelField("subject", "_Message__subject", default=""),
+        ModelField("bodyPreview", "_Message__body_preview", default=""),
+        ModelField("categories", "_Message__categories", default=list),
+        ModelField("isRead", "_Message__is_read"),
+        ModelField("isReadReceiptRequested", "_Message__is_read_receipt_requested",
+                   default=False),
+        ModelField("isDeliveryReceiptRequested", "_Message__is_delivery_receipt_requested",
+                   default=False),
+        ModelField("singleValueExtendedProperties",
+                   "_Message__single_value_extended_properties", default=list),
+        ModelField("conversationId", "conversation_id"),
+        ModelField("conversationIndex", "conversation_index"),
+        ModelField("parentFolderId", "folder_id"),
+        ModelField("internetMessageId", "internet_message_id", default=""),
+        ModelField("webLink", "web_link", default=""),
+        # Headers only retrieved when selecting 'internetMessageHeaders'
+        ModelField("internetMessageHeaders", "_Message__message_headers", default=list),
+    )  #: :meta private:
+    _state_fields = (
+        ModelField("id", "object_id"),
+        ModelField("isDraft", "_Message__is_draft"),
+        ModelField("createdDateTime", "_Message__created"),
+        ModelField("lastModifiedDateTime", "_Message__modified"),
+        ModelField("receivedDateTime", "_Message__received"),
+        ModelField("sentDateTime", "_Message__sent"),
+        ModelField("from", "_Message__sender",
+                   serializer=lambda value, message: message._recipient_to_cloud(value)),
+        ModelField("meetingMessageType", "_Message__meeting_message_type",
+                   serializer=lambda value, message: message._cc(value.value) if value else "none"),
+        ModelField("uniqueBody", "_Message__unique_body", serializer=lambda value, message: {
+            message._cc("contentType"): message.unique_body_type, message._cc("content"): value}),
+        # to_api_data leaves out the ids and sizes of the attachments
+        ModelField("attachments", "_Message__attachments", serializer=lambda value, message: [
+            dict(attachment.to_api_data(), **{message._cc("id"): attachment.attachment_id,
+                                              message._cc("size"): attachment.size})
+            for attachment in value]),
+    )  #: :meta private:
+
+    #: The ID of the conversation the email belongs to. |br| **Type:** str
+    conversation_id = None
+    #: Indicates the position of the message within the conversation. |br| **Type:** any
+    conversation_index = None
+    #: The unique identifier for the message's parent mailFolder. |br| **Type:** str
+    folder_id = None
+    #: The message ID in the format specified by RFC2822. |br| **Type:** str
+    internet_message_id = None
+    #: The URL to open the message in Outlook on the web. |br| **Type:** str
+    web_link = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """Makes a new message wrapper for sending and receiving messages.
@@ -318,6 +420,9 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
          (kwargs)
         :param bool download_attachments: whether or not to
          download attachments (kwargs)
+        :param bool lazy: keep the raw cloud data and decode dates,
+         recipients, attachments, flag, importance and meeting type
+         the first time they are accessed (kwargs)
         """
         if parent and con:
             raise ValueError("Need a parent or a connection but not both")
@@ -344,35 +449,8 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         self._track_changes = TrackerSet(casing=cc)
         #: Unique identifier for the message. |br| **Type:** str
         self.object_id = cloud_data.get(cc("id"), kwargs.get("object_id", None))
+        self._load_fields(cloud_data)
 
-        self.__inference_classification = cloud_data.get(
-            cc("inferenceClassification"), None
-        )
-
-        self.__created = cloud_data.get(cc("createdDateTime"), None)
-        self.__modified = cloud_data.get(cc("lastModifiedDateTime"), None)
-        self.__received = cloud_data.get(cc("receivedDateTime"), None)
-        self.__sent = cloud_data.get(cc("sentDateTime"), None)
-
-        local_tz = self.protocol.timezone
-        self.__created = (
-            parse(self.__created).astimezone(local_tz) if self.__created else None
-        )
-        self.__modified = (
-            parse(self.__modified).astimezone(local_tz) if self.__modified else None
-        )
-        self.__received = (
-            parse(self.__received).astimezone(local_tz) if self.__received else None
-        )
-        self.__sent = parse(self.__sent).astimezone(local_tz) if self.__sent else None
-
-        self.__attachments = MessageAttachments(parent=self, attachments=[])
-        self.__attachments.add(
-            {self._cloud_data_key: cloud_data.get(cc("attachments"), [])}
-        )
-        self.__has_attachments = cloud_data.get(cc("hasAttachments"), False)
-        self.__subject = cloud_data.get(cc("subject"), "")
-        self.__body_preview = cloud_data.get(cc("bodyPreview"), "")
         body = cloud_data.get(cc("body"), {})
         self.__body = body.get(cc("content"), "")
         #: The body type of the message. |br| **Type:** bodyType
@@ -386,77 +464,42 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
             cc("contentType"), "HTML"
         )  # default to HTML for new messages
 
+        # a message is a draft by default
+        self.__is_draft = cloud_data.get(cc("isDraft"), kwargs.get("is_draft", True))
+
+        # dates, recipients, attachments, flag, etc. are decoded now or on first access
+        self._init_lazy_fields(cloud_data, lazy=kwargs.get("lazy", False))
+
         if download_attachments and self.has_attachments:
             self.attachments.download_attachments()
 
-        self.__sender = self._recipient_from_cloud(
-            cloud_data.get(cc("from"), None), field=cc("from")
-        )
-        self.__to = self._recipients_from_cloud(
-            cloud_data.get(cc("toRecipients"), []), field=cc("toRecipients")
-        )
-        self.__cc = self._recipients_from_cloud(
-            cloud_data.get(cc("ccRecipients"), []), field=cc("ccRecipients")
-        )
-        self.__bcc = self._recipients_from_cloud(
-            cloud_data.get(cc("bccRecipients"), []), field=cc("bccRecipients")
-        )
-        self.__reply_to = self._recipients_from_cloud(
-            cloud_data.get(cc("replyTo"), []), field=cc("replyTo")
-        )
-        self.__categories = cloud_data.get(cc("categories"), [])
+    def __str__(self):
+        return self.__repr__()
 
-        self.__importance = ImportanceLevel.from_value(
-            cloud_data.get(cc("importance"), "normal") or "normal"
-        )
-        self.__is_read = cloud_data.get(cc("isRead"), None)
+    def __repr__(self):
+        return "Subject: {}".format(self.subject)
 
-        self.__is_read_receipt_requested = cloud_data.get(
-            cc("isReadReceiptRequested"), False
-        )
-        self.__is_delivery_receipt_requested = cloud_data.get(
-            cc("isDeliveryReceiptRequested"), False
-        )
+    def _datetime_from_cloud(self, cloud_data, key):
+        """ Parses a cloud datetime into the protocol timezone """
+        value = cloud_data.get(self._cc(key), None)
+        return parse_datetime(value).astimezone(self.protocol.timezone) if value else None
 
-        self.__single_value_extended_properties = cloud_data.get(
-            cc("singleValueExtendedProperties"), []
+    def _attachments_from_cloud(self, cloud_data):
+        """ Builds the attachments collection from the cloud data """
+        attachments = MessageAttachments(parent=self, attachments=[])
+        attachments.add(
+            {self._cloud_data_key: cloud_data.get(self._cc("attachments"), [])}
         )
+        return attachments
 
-        # if this message is an EventMessage:
-        meeting_mt = cloud_data.get(cc("meetingMessageType"), "none")
+    def _meeting_message_type_from_cloud(self, cloud_data):
+        """ Returns the MeetingMessageType if this message is an EventMessage """
+        meeting_mt = cloud_data.get(self._cc("meetingMessageType"), "none")
 
         # hack to avoid typo in EventMessage between Api v1.0 and beta:
         meeting_mt = meeting_mt.replace("Tenatively", "Tentatively")
 
-        self.__meeting_message_type = (
-            MeetingMessageType.from_value(meeting_mt) if meeting_mt != "none" else None
-        )
-
-        # a message is a draft by default
-        self.__is_draft = cloud_data.get(cc("isDraft"), kwargs.get("is_draft", True))
-        #: The ID of the conversation the email belongs to. |br| **Type:** str
-        self.conversation_id = cloud_data.get(cc("conversationId"), None)
-        #: Indicates the position of the message within the conversation. |br| **Type:** any
-        self.conversation_index = cloud_data.get(cc("conversationIndex"), None)
-        #: The unique identifier for the message's parent mailFolder. |br| **Type:** str
-        self.folder_id = cloud_data.get(cc("parentFolderId"), None)
-
-        flag_data = cloud_data.get(cc("flag"), {})
-        self.__flag = MessageFlag(parent=self, flag_data=flag_data)
-
-        #: The message ID in the format specified by RFC2822. |br| **Type:** str
-        self.internet_message_id = cloud_data.get(cc("internetMessageId"), "")
-        #: The URL to open the message in Outlook on the web. |br| **Type:** str
-        self.web_link = cloud_data.get(cc("webLink"), "")
-
-        # Headers only retrieved when selecting 'internetMessageHeaders'
-        self.__message_headers = cloud_data.get(cc("internetMessageHeaders"), [])
-
-    def __str__(self):
-        return self.__repr__()
-
-    def __repr__(self):
-        return "Subject: {}".format(self.subject)
+        return MeetingMessageType.from_value(meeting_mt) if meeting_mt != "none" else None
 
     def __eq__(self, other):
         return self.object_id == other.object_id
@@ -1178,9 +1221,9 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
             self.__created = message.get(self._cc('createdDateTime'),None)
             self.__modified = message.get(self._cc('lastModifiedDateTime'),None)
 
-            self.__created = parse(self.__created).astimezone(
+            self.__created = parse_datetime(self.__created).astimezone(
                 self.protocol.timezone) if self.__created else None
-            self.__modified = parse(self.__modified).astimezone(
+            self.__modified = parse_datetime(self.__modified).astimezone(
                 self.protocol.timezone) if self.__modified else None
 
             self.web_link = message.get(self._cc('webLink'), '')
@@ -1222,20 +1265,24 @@ class Message(ApiComponent, AttachableMixin, HandleRecipientsMixin):
         if not self.is_event_message:
             return None
 
-        # select a dummy field (eg. subject) to avoid pull unneccesary data
-        query = self.q().expand('event')
+        def fetch():
+            # select a dummy field (eg. subject) to avoid pull unneccesary data
+            query = self.q().expand('event')
 
-        url = self.build_url(self._endpoints.get('get_message').format(id=self.object_id))
+            url = self.build_url(self._endpoints.get('get_message').format(id=self.object_id))
 
-        response = self.con.get(url, params=query.as_params())
+            response = self.con.get(url, params=query.as_params())
 
-        if not response:
-            return None
+            if not response:
+                return None
+
+            data = response.json()
+            event_data = data.get(self._cc('event'))
 
-        data = response.json()
-        event_data = data.get(self._cc('event'))
+            return Event(parent=self, **{self._cloud_data_key: event_data})
 
-        return Event(parent=self, **{self._cloud_data_key: event_data})
+        # cached by message id: Event.save/delete invalidate them all
+        return self._identity_lookup('message_event', self.object_id, fetch)
 
     def get_mime_content(self):
         """ Returns the MIME contents of this message """
@@ -0,0 +1,302 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from .utils.batch import is_retryable, retry_delay
+
+log = logging.getLogger(__name__)
+
+#: Max concurrent requests allowed by Exchange on a single mailbox
+MAILBOX_MAX_CONCURRENCY = 4
+
+
+class _OutboxItem:
+    __slots__ = ('message', 'save_to_sent_folder', 'future', 'submitted_at', 'attempts')
+
+    def __init__(self, message, save_to_sent_folder):
+        self.message = message
+        self.save_to_sent_folder = save_to_sent_folder
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.attempts = 0
+
+
+class _MailboxQueue:
+    __slots__ = ('items', 'in_flight', 'paused_until', 'sent', 'failed', 'throttled')
+
+    def __init__(self):
+        self.items = deque()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.throttled = 0
+
+
+class Outbox:
+    """ A pipeline that sends messages concurrently.
+
+    Messages are queued per sending mailbox (the message main_resource). Each
+    mailbox sends at most ``mailbox_concurrency`` messages at the same time
+    while different mailboxes are sent in parallel. A throttled mailbox is
+    paused for the time requested by the service (or an exponential backoff)
+    and its messages retried, without blocking the other mailboxes. As a send
+    is not idempotent, only throttled sends (429, 503) and connection errors
+    raised before the request was sent are retried.
+
+    An outbox bound to a parent (eg. an Account) creates its messages with
+    the parent connection and only accepts messages sent through it.
+    """
+
+    def __init__(self, parent=None, *, max_workers=16, mailbox_concurrency=MAILBOX_MAX_CONCURRENCY,
+                 max_retries=5, backoff=2.0, max_backoff=120.0, latency_samples=1000):
+        """
+        :param parent: the parent (eg. an Account) whose connection sends
+         the messages. Optional: an outbox without parent accepts messages
+         from any connection
+        :type parent: Account or MailBox
+        :param int max_workers: max no. of messages sent at the same time
+        :param int mailbox_concurrency: max no. of messages sent at the same
+         time from a single mailbox
+        :param int max_retries: max no. of retries of a throttled send
+        :param float backoff: seconds to wait after the first throttled send
+         when the service does not tell (doubles on each retry)
+        :param float max_backoff: max seconds to wait between retries
+        :param int latency_samples: no. of recent sends used for the latency
+         counters
+        """
+        #: The parent whose connection sends the messages. |br| **Type:** Account
+        self.parent = parent
+        #: Max no. of messages sent at the same time. |br| **Type:** int
+        self.max_workers = max_workers
+        #: Max no. of messages sent at the same time per mailbox. |br| **Type:** int
+        self.mailbox_concurrency = min(mailbox_concurrency, max_workers)
+        #: Max no. of retries of a throttled send. |br| **Type:** int
+        self.max_retries = max_retries
+        #: Initial backoff in seconds. |br| **Type:** float
+        self.backoff = backoff
+        #: Max backoff in seconds. |br| **Type:** float
+        self.max_backoff = max_backoff
+
+        self._condition = threading.Condition()
+        self._queues = OrderedDict()
+        self._workers = []
+        self._closed = False
+        self._started_at = None
+        self._submitted = 0
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._latencies = deque(maxlen=latency_samples)
+
+    def __repr__(self):
+        return 'Outbox: {} queued, {} sent'.format(self._queued(), self._sent)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(wait=exc_type is None)
+
+    def _queued(self):
+        return sum(len(queue.items) for queue in self._queues.values())
+
+    def _in_flight(self):
+        return sum(queue.in_flight for queue in self._queues.values())
+
+    def new_message(self, resource=None):
+        """ Creates a new draft message to be sent through this outbox
+
+        :param str resource: the mailbox sending the message (Defaults to
+         parent main_resource)
+        :return: New empty message
+        :rtype: Message
+        :raises RuntimeError: if the outbox has no parent
+        """
+        if self.parent is None:
+            raise RuntimeError('The outbox has no parent to create messages with')
+        from .message import Message
+        return Message(parent=self.parent, main_resource=resource, is_draft=True)
+
+    def submit(self, message, *, save_to_sent_folder=True):
+        """ Queues a message to be sent
+
+        :param Message message: the message to send
+        :param bool save_to_sent_folder: whether or not to save it to
+         sent folder
+        :return: a future resolved to True when the message is sent or to
+         the exception of the last try when it fails
+        :rtype: concurrent.futures.Future
+        :raises ValueError: if the message does not use the parent connection
+        """
+        if self.parent is not None and getattr(message, 'con', None) is not self.parent.con:
+            raise ValueError('The message is not sent through the outbox parent connection')
+        item = _OutboxItem(message, save_to_sent_folder)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('The outbox is closed')
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            mailbox = message.main_resource
+            queue = self._queues.get(mailbox)
+            if queue is None:
+                queue = self._queues[mailbox] = _MailboxQueue()
+            queue.items.append(item)
+            self._submitted += 1
+            if len(self._workers) < self.max_workers and len(self._workers) < self._submitted:
+                worker = threading.Thread(target=self._work, daemon=True,
+                                          name='O365-Outbox-{}'.format(len(self._workers)))
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify()
+        return item.future
+
+    def send_many(self, messages, *, save_to_sent_folder=True):
+        """ Queues many messages to be sent
+
+        :param messages: the messages to send
+        :param bool save_to_sent_folder: whether or not to save them to
+         sent folder
+        :return: a future for each message
+        :rtype: list[concurrent.futures.Future]
+        """
+        return [self.submit(message, save_to_sent_folder=save_to_sent_folder)
+                for message in messages]
+
+    def _next_item(self):
+        """ Returns the next (mailbox, item) ready to be sent, waiting for
+        it if needed. Returns None when the outbox is closed and empty.
+        Must be called holding the condition """
+        while True:
+            now = time.monotonic()
+            wake_at = None
+            for mailbox, queue in self._queues.items():
+                if not queue.items or queue.in_flight >= self.mailbox_concurrency:
+                    continue
+                if queue.paused_until > now:
+                    wake_at = min(wake_at or queue.paused_until, queue.paused_until)
+                    continue
+                # round robin: this mailbox goes after the others next time
+                self._queues.move_to_end(mailbox)
+                queue.in_flight += 1
+                return mailbox, queue.items.popleft()
+            if self._closed and not self._queued() and not self._in_flight():
+                return None
+            self._condition.wait(timeout=None if wake_at is None else wake_at - now)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                next_item = self._next_item()
+            if next_item is None:
+                return
+            mailbox, item = next_item
+
+            if item.attempts == 0 and not item.future.set_running_or_notify_cancel():
+                with self._condition:
+                    self._queues[mailbox].in_flight -= 1
+                    self._condition.notify_all()
+                continue
+
+            item.attempts += 1
+            error = None
+            try:
+                result = item.message.send(save_to_sent_folder=item.save_to_sent_folder)
+                if result is not True:
+                    error = result if isinstance(result, Exception) else RuntimeError(
+                        'The message could not be sent')
+            except Exception as e:
+                error = e
+
+            with self._condition:
+                queue = self._queues[mailbox]
+                queue.in_flight -= 1
+                if error is None:
+                    queue.sent += 1
+                    self._sent += 1
+                    self._latencies.append(time.monotonic() - item.submitted_at)
+                    item.future.set_result(True)
+                elif is_retryable(error) and item.attempts <= self.max_retries:
+                    delay = retry_delay(error, item.attempts, self.backoff, self.max_backoff)
+                    log.debug('Send from {} throttled. Retrying in {:.1f} seconds'.format(mailbox, delay))
+                    queue.throttled += 1
+                    queue.paused_until = max(queue.paused_until, time.monotonic() + delay)
+                    self._retried += 1
+                    queue.items.appendleft(item)  # keeps its place in the queue
+                else:
+                    queue.failed += 1
+                    self._failed += 1
+                    item.future.set_exception(error)
+                self._condition.notify_all()
+
+    def join(self, timeout=None):
+        """ Waits until every queued message is sent or failed
+
+        :param float timeout: max seconds to wait
+        :return: True if the outbox is empty
+        :rtype: bool
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queued() or self._in_flight():
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(timeout=remaining)
+        return True
+
+    def close(self, wait=True):
+        """ Stops accepting messages
+
+        :param bool wait: wait for the queued messages to be sent. Otherwise
+         the queued messages are cancelled
+        """
+        with self._condition:
+            self._closed = True
+            if not wait:
+                for queue in self._queues.values():
+                    while queue.items:
+                        future = queue.items.popleft().future
+                        if not future.cancel():  # a throttled message waiting to retry
+                            future.set_exception(RuntimeError('The outbox was closed'))
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    @property
+    def stats(self):
+        """ The throughput and latency counters
+
+        :return: a dict with the counters: submitted, sent, failed, retried,
+         queued, in_flight, throughput (messages sent per second),
+         latency_avg and latency_p95 (seconds from submit to sent, over the
+         recent sends) and the per mailbox counters
+        :rtype: dict
+        """
+        with self._condition:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0
+            latencies = sorted(self._latencies)
+            return {
+                'submitted': self._submitted,
+                'sent': self._sent,
+                'failed': self._failed,
+                'retried': self._retried,
+                'queued': self._queued(),
+                'in_flight': self._in_flight(),
+                'throughput': self._sent / elapsed if elapsed else 0.0,
+                'latency_avg': sum(latencies) / len(latencies) if latencies else None,
+                'latency_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                if latencies else None,
+                'mailboxes': {
+                    mailbox: {
+                        'queued': len(queue.items),
+                        'in_flight': queue.in_flight,
+                        'sent': queue.sent,
+                        'failed': queue.failed,
+                        'throttled': queue.throttled,
+                    } for mailbox, queue in self._queues.items()
+                },
+            }
@@ -1,9 +1,8 @@
 import logging
 from datetime import date, datetime
 
-from dateutil.parser import parse
 
-from .utils import NEXT_LINK_KEYWORD, ApiComponent, Pagination
+from .utils import NEXT_LINK_KEYWORD, ApiComponent, Pagination, parse_datetime
 
 log = logging.getLogger(__name__)
 
@@ -342,18 +341,18 @@ class Task(ApiComponent):
         local_tz = self.protocol.timezone
         #:  Date and time at which the task starts. |br| **Type:** datetime
         self.start_date_time = (
-            parse(start_date_time).astimezone(local_tz) if start_date_time else None
+            parse_datetime(start_date_time).astimezone(local_tz) if start_date_time else None
         )
         #:  Date and time at which the task is created. |br| **Type:** datetime
-        self.created_date = parse(created).astimezone(local_tz) if created else None
+        self.created_date = parse_datetime(created).astimezone(local_tz) if created else None
         #:  Date and time at which the task is due.  |br| **Type:** datetime
         self.due_date_time = (
-            parse(due_date_time).astimezone(local_tz) if due_date_time else None
+            parse_datetime(due_date_time).astimezone(local_tz) if due_date_time else None
         )
         #:  Date and time at which the 'percentComplete' of the task is set to '100'.
         #: |br| **Type:** datetime
         self.completed_date = (
-            parse(completed_date).astimezone(local_tz) if completed_date else None
+            parse_datetime(completed_date).astimezone(local_tz) if completed_date else None
         )
         #:  his sets the type of preview that shows up on the task.
         #: The possible values are: automatic, noPreview, checklist, description, reference.
@@ -687,6 +686,8 @@ class Bucket(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate("bucket", self.object_id)
+
         url = self.build_url(self._endpoints.get("bucket").format(id=self.object_id))
 
         data = {
@@ -726,6 +727,8 @@ class Bucket(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate("bucket", self.object_id)
+
         url = self.build_url(self._endpoints.get("bucket").format(id=self.object_id))
 
         response = self.con.delete(url, headers={"If-Match": self._etag})
@@ -923,6 +926,8 @@ class Plan(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate("plan", self.object_id)
+
         url = self.build_url(self._endpoints.get("plan").format(id=self.object_id))
 
         data = {
@@ -960,6 +965,8 @@ class Plan(ApiComponent):
         if not self.object_id:
             return False
 
+        self._identity_invalidate("plan", self.object_id)
+
         url = self.build_url(self._endpoints.get("plan").format(id=self.object_id))
 
         response = self.con.delete(url, headers={"If-Match": self._etag})
@@ -1050,21 +1057,24 @@ class Planner(ApiComponent):
         if not plan_id:
             raise RuntimeError("Provide the plan_id")
 
-        url = self.build_url(
-            self._endpoints.get("get_plan_by_id").format(plan_id=plan_id)
-        )
+        def fetch():
+            url = self.build_url(
+                self._endpoints.get("get_plan_by_id").format(plan_id=plan_id)
+            )
 
-        response = self.con.get(url)
+            response = self.con.get(url)
 
-        if not response:
-            return None
+            if not response:
+                return None
 
-        data = response.json()
+            data = response.json()
 
-        return self.plan_constructor(
-            parent=self,
-            **{self._cloud_data_key: data},
-        )
+            return self.plan_constructor(
+                parent=self,
+                **{self._cloud_data_key: data},
+            )
+
+        return self._identity_lookup("plan", plan_id, fetch)
 
     def get_bucket_by_id(self, bucket_id=None):
         """Returns Microsoft 365/AD plan with given id
@@ -1077,18 +1087,21 @@ class Planner(ApiComponent):
         if not bucket_id:
             raise RuntimeError("Provide the bucket_id")
 
-        url = self.build_url(
-            self._endpoints.get("get_bucket_by_id").format(bucket_id=bucket_id)
-        )
+        def fetch():
+            url = self.build_url(
+                self._endpoints.get("get_bucket_by_id").format(bucket_id=bucket_id)
+            )
 
-        response = self.con.get(url)
+            response = self.con.get(url)
 
-        if not response:
-            return None
+            if not response:
+                return None
 
-        data = response.json()
+            data = response.json()
+
+            return self.bucket_constructor(parent=self, **{self._cloud_data_key: data})
 
-        return self.bucket_constructor(parent=self, **{self._cloud_data_key: data})
+        return self._identity_lookup("bucket", bucket_id, fetch)
 
     def get_task_by_id(self, task_id=None):
         """Returns Microsoft 365/AD plan with given id
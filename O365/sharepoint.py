@@ -1,10 +1,18 @@
 import logging
 
-from dateutil.parser import parse
 
 from .address_book import Contact
 from .drive import Storage
-from .utils import NEXT_LINK_KEYWORD, ApiComponent, Pagination, TrackerSet
+from .utils import (
+    NEXT_LINK_KEYWORD,
+    ApiComponent,
+    FieldTableMixin,
+    ModelField,
+    Pagination,
+    TrackerSet,
+    parse_datetime,
+    raw_cloud_values,
+)
 
 log = logging.getLogger(__name__)
 
@@ -81,9 +89,27 @@ class SharepointListColumn(ApiComponent):
         return self.object_id == other.object_id
 
 
-class SharepointListItem(ApiComponent):
+class SharepointListItem(ApiComponent, FieldTableMixin):
     _endpoints = {'update_list_item': '/items/{item_id}/fields',
                   'delete_list_item': '/items/{item_id}'}
+    _fields = (
+        ModelField('id', 'object_id'),
+        ModelField('createdDateTime', 'created', parser=ModelField.datetime_parser),
+        ModelField('lastModifiedDateTime', 'modified', parser=ModelField.datetime_parser),
+        ModelField('webUrl', 'web_url'),
+        ModelField('fields', 'fields'),
+    )  #: :meta private:
+
+    #: The unique identifier of the item. |br| **Type:** str
+    object_id = None
+    #: The date and time the item was created. |br| **Type:** datetime
+    created = None
+    #: The date and time the item was last modified. |br| **Type:** datetime
+    modified = None
+    #: URL that displays the item in the browser. |br| **Type:** str
+    web_url = None
+    #: The fields of the item. |br| **Type:** any
+    fields = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """ A Sharepoint ListItem within a SharepointList
@@ -112,15 +138,7 @@ class SharepointListItem(ApiComponent):
         cloud_data = kwargs.get(self._cloud_data_key, {})
 
         self._track_changes = TrackerSet(casing=self._cc)
-        #: The unique identifier of the item. |br| **Type:** str
-        self.object_id = cloud_data.get('id')
-        created = cloud_data.get(self._cc('createdDateTime'), None)
-        modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
-        local_tz = self.protocol.timezone
-        #: The date and time the item was created. |br| **Type:** datetime
-        self.created = parse(created).astimezone(local_tz) if created else None
-        #: The date and time the item was last modified. |br| **Type:** datetime
-        self.modified = parse(modified).astimezone(local_tz) if modified else None
+        self._load_fields(cloud_data)
 
         created_by = cloud_data.get(self._cc('createdBy'), {}).get('user', None)
         #: Identity of the creator of this item. |br| **Type:** contact
@@ -131,15 +149,9 @@ class SharepointListItem(ApiComponent):
         self.modified_by = Contact(con=self.con, protocol=self.protocol,
                                    **{self._cloud_data_key: modified_by}) if modified_by else None
 
-        #: URL that displays the item in the browser. |br| **Type:** str
-        self.web_url = cloud_data.get(self._cc('webUrl'), None)
-
         #: The ID of the content type. |br| **Type:** str
         self.content_type_id = cloud_data.get(self._cc('contentType'), {}).get('id', None)
 
-        #: The fields of the item. |br| **Type:** any
-        self.fields = cloud_data.get(self._cc('fields'), None)
-
     def __repr__(self):
         return 'List Item: {}'.format(self.web_url)
 
@@ -258,9 +270,9 @@ class SharepointList(ApiComponent):
         modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
         local_tz = self.protocol.timezone
         #: The date and time when the item was created. |br| **Type:** datetime
-        self.created = parse(created).astimezone(local_tz) if created else None
+        self.created = parse_datetime(created).astimezone(local_tz) if created else None
         #: The date and time when the item was last modified. |br| **Type:** datetime
-        self.modified = parse(modified).astimezone(
+        self.modified = parse_datetime(modified).astimezone(
             local_tz) if modified else None
 
         created_by = cloud_data.get(self._cc('createdBy'), {}).get('user', None)
@@ -313,7 +325,8 @@ class SharepointList(ApiComponent):
             if result != '':
                 return 'fields(select=' + result.rstrip(',') + ')'
             
-    def get_items(self, limit=None, *, query=None, order_by=None, batch=None, expand_fields=None):
+    def get_items(self, limit=None, *, query=None, order_by=None, batch=None, expand_fields=None,
+                  raw=False):
         """Returns a collection of Sharepoint Items
 
         :param int limit: max no. of items to get. Over 999 uses batch.
@@ -326,8 +339,11 @@ class SharepointList(ApiComponent):
         :param expand_fields: specify user-defined fields to return,
          True will return all fields
         :type expand_fields: list or bool
+        :param raw: return the cloud dicts instead of SharepointListItem objects.
+         Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
         :return: list of Sharepoint Items
-        :rtype: list[SharepointListItem] or Pagination
+        :rtype: list[SharepointListItem] or list[dict] or Pagination
         """
 
         url = self.build_url(self._endpoints.get('get_items'))
@@ -357,12 +373,15 @@ class SharepointList(ApiComponent):
         data = response.json()
         next_link = data.get(NEXT_LINK_KEYWORD, None)
 
-        items = [self.list_item_constructor(parent=self, **{self._cloud_data_key: item})
-                 for item in data.get('value', [])]
+        if raw:
+            items = raw_cloud_values(data.get('value', []), raw)
+        else:
+            items = [self.list_item_constructor(parent=self, **{self._cloud_data_key: item})
+                     for item in data.get('value', [])]
 
         if batch and next_link:
             return Pagination(parent=self, data=items, constructor=self.list_item_constructor,
-                              next_link=next_link, limit=limit)
+                              next_link=next_link, limit=limit, raw=raw)
         else:
             return items
 
@@ -500,9 +519,9 @@ class Site(ApiComponent):
         modified = cloud_data.get(self._cc('lastModifiedDateTime'), None)
         local_tz = self.protocol.timezone
         #: The date and time the item was created. |br| **Type:** datetime
-        self.created = parse(created).astimezone(local_tz) if created else None
+        self.created = parse_datetime(created).astimezone(local_tz) if created else None
         #: The date and time the item was last modified. |br| **Type:** datttime
-        self.modified = parse(modified).astimezone(
+        self.modified = parse_datetime(modified).astimezone(
             local_tz) if modified else None
 
         # site storage to access Drives and DriveItems
@@ -5,9 +5,8 @@ import logging
 
 # noinspection PyPep8Naming
 from bs4 import BeautifulSoup as bs
-from dateutil.parser import parse
 
-from .utils import ApiComponent, TrackerSet
+from .utils import ApiComponent, FieldTableMixin, ModelField, TrackerSet, parse_datetime
 
 log = logging.getLogger(__name__)
 
@@ -236,19 +235,19 @@ class ChecklistItem(ApiComponent):
             self.__is_checked = item.get(self._cc("isChecked"), False)
 
             self.__created = (
-                parse(self.__created).astimezone(self.protocol.timezone)
+                parse_datetime(self.__created).astimezone(self.protocol.timezone)
                 if self.__created
                 else None
             )
             self.__checked = (
-                parse(self.__checked).astimezone(self.protocol.timezone)
+                parse_datetime(self.__checked).astimezone(self.protocol.timezone)
                 if self.__checked
                 else None
             )
         else:
             self.__checked = item.get(self._cc("checkedDateTime"), None)
             self.__checked = (
-                parse(self.__checked).astimezone(self.protocol.timezone)
+                parse_datetime(self.__checked).astimezone(self.protocol.timezone)
                 if self.__checked
                 else None
             )
@@ -256,7 +255,7 @@ class ChecklistItem(ApiComponent):
         return True
 
 
-class Task(ApiComponent):
+class Task(ApiComponent, FieldTableMixin):
     """A Microsoft To-Do task."""
 
     _endpoints = {
@@ -266,6 +265,17 @@ class Task(ApiComponent):
         CONST_TASK_FOLDER: "/todo/lists/{folder_id}/tasks",
     }
     checklist_item_constructor = ChecklistItem  #: :meta private:
+    _fields = (
+        ModelField("id", "task_id"),
+        ModelField("createdDateTime", "_Task__created", parser=ModelField.datetime_parser),
+        ModelField("lastModifiedDateTime", "_Task__modified", parser=ModelField.datetime_parser),
+        ModelField("status", "_Task__status"),
+        ModelField("importance", "_Task__importance"),
+        ModelField("isReminderOn", "_Task__is_reminder_on", default=False),
+    )  #: :meta private:
+
+    #: Unique identifier for the task. |br| **Type:** str
+    task_id = None
 
     def __init__(self, *, parent=None, con=None, **kwargs):
         """Representation of a Microsoft To-Do task.
@@ -304,8 +314,7 @@ class Task(ApiComponent):
         self.folder_id = kwargs.get("folder_id") or parent.folder_id
         cloud_data = kwargs.get(self._cloud_data_key, {})
 
-        #: Unique identifier for the task. |br| **Type:** str
-        self.task_id = cloud_data.get(cc("id"), None)
+        self._load_fields(cloud_data)
         self.__subject = cloud_data.get(cc("title"), kwargs.get("subject", "") or "")
         body = cloud_data.get(cc("body"), {})
         self.__body = body.get(cc("content"), "")
@@ -314,26 +323,13 @@ class Task(ApiComponent):
             cc("contentType"), "html"
         )  # default to HTML for new messages
 
-        self.__created = cloud_data.get(cc("createdDateTime"), None)
-        self.__modified = cloud_data.get(cc("lastModifiedDateTime"), None)
-        self.__status = cloud_data.get(cc("status"), None)
         self.__is_completed = self.__status == "completed"
-        self.__importance = cloud_data.get(cc("importance"), None)
-
-        local_tz = self.protocol.timezone
-        self.__created = (
-            parse(self.__created).astimezone(local_tz) if self.__created else None
-        )
-        self.__modified = (
-            parse(self.__modified).astimezone(local_tz) if self.__modified else None
-        )
 
         due_obj = cloud_data.get(cc("dueDateTime"), {})
         self.__due = self._parse_date_time_time_zone(due_obj)
 
         reminder_obj = cloud_data.get(cc("reminderDateTime"), {})
         self.__reminder = self._parse_date_time_time_zone(reminder_obj)
-        self.__is_reminder_on = cloud_data.get(cc("isReminderOn"), False)
 
         completed_obj = cloud_data.get(cc("completedDateTime"), {})
         self.__completed = self._parse_date_time_time_zone(completed_obj)
@@ -669,12 +665,12 @@ class Task(ApiComponent):
             self.__completed = task.get(self._cc("completed"), None)
 
             self.__created = (
-                parse(self.__created).astimezone(self.protocol.timezone)
+                parse_datetime(self.__created).astimezone(self.protocol.timezone)
                 if self.__created
                 else None
             )
             self.__modified = (
-                parse(self.__modified).astimezone(self.protocol.timezone)
+                parse_datetime(self.__modified).astimezone(self.protocol.timezone)
                 if self.__modified
                 else None
             )
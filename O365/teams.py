@@ -1,9 +1,8 @@
 import logging
 from enum import Enum
 
-from dateutil.parser import parse
 
-from .utils import NEXT_LINK_KEYWORD, ApiComponent, Pagination
+from .utils import NEXT_LINK_KEYWORD, ApiComponent, Pagination, parse_datetime
 
 log = logging.getLogger(__name__)
 
@@ -147,20 +146,20 @@ class ChatMessage(ApiComponent):
         last_edit = cloud_data.get('lastEditedDateTime')
         deleted = cloud_data.get('deletedDateTime')
         #: Timestamp of when the chat message was created. |br| **Type:** datetime
-        self.created_date = parse(created).astimezone(
+        self.created_date = parse_datetime(created).astimezone(
             local_tz) if created else None
         #: Timestamp when the chat message is created (initial setting)
         #: or modified, including when a reaction is added or removed.
         #: |br| **Type:** datetime
-        self.last_modified_date = parse(last_modified).astimezone(
+        self.last_modified_date = parse_datetime(last_modified).astimezone(
             local_tz) if last_modified else None
         #: Timestamp when edits to the chat message were made.
         #: Triggers an "Edited" flag in the Teams UI. |br| **Type:** datetime
-        self.last_edited_date = parse(last_edit).astimezone(
+        self.last_edited_date = parse_datetime(last_edit).astimezone(
             local_tz) if last_edit else None
         #: Timestamp at which the chat message was deleted, or null if not deleted.
         #: |br| **Type:** datetime
-        self.deleted_date = parse(deleted).astimezone(
+        self.deleted_date = parse_datetime(deleted).astimezone(
             local_tz) if deleted else None
 
         #: If the message was sent in a chat, represents the identity of the chat.
@@ -337,11 +336,11 @@ class Chat(ApiComponent):
         last_update = cloud_data.get('lastUpdatedDateTime')
         local_tz = self.protocol.timezone
         #: Date and time at which the chat was created. |br| **Type:** datetime
-        self.created_date = parse(created).astimezone(
+        self.created_date = parse_datetime(created).astimezone(
             local_tz) if created else None
         #: Date and time at which the chat was renamed or
         #: the list of members was last changed. |br| **Type:** datetime
-        self.last_update_date = parse(last_update).astimezone(
+        self.last_update_date = parse_datetime(last_update).astimezone(
             local_tz) if last_update else None
 
     def get_messages(self, limit=None, batch=None):
@@ -1,8 +1,15 @@
 from .attachment import BaseAttachments, BaseAttachment, AttachableMixin
-from .utils import ApiComponent, OutlookWellKnowFolderNames
+from .utils import ApiComponent, LazyDecodeMixin, OutlookWellKnowFolderNames, parse_datetime
+from .utils import merge_iterators, raw_cloud_values, snake_case_keys
+from .utils import FieldTableMixin, ModelField
+from .utils import LearnedProjection, select_fields
+from .utils import IdentityMap
+from .batch import BatchResponse, execute_batch, is_retryable, is_retryable_read, retry_delay
+from .snapshot import dump_snapshot, load_snapshot, dump_snapshots, load_snapshots
+from .delta import BaseDeltaStateBackend, MemoryDeltaStateBackend, FileSystemDeltaStateBackend, SQLiteDeltaStateBackend, RemovedItem
 from .utils import CaseEnum, ImportanceLevel, TrackerSet
 from .utils import Recipient, Recipients, HandleRecipientsMixin
-from .utils import NEXT_LINK_KEYWORD, ME_RESOURCE, USERS_RESOURCE
+from .utils import NEXT_LINK_KEYWORD, DELTA_LINK_KEYWORD, ME_RESOURCE, USERS_RESOURCE
 from .utils import OneDriveWellKnowFolderNames, Pagination
 from .token import BaseTokenBackend, FileSystemTokenBackend, FirestoreBackend, AWSS3Backend, AWSSecretsBackend, EnvTokenBackend, BitwardenSecretsManagerBackend, DjangoTokenBackend
 from .range import col_index_to_label
@@ -10,3 +17,4 @@ from .windows_tz import get_iana_tz, get_windows_tz
 from .consent import consent_input_token
 from .casing import to_snake_case, to_pascal_case, to_camel_case
 from .query import QueryBuilder, CompositeFilter
+from .query_compiler import compile_filter, compile_order_by
@@ -1,14 +1,20 @@
 import base64
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
 
+from requests.exceptions import RequestException
+
 from .utils import ApiComponent
 
 log = logging.getLogger(__name__)
 
 UPLOAD_SIZE_LIMIT_SIMPLE = 1024 * 1024 * 3  # 3 MB
 DEFAULT_UPLOAD_CHUNK_SIZE = 1024 * 1024 * 3
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
 
 class AttachableMixin:
@@ -117,8 +123,8 @@ class BaseAttachment(ApiComponent):
         self.is_inline = False
         #: Path to the attachment if on disk |br| **Type:** Path
         self.attachment = None
-        #: Content of the attachment |br| **Type:** any
-        self.content = None
+        self._content = None
+        self._buffer = None  # in memory objects, encoded on demand
         #: Indicates if the attachment is stored on disk. |br| **Type:** bool
         self.on_disk = False
         #: Indicates if the attachment is stored on cloud. |br| **Type:** bool
@@ -165,7 +171,11 @@ class BaseAttachment(ApiComponent):
                 if isinstance(file_obj, BytesIO):
                     # in memory objects
                     self.size = file_obj.getbuffer().nbytes
-                    self.content = base64.b64encode(file_obj.getvalue()).decode('utf-8')
+                    if self.size > UPLOAD_SIZE_LIMIT_SIMPLE:
+                        # streamed into the upload session: keep it unencoded
+                        self._buffer = file_obj
+                    else:
+                        self._content = base64.b64encode(file_obj.getvalue()).decode('utf-8')
                 else:
                     self.attachment = Path(file_obj)
                 self.name = custom_name
@@ -178,12 +188,75 @@ class BaseAttachment(ApiComponent):
                 self.content = attachment.to_api_data()
                 self.content['@odata.type'] = attachment.attachment_type
 
-            if self.content is None and self.attachment and self.attachment.exists():
-                with self.attachment.open('rb') as file:
-                    self.content = base64.b64encode(file.read()).decode('utf-8')
+            if (self._content is None and self._buffer is None and
+                    isinstance(self.attachment, Path) and self.attachment.exists()):
+                # the file is read when the content is needed
                 self.on_disk = True
                 self.size = self.attachment.stat().st_size
 
+    @property
+    def content(self):
+        """ Content of the attachment: base64 for file attachments.
+        Files on disk and in memory objects are only encoded when accessed,
+        and files over the simple upload limit are not kept encoded.
+
+        :getter: get the content
+        :setter: set the content
+        :type: any
+        """
+        if self._content is not None:
+            return self._content
+        if self._buffer is not None:
+            return base64.b64encode(self._buffer.getbuffer()).decode('utf-8')
+        if self.on_disk and isinstance(self.attachment, Path) and self.attachment.exists():
+            with self.attachment.open('rb') as file:
+                content = base64.b64encode(file.read()).decode('utf-8')
+            if (self.size or 0) <= UPLOAD_SIZE_LIMIT_SIMPLE:
+                self._content = content
+            return content
+        return None
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._buffer = None
+
+    def iter_bytes(self, chunk_size=DEFAULT_UPLOAD_CHUNK_SIZE):
+        """ Yields the raw bytes of a file attachment in chunks, reading
+        files from disk as needed
+
+        :param int chunk_size: the size of the chunks
+        :rtype: generator[bytes]
+        """
+        offset = 0
+        with self._byte_reader() as read:
+            while True:
+                chunk = read(offset, chunk_size)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+
+    @contextmanager
+    def _byte_reader(self):
+        """ Yields a read(offset, size) function over the raw bytes of a
+        file attachment """
+        if self._content is None and self._buffer is not None:
+            view = self._buffer.getbuffer()
+            try:
+                yield lambda offset, size: bytes(view[offset:offset + size])
+            finally:
+                view.release()
+        elif self._content is None and self.on_disk and isinstance(self.attachment, Path):
+            with self.attachment.open('rb') as file:
+                def read(offset, size):
+                    file.seek(offset)
+                    return file.read(size)
+                yield read
+        else:
+            data = base64.b64decode(self.content) if self.content else b''
+            yield lambda offset, size: data[offset:offset + size]
+
     def __len__(self):
         """ Returns the size of this attachment """
         return self.size
@@ -219,7 +292,7 @@ class BaseAttachment(ApiComponent):
         :return: Success / Failure
         :rtype: bool
         """
-        if not self.content:
+        if self._content is None and self._buffer is None and not self.on_disk:
             return False
 
         location = Path(location or '')
@@ -231,8 +304,13 @@ class BaseAttachment(ApiComponent):
         name = name.replace('/', '-').replace('\\', '')
         try:
             path = location / name
+            if self.on_disk and path.exists() and path.samefile(self.attachment):
+                # opening the source for writing would truncate it
+                log.debug('the attachment is already saved at %s', path)
+                return True
             with path.open('wb') as file:
-                file.write(base64.b64decode(self.content))
+                for chunk in self.iter_bytes():
+                    file.write(chunk)
             self.attachment = path
             self.on_disk = True
             self.size = self.attachment.stat().st_size
@@ -281,7 +359,8 @@ class BaseAttachment(ApiComponent):
                         'path': str(
                             self.attachment) if self.attachment else None,
                         'name': self.name,
-                        'content': self.content,
+                        # files on disk are read when needed
+                        'content': None if self.on_disk else self.content,
                         'on_disk': self.on_disk
                     }])
                 else:
@@ -299,7 +378,8 @@ class BaseAttachments(ApiComponent):
 
     _endpoints = {
         'attachments': '/messages/{id}/attachments',
-        'attachment': '/messages/{id}/attachments/{ida}'
+        'attachment': '/messages/{id}/attachments/{ida}',
+        'get_mime': '/messages/{id}/attachments/{ida}/$value',
     }
     _attachment_constructor = BaseAttachment  #: :meta private:
 
@@ -313,6 +393,13 @@ class BaseAttachments(ApiComponent):
         super().__init__(protocol=parent.protocol,
                          main_resource=parent.main_resource)
         self._parent = parent
+        #: Max no. of attachments uploaded at the same time. |br| **Type:** int
+        self.upload_workers = 4
+        #: Max no. of retries of a failed upload chunk. |br| **Type:** int
+        self.upload_retries = 3
+        #: Called with (attachment, uploaded bytes, total bytes) while
+        #: uploading attachments. |br| **Type:** callable
+        self.upload_progress = None
         self.__attachments = []
         # holds on_cloud attachments removed from the parent object
         self.__removed_attachments = []
@@ -440,10 +527,13 @@ class BaseAttachments(ApiComponent):
         self._update_parent_attachments()
         self._track_changes()
 
-    def download_attachments(self):
+    def download_attachments(self, *, metadata_only=False):
         """ Downloads this message attachments into memory.
         Need a call to 'attachment.save' to save them on disk.
 
+        :param bool metadata_only: only download the attachments metadata
+         (name, size, type...) without the content. Then use
+         :meth:`download_attachment` to stream the chosen ones to disk
         :return: Success / Failure
         :rtype: bool
         """
@@ -461,7 +551,12 @@ class BaseAttachments(ApiComponent):
         url = self.build_url(self._endpoints.get('attachments').format(
             id=self._parent.object_id))
 
-        response = self._parent.con.get(url)
+        params = None
+        if metadata_only:
+            params = {'$select': ','.join(self._cc(field) for field in (
+                'id', 'name', 'contentType', 'size', 'isInline', 'lastModifiedDateTime'))}
+
+        response = self._parent.con.get(url, params=params)
         if not response:
             return False
 
@@ -478,102 +573,211 @@ class BaseAttachments(ApiComponent):
         #  select and then download one by one.
         return True
 
-    def _update_attachments_to_cloud(self, chunk_size=None):
-        """ Push new, unsaved attachments to the cloud and remove removed
-        attachments. This method should not be called for non draft messages.
+    def download_attachment(self, attachment, to_path=None, *, custom_name=None,
+                            output=None, chunk_size=DEFAULT_DOWNLOAD_CHUNK_SIZE):
+        """ Streams the raw content of a cloud attachment to disk or to a
+        writable sink in chunks, without holding it (or its base64 encoding)
+        in memory. Item attachments are downloaded as MIME.
+
+        :param BaseAttachment attachment: the attachment to download
+        :param to_path: the folder where to save the attachment
+        :type to_path: str or Path
+        :param str custom_name: a custom name to be saved as
+        :param output: a binary writable object (ie. a file) where to write
+         the content instead of a file in to_path
+        :param int chunk_size: the size of the chunks read from the response
+        :return: Success / Failure
+        :rtype: bool
         """
-        # ! potentially several api requests can be made by this method.
-        chunk_size = chunk_size if chunk_size is not None else DEFAULT_UPLOAD_CHUNK_SIZE
+        if not self._parent.object_id or attachment.attachment_id is None:
+            raise RuntimeError('Attempted to download an attachment not saved on the cloud')
+
+        path = None
+        if output is None:
+            location = Path(to_path or '')
+            if not location.exists():
+                log.debug('the location provided does not exist')
+                return False
+            name = (custom_name or attachment.name or attachment.attachment_id)
+            name = name.replace('/', '-').replace('\\', '')
+            if attachment.attachment_type == 'item' and not Path(name).suffix:
+                name = name + '.eml'
+            path = location / name
 
-        for attachment in self.__attachments:
-            if attachment.on_cloud is False:
-                file_size = attachment.size
-                if file_size <= UPLOAD_SIZE_LIMIT_SIMPLE:
-                    url = self.build_url(self._endpoints.get('attachments').format(
-                        id=self._parent.object_id))
-                    # upload attachment:
-                    response = self._parent.con.post(url, data=attachment.to_api_data())
-                    if not response:
-                        return False
-
-                    data = response.json()
-
-                    # update attachment data
-                    attachment.attachment_id = data.get('id')
-                    attachment.content = data.get(self._cc('contentBytes'), None)
+        url = self.build_url(self._endpoints.get('get_mime').format(
+            id=self._parent.object_id, ida=attachment.attachment_id))
+
+        try:
+            with self._parent.con.get(url, stream=True) as response:
+                if not response:
+                    return False
+                if path is None:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            output.write(chunk)
                 else:
-                    # Upload with session
-                    url = self.build_url(
-                        self._endpoints.get('create_upload_session').format(
-                            id=self._parent.object_id))
-
-                    request = UploadSessionRequest(parent=self, attachment=attachment)
-                    file_data = request.to_api_data()
-                    response = self._parent.con.post(url, data=file_data)
-                    if not response:
-                        return False
-
-                    data = response.json()
-
-                    upload_url = data.get(self._cc('uploadUrl'), None)
-                    log.info('Resumable upload on url: {}'.format(upload_url))
-                    expiration_date = data.get(self._cc('expirationDateTime'), None)
-                    if expiration_date:
-                        log.info('Expiration Date for this upload url is: {}'.format(
-                            expiration_date))
-                    if upload_url is None:
-                        log.error('Create upload session response without '
-                                  'upload_url for file {}'.format(attachment.name))
-                        return False
-
-                    def write_stream(read_byte_chunk):
-                        current_bytes = 0
-                        while True:
-                            data = read_byte_chunk()
-                            if not data:
-                                break
-                            transfer_bytes = len(data)
-                            headers = {
-                                'Content-type': 'application/octet-stream',
-                                'Content-Length': str(len(data)),
-                                'Content-Range': 'bytes {}-{}/{}'
-                                                 ''.format(current_bytes,
-                                                           current_bytes +
-                                                           transfer_bytes - 1,
-                                                           file_size)
-                            }
-                            current_bytes += transfer_bytes
-
-                            # this request mut NOT send the authorization header.
-                            # so we use a naive simple request.
-                            response = self._parent.con.naive_request(upload_url, 'PUT',
-                                                              data=data,
-                                                              headers=headers)
-                            if not response:
-                                return False
-
-                            if response.status_code == 201:
-                                # file is completed
-                                break
-                            else:  # Usually 200
-                                data = response.json()
-                                log.debug('Successfully put {} bytes'.format(
-                                    data.get("nextExpectedRanges")))
-                        return True
-
-                    if attachment.attachment:
-                        with attachment.attachment.open(mode='rb') as file:
-                            read_from_file = lambda : file.read(chunk_size)
-                            upload_completed = write_stream(read_byte_chunk=read_from_file)
-                    else:
-                        buffer = BytesIO(base64.b64decode(attachment.content))
-                        read_byte_chunk = lambda : buffer.read(chunk_size)
-                        upload_completed = write_stream(read_byte_chunk=read_byte_chunk)
+                    with path.open('wb') as file:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                file.write(chunk)
+        except Exception as e:
+            log.error('attachment failed to be downloaded: %s', str(e))
+            if path is not None and path.exists():
+                path.unlink()  # don't leave a truncated file
+            return False
 
-                    if not upload_completed:
-                        return False
+        if path is not None:
+            attachment.attachment = path
+            attachment.on_disk = True
+            attachment.size = path.stat().st_size
+        return True
 
+    def _upload_attachment(self, attachment):
+        """ Uploads a single attachment with a simple request """
+        url = self.build_url(self._endpoints.get('attachments').format(
+            id=self._parent.object_id))
+        response = self._parent.con.post(url, data=attachment.to_api_data())
+        if not response:
+            return False
+
+        data = response.json()
+
+        # update attachment data
+        attachment.attachment_id = data.get('id')
+        attachment.content = data.get(self._cc('contentBytes'), None)
+        return True
+
+    def _upload_session_offset(self, upload_url):
+        """ Returns the offset of the next byte expected by an upload session
+        or None if it can't be retrieved """
+        try:
+            response = self._parent.con.naive_request(upload_url, 'GET')
+        except RequestException as e:
+            log.debug('Could not retrieve the upload session status: {}'.format(e))
+            return None
+        if not response:
+            return None
+        return self._next_offset(response)
+
+    def _upload_attachment_session(self, attachment, chunk_size, progress, max_retries):
+        """ Uploads a large attachment in chunks through an upload session.
+        Failed chunks are resumed from the offset expected by the session """
+        url = self.build_url(
+            self._endpoints.get('create_upload_session').format(
+                id=self._parent.object_id))
+
+        request = UploadSessionRequest(parent=self, attachment=attachment)
+        response = self._parent.con.post(url, data=request.to_api_data())
+        if not response:
+            return False
+
+        data = response.json()
+
+        upload_url = data.get(self._cc('uploadUrl'), None)
+        log.info('Resumable upload on url: {}'.format(upload_url))
+        expiration_date = data.get(self._cc('expirationDateTime'), None)
+        if expiration_date:
+            log.info('Expiration Date for this upload url is: {}'.format(
+                expiration_date))
+        if upload_url is None:
+            log.error('Create upload session response without '
+                      'upload_url for file {}'.format(attachment.name))
+            return False
+
+        file_size = attachment.size
+        offset = 0
+        failures = 0
+        # files on disk and in memory objects are read without encoding them
+        with attachment._byte_reader() as read:
+            while offset < file_size:
+                data = read(offset, chunk_size)
+                headers = {
+                    'Content-type': 'application/octet-stream',
+                    'Content-Length': str(len(data)),
+                    'Content-Range': 'bytes {}-{}/{}'.format(
+                        offset, offset + len(data) - 1, file_size)
+                }
+                # this request mut NOT send the authorization header.
+                # so we use a naive simple request.
+                try:
+                    response = self._parent.con.naive_request(upload_url, 'PUT',
+                                                              data=data, headers=headers)
+                except RequestException as e:
+                    log.debug('Chunk upload failed: {}'.format(e))
+                    response = None
+
+                if response:
+                    failures = 0
+                    if response.status_code == 201:
+                        offset = file_size  # file is completed
+                    else:  # Usually 200
+                        next_offset = self._next_offset(response)
+                        offset = next_offset if next_offset is not None else offset + len(data)
+                        log.debug('Successfully put {} bytes'.format(offset))
+                    if progress is not None:
+                        progress(attachment, offset, file_size)
+                    continue
+
+                failures += 1
+                if failures > max_retries:
+                    return False
+                time.sleep(min(2 ** (failures - 1), 30))
+                # resume where the session expects it
+                next_offset = self._upload_session_offset(upload_url)
+                if next_offset is not None:
+                    offset = next_offset
+        return True
+
+    @staticmethod
+    def _next_offset(response):
+        try:
+            ranges = response.json().get('nextExpectedRanges') or []
+            return int(ranges[0].split('-')[0]) if ranges else None
+        except ValueError:
+            return None
+
+    def _update_attachments_to_cloud(self, chunk_size=None, *, max_workers=None, progress=None):
+        """ Push new, unsaved attachments to the cloud and remove removed
+        attachments. This method should not be called for non draft messages.
+
+        :param int chunk_size: size of the chunks of the upload sessions
+        :param int max_workers: max no. of attachments uploaded at the same
+         time. Defaults to upload_workers
+        :param progress: called with (attachment, uploaded bytes, total bytes)
+         after each chunk. Defaults to upload_progress
+        """
+        # ! potentially several api requests can be made by this method.
+        chunk_size = chunk_size if chunk_size is not None else DEFAULT_UPLOAD_CHUNK_SIZE
+        max_workers = max_workers or self.upload_workers
+        progress = progress or self.upload_progress
+
+        def upload(attachment):
+            if attachment.size <= UPLOAD_SIZE_LIMIT_SIMPLE:
+                uploaded = self._upload_attachment(attachment)
+                if uploaded and progress is not None:
+                    progress(attachment, attachment.size, attachment.size)
+            else:
+                # chunks of an upload session must be sent in order, so
+                # concurrency happens across attachments
+                uploaded = self._upload_attachment_session(
+                    attachment, chunk_size, progress, self.upload_retries)
+            if uploaded:
                 attachment.on_cloud = True
+            return uploaded
+
+        pending = [attachment for attachment in self.__attachments
+                   if attachment.on_cloud is False]
+        if len(pending) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(upload, pending))
+        else:
+            results = []
+            for attachment in pending:
+                results.append(upload(attachment))
+                if not results[-1]:
+                    break
+        if not all(results):
+            return False
 
         for attachment in self.__removed_attachments:
             if attachment.on_cloud and attachment.attachment_id is not None:
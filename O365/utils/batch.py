@@ -0,0 +1,225 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, RequestException, Timeout
+from urllib3.exceptions import ConnectTimeoutError
+
+log = logging.getLogger(__name__)
+
+#: Max requests allowed in a single $batch request
+BATCH_MAX_REQUESTS = 20
+#: Status codes of throttled or temporarily failed requests that are retried.
+#: A 504 is not retried: the request may have been applied
+RETRY_STATUS_CODES = frozenset((429, 503))
+# reads can also be repeated after server errors and gateway timeouts
+READ_RETRY_STATUS_CODES = RETRY_STATUS_CODES | {500, 502, 504}
+
+
+def is_retryable(error):
+    """ Returns if a failed request can be sent again: throttled requests
+    and connection errors raised before the request was sent. Errors after
+    that (ie. read timeouts) are not retried, as the request may have been
+    applied (a sent message would be sent twice)
+
+    :param Exception error: the error raised by the request
+    :rtype: bool
+    """
+    if isinstance(error, HTTPError):
+        response = error.response
+        return response is not None and response.status_code in RETRY_STATUS_CODES
+    if isinstance(error, ConnectTimeout):
+        return True
+    if isinstance(error, ConnectionError):
+        # requests wraps the urllib3 error (in a MaxRetryError when retrying)
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)
+        return isinstance(reason, ConnectTimeoutError)  # includes NewConnectionError
+    return False
+
+
+def is_retryable_read(error):
+    """ Returns if a failed read only request can be sent again. Unlike
+    :func:`is_retryable`, server errors, read timeouts and dropped
+    connections are retried too, as repeating a read changes nothing
+
+    :param Exception error: the error raised by the request
+    :rtype: bool
+    """
+    if isinstance(error, HTTPError):
+        response = error.response
+        return response is not None and response.status_code in READ_RETRY_STATUS_CODES
+    return isinstance(error, (ConnectionError, Timeout))
+
+
+def retry_delay(error, attempts, backoff, max_backoff):
+    """ Returns the seconds to wait before retrying a failed request: the
+    time requested by the service or an exponential backoff with jitter
+
+    :param Exception error: the error raised by the request
+    :param int attempts: no. of attempts made so far
+    :param float backoff: seconds to wait after the first attempt
+    :param float max_backoff: max seconds to wait
+    :rtype: float
+    """
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get('Retry-After')), max_backoff)
+        except (TypeError, ValueError):
+            pass
+    delay = min(backoff * 2 ** (attempts - 1), max_backoff)
+    return delay * random.uniform(0.5, 1.0)  # jitter spreads the retries
+
+
+class BatchResponse:
+    """ The result of one request sent inside a $batch request """
+
+    __slots__ = ('request', 'status', 'headers', 'body', 'exception')
+
+    def __init__(self, request, status=None, headers=None, body=None, exception=None):
+        #: The request sent. |br| **Type:** dict
+        self.request = request
+        #: The response status code (None if the request could not be sent).
+        #: |br| **Type:** int
+        self.status = status
+        #: The response headers. |br| **Type:** dict
+        self.headers = headers or {}
+        #: The response body. |br| **Type:** dict
+        self.body = body
+        #: The error raised sending the request. |br| **Type:** Exception
+        self.exception = exception
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return 'BatchResponse: {} {} ({})'.format(
+            self.request.get('method'), self.request.get('url'), self.status)
+
+    @property
+    def ok(self):
+        """ Whether the request succeeded
+
+        :rtype: bool
+        """
+        return self.status is not None and 200 <= self.status < 300
+
+    @property
+    def error(self):
+        """ The error message of a failed request or None
+
+        :rtype: str
+        """
+        if self.ok:
+            return None
+        if self.exception is not None:
+            return str(self.exception)
+        if isinstance(self.body, dict):
+            return self.body.get('error', {}).get('message') or str(self.status)
+        return str(self.status)
+
+
+def _relative_url(protocol, url):
+    """ $batch requests urls are relative to the service url """
+    if url.startswith(protocol.service_url):
+        url = url[len(protocol.service_url):]
+    return url if url.startswith('/') else '/' + url
+
+
+def _retry_after(responses, attempt):
+    delays = []
+    for response in responses:
+        retry_after = {key.lower(): value for key, value in response.headers.items()}.get('retry-after')
+        try:
+            delays.append(float(retry_after))
+        except (TypeError, ValueError):
+            pass
+    return max(delays) if delays else 2 ** attempt
+
+
+def _send_chunk(con, protocol, chunk):
+    """ Sends up to BATCH_MAX_REQUESTS requests in one $batch request.
+    Returns the BatchResponses in the same order """
+    requests = []
+    for index, request in enumerate(chunk):
+        batch_request = {
+            'id': str(index),
+            'method': request['method'].upper(),
+            'url': _relative_url(protocol, request['url']),
+        }
+        if request.get('body') is not None:
+            batch_request['body'] = request['body']
+            batch_request['headers'] = dict(request.get('headers') or {},
+                                            **{'Content-Type': 'application/json'})
+        elif request.get('headers'):
+            batch_request['headers'] = request['headers']
+        requests.append(batch_request)
+
+    try:
+        response = con.post('{}$batch'.format(protocol.service_url), data={'requests': requests})
+    except RequestException as e:
+        # a throttled $batch request fails as a whole: its status goes to
+        # every request so they are retried like throttled single requests
+        response = e.response if isinstance(e, HTTPError) else None
+        status = response.status_code if response is not None else None
+        headers = dict(response.headers) if response is not None else None
+        return [BatchResponse(request, status=status, headers=headers, exception=e)
+                for request in chunk]
+    if not response:
+        return [BatchResponse(request, status=response.status_code) for request in chunk]
+
+    results = {item.get('id'): item for item in response.json().get('responses', [])}
+    responses = []
+    for index, request in enumerate(chunk):
+        item = results.get(str(index), {})
+        responses.append(BatchResponse(request, status=item.get('status'),
+                                       headers=item.get('headers'), body=item.get('body')))
+    return responses
+
+
+def execute_batch(con, protocol, requests, *, max_workers=1, max_retries=3):
+    """ Sends many requests packed into $batch requests of up to 20 requests.
+    The batches run concurrently and the throttled requests (429, 503)
+    are retried after the time requested by the service.
+
+    :param Connection con: the connection to use
+    :param Protocol protocol: the protocol of the requests
+    :param requests: the requests as dicts with 'method', 'url' (absolute or
+     relative to the service url) and optionally 'body' and 'headers'
+    :type requests: list[dict]
+    :param int max_workers: max no. of $batch requests sent at the same time.
+     Defaults to 1: the requests inside a $batch already count against the
+     Exchange limit of 4 concurrent requests per mailbox, so more batches in
+     flight on the same mailbox are throttled
+    :param int max_retries: max no. of retries of a throttled request
+    :return: the response of each request, in the same order
+    :rtype: list[BatchResponse]
+    """
+    requests = list(requests)
+    results = [None] * len(requests)
+    pending = list(range(len(requests)))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for attempt in range(max_retries + 1):
+            chunks = [pending[i:i + BATCH_MAX_REQUESTS]
+                      for i in range(0, len(pending), BATCH_MAX_REQUESTS)]
+            sent = executor.map(
+                lambda chunk: _send_chunk(con, protocol, [requests[i] for i in chunk]), chunks)
+
+            retry = []
+            for chunk, responses in zip(chunks, sent):
+                for index, response in zip(chunk, responses):
+                    results[index] = response
+                    if response.status in RETRY_STATUS_CODES:
+                        retry.append(index)
+            if not retry or attempt == max_retries:
+                break
+
+            delay = _retry_after([results[index] for index in retry], attempt)
+            log.debug('{} batched requests throttled. Retrying in {} seconds'.format(len(retry), delay))
+            time.sleep(delay)
+            pending = retry
+
+    return results
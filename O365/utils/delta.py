@@ -0,0 +1,259 @@
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+
+class RemovedItem:
+    """ A tombstone returned by a delta query for an item that was removed
+    (deleted or moved out of the synced collection) """
+
+    __slots__ = ('object_id', 'reason')
+
+    def __init__(self, object_id, reason=None):
+        #: The id of the removed item. |br| **Type:** str
+        self.object_id = object_id
+        #: Why it was removed ('deleted' or 'changed'). |br| **Type:** str
+        self.reason = reason
+
+    def __repr__(self):
+        return 'Removed: {} ({})'.format(self.object_id, self.reason)
+
+    def __eq__(self, other):
+        return isinstance(other, RemovedItem) and self.object_id == other.object_id
+
+
+class BaseDeltaStateBackend:
+    """ Stores the link where each delta sync must continue: the
+    deltaLink of the last completed sync, or the nextLink (skipToken) of the
+    last fully processed page of an interrupted one.
+
+    Apart from the links, it stores the checkpoints (json serializable
+    dicts) of the long running jobs, ie. :class:`O365.fanout.MailboxFanOut`.
+    """
+
+    def load_link(self, key: str) -> Optional[str]:
+        """ Returns the stored link for key or None
+
+        :param str key: the synced collection key
+        """
+        raise NotImplementedError
+
+    def save_link(self, key: str, link: str) -> None:
+        """ Stores the link for key
+
+        :param str key: the synced collection key
+        :param str link: the deltaLink or nextLink
+        """
+        raise NotImplementedError
+
+    def delete_link(self, key: str) -> None:
+        """ Removes the stored link (the next sync will start from scratch)
+
+        :param str key: the synced collection key
+        """
+        raise NotImplementedError
+
+    def load_checkpoint(self, key: str) -> Optional[dict]:
+        """ Returns the stored checkpoint for key or None
+
+        :param str key: the checkpoint key
+        """
+        raise NotImplementedError
+
+    def save_checkpoint(self, key: str, checkpoint: dict) -> None:
+        """ Stores the checkpoint for key
+
+        :param str key: the checkpoint key
+        :param dict checkpoint: a json serializable dict
+        """
+        raise NotImplementedError
+
+    def delete_checkpoint(self, key: str) -> None:
+        """ Removes the stored checkpoint
+
+        :param str key: the checkpoint key
+        """
+        raise NotImplementedError
+
+
+class MemoryDeltaStateBackend(BaseDeltaStateBackend):
+    """ A delta state backend stored in memory """
+
+    def __init__(self):
+        self._links = {}
+        self._checkpoints = {}
+
+    def __repr__(self):
+        return 'MemoryDeltaStateBackend'
+
+    def load_link(self, key):
+        return self._links.get(key)
+
+    def save_link(self, key, link):
+        self._links[key] = link
+
+    def delete_link(self, key):
+        self._links.pop(key, None)
+
+    def load_checkpoint(self, key):
+        checkpoint = self._checkpoints.get(key)
+        return json.loads(checkpoint) if checkpoint is not None else None
+
+    def save_checkpoint(self, key, checkpoint):
+        self._checkpoints[key] = json.dumps(checkpoint)  # a copy, as the other backends
+
+    def delete_checkpoint(self, key):
+        self._checkpoints.pop(key, None)
+
+
+class FileSystemDeltaStateBackend(BaseDeltaStateBackend):
+    """ A delta state backend stored as a json file """
+
+    def __init__(self, state_path=None):
+        """
+        :param str or Path state_path: the json file where to store the links.
+         The checkpoints are stored next to it, in a '.checkpoints.json' file
+        """
+        #: Path of the json file. |br| **Type:** Path
+        self.state_path = Path(state_path) if state_path else Path('o365_delta_state.json')
+        #: Path of the checkpoints json file. |br| **Type:** Path
+        self.checkpoints_path = self.state_path.with_name(
+            self.state_path.stem + '.checkpoints.json')
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return str(self.state_path)
+
+    @staticmethod
+    def _read(path):
+        if not path.exists():
+            return {}
+        with path.open('r') as state_file:
+            return json.load(state_file)
+
+    @staticmethod
+    def _write(path, values):
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with tmp_path.open('w') as state_file:
+            json.dump(values, state_file)
+        tmp_path.replace(path)  # atomic, a crash keeps the previous state
+
+    def _load(self, path, key):
+        with self._lock:
+            return self._read(path).get(key)
+
+    def _save(self, path, key, value):
+        with self._lock:
+            values = self._read(path)
+            values[key] = value
+            self._write(path, values)
+
+    def _delete(self, path, key):
+        with self._lock:
+            values = self._read(path)
+            if values.pop(key, None) is not None:
+                self._write(path, values)
+
+    def load_link(self, key):
+        return self._load(self.state_path, key)
+
+    def save_link(self, key, link):
+        self._save(self.state_path, key, link)
+
+    def delete_link(self, key):
+        self._delete(self.state_path, key)
+
+    def load_checkpoint(self, key):
+        return self._load(self.checkpoints_path, key)
+
+    def save_checkpoint(self, key, checkpoint):
+        self._save(self.checkpoints_path, key, checkpoint)
+
+    def delete_checkpoint(self, key):
+        self._delete(self.checkpoints_path, key)
+
+
+class SQLiteDeltaStateBackend(BaseDeltaStateBackend):
+    """ A delta state backend stored in a SQLite database """
+
+    def __init__(self, database='o365_delta_state.db', table='delta_links', *, connection=None,
+                 lock=None):
+        """
+        :param str database: the SQLite database path
+        :param str table: the table where to store the links. The
+         checkpoints are stored in the '<table>_checkpoints' table
+        :param sqlite3.Connection connection: an open connection to use
+         instead of connecting to database (needed for ':memory:' databases)
+        :param lock: the lock guarding the connection when it's shared
+        :type lock: threading.Lock
+        """
+        #: The SQLite database path. |br| **Type:** str
+        self.database = str(database)
+        #: The table name. |br| **Type:** str
+        self.table = table
+        #: The checkpoints table name. |br| **Type:** str
+        self.checkpoints_table = '{}_checkpoints'.format(table)
+        self._connection = connection
+        self._lock = lock or threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS "{}" (key TEXT PRIMARY KEY, link TEXT NOT NULL)'.format(table))
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS "{}" (key TEXT PRIMARY KEY, checkpoint TEXT NOT NULL)'.format(
+                    self.checkpoints_table))
+
+    def __repr__(self):
+        return 'SQLiteDeltaStateBackend: {}'.format(self.database)
+
+    @contextmanager
+    def _connect(self):
+        """ Yields the connection inside a transaction, holding the lock """
+        with self._lock:
+            connection = self._connection or sqlite3.connect(self.database)
+            try:
+                with connection:
+                    yield connection
+            finally:
+                if connection is not self._connection:
+                    connection.close()
+
+    def load_link(self, key):
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT link FROM "{}" WHERE key = ?'.format(self.table), (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_link(self, key, link):
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO "{}" (key, link) VALUES (?, ?)'.format(self.table), (key, link))
+
+    def delete_link(self, key):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM "{}" WHERE key = ?'.format(self.table), (key,))
+
+    def load_checkpoint(self, key):
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT checkpoint FROM "{}" WHERE key = ?'.format(self.checkpoints_table),
+                (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_checkpoint(self, key, checkpoint):
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO "{}" (key, checkpoint) VALUES (?, ?)'.format(
+                    self.checkpoints_table), (key, json.dumps(checkpoint)))
+
+    def delete_checkpoint(self, key):
+        with self._connect() as connection:
+            connection.execute(
+                'DELETE FROM "{}" WHERE key = ?'.format(self.checkpoints_table), (key,))
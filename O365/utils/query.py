@@ -405,6 +405,19 @@ class CompositeFilter(QueryBase):
         """ Removes all filters from the query """
         self.filters = None
 
+    def as_predicate(self):
+        """ Returns the filters compiled into a python predicate to apply
+        this query to local cloud dicts or model objects.
+        See :func:`O365.utils.query_compiler.compile_filter` """
+        from .query_compiler import compile_filter
+        return compile_filter(self)
+
+    def as_sort_key(self):
+        """ Returns the order by clause compiled into a sort key (None if not ordered).
+        See :func:`O365.utils.query_compiler.compile_order_by` """
+        from .query_compiler import compile_order_by
+        return compile_order_by(self)
+
     @property
     def has_only_filters(self) -> bool:
         """ Returns true if it only has filters"""
@@ -0,0 +1,265 @@
+""" Compiles QueryBuilder filters and order by clauses into python callables,
+so the same query used against the api can be applied to local data
+(cached objects, delta results, indexes...). """
+import datetime as dt
+import operator
+from typing import Any, Callable, Optional
+
+from .casing import to_snake_case
+from .query import (
+    ChainFilter,
+    CompositeFilter,
+    FunctionFilter,
+    GroupFilter,
+    IterableFilter,
+    LogicalFilter,
+    NegateFilter,
+    OrderByFilter,
+    QueryFilter,
+)
+from .utils import FieldTableMixin, _Descending, parse_datetime
+
+_COMPARISONS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+}
+
+_FUNCTIONS = {
+    'contains': lambda value, word: word in value,
+    'startswith': lambda value, word: value.startswith(word),
+    'endswith': lambda value, word: value.endswith(word),
+}
+
+_MISSING = object()
+
+
+def _parse_word(word):
+    """ Converts a rendered filter word back into a python value """
+    if word is None:
+        return None
+    if len(word) >= 2 and word[0] == "'" and word[-1] == "'":
+        return word[1:-1].replace("''", "'")
+    if word in ('true', 'false'):
+        return word == 'true'
+    if word == 'null':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(word)
+        except ValueError:
+            pass
+    try:
+        return _aware(dt.datetime.fromisoformat(word))
+    except ValueError:
+        return word
+
+
+def _aware(value):
+    # the api returns naive datetimes in utc
+    return value.replace(tzinfo=dt.timezone.utc) if value.tzinfo is None else value
+
+
+def _normalize(key):
+    # order by attributes are not converted to the protocol casing
+    return key.replace('_', '').lower()
+
+
+def _model_value(model, key):
+    """ Returns a key of a model in cloud format, read from its current
+    attributes. The field tables map the key to its attribute, so only
+    that attribute is converted. Other keys are read from to_api_data """
+    normalized_key = _normalize(key)
+    _, _, state = model._compile_fields(model.protocol)
+    for state_key, _, _ in state:
+        if _normalize(state_key) == normalized_key:
+            return model._dump_state(keys={state_key})[state_key]
+    return _get(model._dump_state(), key)
+
+
+def _get(item, key):
+    """ Returns an attribute of a cloud dict (any casing) or an object """
+    if isinstance(item, dict):
+        if key in item:
+            return item[key]
+        normalized_key = _normalize(key)
+        for item_key, value in item.items():
+            if _normalize(item_key) == normalized_key:
+                return value
+        return _MISSING
+    if isinstance(item, FieldTableMixin):
+        value = _model_value(item, key)
+        if value is not _MISSING:
+            return value
+    value = getattr(item, to_snake_case(key), _MISSING)
+    if value is _MISSING:
+        value = getattr(item, key, _MISSING)
+    return value
+
+
+def _resolve(item, path):
+    """ Returns the values at path. Collections found on the way fan out
+    into several values """
+    values = [item]
+    for key in path:
+        resolved = []
+        for value in values:
+            value = _get(value, key)
+            if isinstance(value, (list, tuple)):
+                resolved.extend(value)
+            elif value is not _MISSING:
+                resolved.append(value)
+        values = resolved
+    return values
+
+
+def _coerce(value, word):
+    """ Makes value comparable with word """
+    if isinstance(value, str):
+        if isinstance(word, dt.datetime):
+            try:
+                return _aware(parse_datetime(value))
+            except (ValueError, OverflowError):
+                return value
+        return value.casefold()  # the api compares strings case insensitively
+    if isinstance(value, dt.datetime):
+        return _aware(value)
+    if hasattr(value, 'value') and isinstance(getattr(value, 'value'), str):
+        return value.value.casefold()  # Enums
+    return value
+
+
+def _compile(filter_instance: QueryFilter) -> Callable[[Any], bool]:
+    if isinstance(filter_instance, FunctionFilter):
+        function = _FUNCTIONS.get(filter_instance._operation.lower())
+        if function is None:
+            raise ValueError('Unsupported function: {}'.format(filter_instance._operation))
+        path = filter_instance._attribute.split('/') if filter_instance._attribute else []
+        word = _parse_word(filter_instance._word)
+        word = word.casefold() if isinstance(word, str) else word
+
+        def predicate(item):
+            for value in _resolve(item, path):
+                value = _coerce(value, word)
+                if isinstance(value, str) and function(value, word):
+                    return True
+            return False
+        return predicate
+
+    if isinstance(filter_instance, LogicalFilter):
+        comparison = _COMPARISONS.get(filter_instance._operation.lower())
+        if comparison is None:
+            raise ValueError('Unsupported operation: {}'.format(filter_instance._operation))
+        path = filter_instance._attribute.split('/') if filter_instance._attribute else []
+        word = _parse_word(filter_instance._word)
+        word = word.casefold() if isinstance(word, str) else word
+        negative = comparison is operator.ne
+
+        def predicate(item):
+            values = _resolve(item, path) or [None]
+            matches = []
+            for value in values:
+                value = _coerce(value, word)
+                if value is None or word is None:
+                    matches.append(comparison(value, word) if comparison in (
+                        operator.eq, operator.ne) else False)
+                    continue
+                try:
+                    matches.append(comparison(value, word))
+                except TypeError:
+                    matches.append(negative)
+            # 'ne' on a collection means no value is equal
+            return all(matches) if negative else any(matches)
+        return predicate
+
+    if isinstance(filter_instance, IterableFilter):
+        operation = filter_instance._operation.lower()
+        if operation not in ('any', 'all'):
+            raise ValueError('Unsupported operation: {}'.format(filter_instance._operation))
+        path = filter_instance._collection.split('/')
+        inner = _compile(filter_instance._filter_instance)
+        check = any if operation == 'any' else all
+        return lambda item: check(inner(value) for value in _resolve(item, path))
+
+    if isinstance(filter_instance, ChainFilter):
+        predicates = [_compile(instance) for instance in filter_instance._filter_instances]
+        check = all if filter_instance._operation == 'and' else any
+        return lambda item: check(predicate(item) for predicate in predicates)
+
+    if isinstance(filter_instance, NegateFilter):
+        inner = _compile(filter_instance._filter_instance)
+        return lambda item: not inner(item)
+
+    if isinstance(filter_instance, GroupFilter):
+        return _compile(filter_instance._filter_instance)
+
+    raise ValueError('Unsupported filter: {}'.format(type(filter_instance).__name__))
+
+
+def compile_filter(query) -> Callable[[Any], bool]:
+    """ Compiles the filters of a query into a predicate that can be applied
+    to cloud dicts or model objects (Message, Event, ...).
+
+    String comparisons are case insensitive, as done by the api, and date
+    strings are compared as datetimes.
+
+    .. code-block:: python
+
+        query = builder.equals('is_read', False) & builder.contains('subject', 'invoice')
+        unread_invoices = filter(compile_filter(query), messages)
+
+    :param query: the query with the filters
+    :type query: CompositeFilter or QueryFilter
+    :return: a predicate returning True for the items matching the query
+    :raises ValueError: if the query uses an unsupported operation or search
+    """
+    if isinstance(query, CompositeFilter):
+        if query.search is not None:
+            raise ValueError("Search queries can't be compiled into predicates")
+        filters = query.filters
+    else:
+        filters = query
+    if filters is None:
+        return lambda item: True
+    return _compile(filters)
+
+
+def _sort_value(value):
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if isinstance(value, str):
+        return value.casefold()
+    if isinstance(value, dt.datetime):
+        return _aware(value)
+    return value
+
+
+def compile_order_by(query) -> Optional[Callable[[Any], tuple]]:
+    """ Compiles the order by clause of a query into a sort key
+
+    .. code-block:: python
+
+        messages.sort(key=compile_order_by(builder.orderby(('receivedDateTime', False))))
+
+    :param query: the query with the order by clause
+    :type query: CompositeFilter or OrderByFilter
+    :return: a sort key for sorted / list.sort or None if no order is defined.
+     Null values sort first in ascending order
+    """
+    order_by = query.order_by if isinstance(query, CompositeFilter) else query
+    if not isinstance(order_by, OrderByFilter) or not order_by._orderby:
+        return None
+    clauses = [(attribute.split('/'), ascending) for attribute, ascending in order_by._orderby]
+
+    def sort_key(item):
+        key = []
+        for path, ascending in clauses:
+            values = _resolve(item, path)
+            value = _sort_value(values[0]) if values else None
+            part = (value is not None, value) if value is not None else (False, 0)
+            key.append(part if ascending else _Descending(part))
+        return tuple(key)
+    return sort_key
@@ -0,0 +1,142 @@
+import gzip
+import importlib
+import json
+import logging
+
+from .utils import FieldTableMixin
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# the only classes a snapshot can name. Other classes need an explicit constructor
+SNAPSHOT_TYPES = frozenset((
+    'O365.message.Message',
+    'O365.calendar.Event',
+    'O365.address_book.Contact',
+    'O365.drive.DriveItem',
+    'O365.drive.File',
+    'O365.drive.Image',
+    'O365.drive.Photo',
+    'O365.drive.Folder',
+))
+
+
+def _snapshot(obj):
+    """ Returns the snapshot dict of a model object """
+    if not isinstance(obj, FieldTableMixin):
+        raise ValueError("'{}' objects don't support snapshots".format(type(obj).__name__))
+
+    cls = type(obj)
+    return {
+        'v': SNAPSHOT_VERSION,
+        'type': '{}.{}'.format(cls.__module__, cls.__qualname__),
+        'main_resource': obj.main_resource,
+        'changes': sorted(getattr(obj, '_track_changes', None) or ()),
+        # built from the attributes, so it includes the saved and the pending changes
+        'data': obj._dump_state(),
+    }
+
+
+def _constructor(type_name):
+    if type_name not in SNAPSHOT_TYPES:
+        raise ValueError('Invalid snapshot type: {}. Pass the constructor to load it'.format(
+            type_name))
+    module_name, _, class_name = type_name.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _load(snapshot, parent=None, con=None, protocol=None, constructor=None):
+    """ Rebuilds a model object from its snapshot dict """
+    if snapshot.get('v') != SNAPSHOT_VERSION:
+        raise ValueError('Unsupported snapshot version: {}'.format(snapshot.get('v')))
+    constructor = constructor or _constructor(snapshot['type'])
+    if parent is not None:
+        obj = constructor(parent=parent, **{constructor._cloud_data_key: snapshot['data']})
+    else:
+        obj = constructor(con=con, protocol=protocol, main_resource=snapshot.get('main_resource'),
+                          **{constructor._cloud_data_key: snapshot['data']})
+    tracker = getattr(obj, '_track_changes', None)
+    if tracker is not None:
+        tracker.clear()
+        set.update(tracker, snapshot.get('changes', ()))  # keys are already in cloud casing
+    return obj
+
+
+def dump_snapshot(obj):
+    """ Serializes a model object (its current state, pending changes
+    included) into compact bytes. Supported by Message, Event, Contact and DriveItem.
+
+    :param ApiComponent obj: the object to serialize
+    :rtype: bytes
+    :raises ValueError: if the object doesn't support snapshots or a
+     pending change can't be serialized
+    """
+    return json.dumps(_snapshot(obj), separators=(',', ':')).encode('utf-8')
+
+
+def load_snapshot(data, *, parent=None, con=None, protocol=None, constructor=None):
+    """ Rebuilds an object from a snapshot without any network call
+
+    :param bytes data: a snapshot from :func:`dump_snapshot`
+    :param parent: the parent of the object (ie. the Folder of a Message)
+    :param Connection con: connection to use if no parent specified
+    :param Protocol protocol: protocol to use if no parent specified
+    :param constructor: the class to build. Defaults to the snapshot one,
+     which must be one of the O365 models in SNAPSHOT_TYPES
+    :rtype: ApiComponent
+    """
+    return _load(json.loads(data), parent=parent, con=con, protocol=protocol,
+                 constructor=constructor)
+
+
+def _open(file, mode):
+    if isinstance(file, str):
+        if file.endswith('.gz'):
+            return gzip.open(file, mode + 't', encoding='utf-8')
+        return open(file, mode, encoding='utf-8')
+    return None
+
+
+def dump_snapshots(objects, file):
+    """ Writes the snapshots of many objects (ie. whole pages) as json lines.
+
+    :param objects: the objects to serialize
+    :param file: a path (gzipped if it ends with '.gz') or a text file object
+    :return: number of objects written
+    :rtype: int
+    """
+    fp = _open(file, 'w')
+    out = fp or file
+    count = 0
+    try:
+        for obj in objects:
+            out.write(json.dumps(_snapshot(obj), separators=(',', ':')))
+            out.write('\n')
+            count += 1
+    finally:
+        if fp is not None:
+            fp.close()
+    return count
+
+
+def load_snapshots(file, *, parent=None, con=None, protocol=None, constructor=None):
+    """ Reads the objects written with :func:`dump_snapshots`
+
+    :param file: a path (gzipped if it ends with '.gz') or a text file object
+    :param parent: the parent of the objects
+    :param Connection con: connection to use if no parent specified
+    :param Protocol protocol: protocol to use if no parent specified
+    :param constructor: the class to build. Defaults to the snapshot one
+    :return: the objects
+    :rtype: generator
+    """
+    fp = _open(file, 'r')
+    try:
+        for line in fp or file:
+            if line.strip():
+                yield _load(json.loads(line), parent=parent, con=con, protocol=protocol,
+                            constructor=constructor)
+    finally:
+        if fp is not None:
+            fp.close()
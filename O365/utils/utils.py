@@ -1,7 +1,15 @@
 import datetime as dt
+import heapq
+import inspect
 import logging
+import queue
+import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, Union
 
 from dateutil.parser import parse
@@ -19,12 +27,78 @@ SITES_RESOURCE = 'sites'
 
 
 NEXT_LINK_KEYWORD = '@odata.nextLink'
+DELTA_LINK_KEYWORD = '@odata.deltaLink'
 
 log = logging.getLogger(__name__)
 
 MAX_RECIPIENTS_PER_MESSAGE = 500  # Actual limit on Microsoft 365
 
 
+def parse_datetime(value: str) -> dt.datetime:
+    """ Parses an ISO-8601 date time string as returned by the api
+
+    Graph always returns timestamps in a fixed format
+    (eg. '2024-01-01T10:00:00Z' or '2024-01-01T10:00:00.1234567Z') so this
+    takes a fast path through datetime.fromisoformat and only falls back to
+    the (much slower) dateutil parser on unexpected input.
+
+    :param str value: the date time string to parse
+    :return: the parsed datetime (naive if no offset is present)
+    :rtype: dt.datetime
+    """
+    try:
+        if len(value) > 19 and value[10] == 'T':
+            base, rest = value[:19], value[19:]
+            fraction = ''
+            if rest.startswith('.'):
+                # fromisoformat (py < 3.11) only accepts 3 or 6 fraction digits
+                end = 1
+                while end < len(rest) and rest[end].isdigit():
+                    end += 1
+                fraction = '.' + rest[1:end][:6].ljust(6, '0')
+                rest = rest[end:]
+            if rest == 'Z':
+                rest = '+00:00'
+            return dt.datetime.fromisoformat(base + fraction + rest)
+        return dt.datetime.fromisoformat(value)
+    except (ValueError, TypeError, IndexError):
+        return parse(value)
+
+
+@lru_cache(maxsize=2048)
+def _snake_case_key(key):
+    return to_snake_case(key)
+
+
+def snake_case_keys(data):
+    """ Returns a copy of the cloud data with all the dict keys
+    (recursively) converted to snake_case
+
+    :param data: cloud data (dict, list or value)
+    :return: the converted data
+    """
+    if isinstance(data, dict):
+        return {_snake_case_key(key): snake_case_keys(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [snake_case_keys(value) for value in data]
+    return data
+
+
+def raw_cloud_values(values, raw=True):
+    """ Returns the decoded cloud dicts of a listing without building any
+    model object. Used by the listing methods when called with raw=...
+
+    :param list[dict] values: the 'value' list of a listing response
+    :param raw: True to return the dicts as received or 'snake_case'
+     to convert all their keys to snake_case
+    :type raw: bool or str
+    :rtype: list[dict]
+    """
+    if raw == 'snake_case':
+        return [snake_case_keys(value) for value in values]
+    return list(values)
+
+
 class CaseEnum(Enum):
     """ A Enum that converts the value to a snake_case casing """
 
@@ -82,6 +156,8 @@ class ChainOperator(Enum):
 
 
 class TrackerSet(set):
+    __slots__ = ('cc',)
+
     def __init__(self, *args, casing=None, **kwargs):
         """ A Custom Set that changes the casing of it's keys
 
@@ -102,6 +178,8 @@ class TrackerSet(set):
 class Recipient:
     """ A single Recipient """
 
+    __slots__ = ('_address', '_name', '_parent', '_field')
+
     def __init__(self, address=None, name=None, parent=None, field=None):
         """ Create a recipient with provided information
 
@@ -169,6 +247,8 @@ class Recipient:
 class Recipients:
     """ A Sequence of Recipients """
 
+    __slots__ = ('_parent', '_field', '_recipients', 'untrack')
+
     def __init__(self, recipients=None, parent=None, field=None):
         """ Recipients must be a list of either address strings or
         tuples (name, address) or dictionary elements
@@ -182,7 +262,8 @@ class Recipients:
         """
         self._parent = parent
         self._field = field
-        self._recipients = []
+        # empty instances share the same tuple until a recipient is added
+        self._recipients = ()
         self.untrack = True
         if recipients:
             self.add(recipients)
@@ -219,7 +300,7 @@ class Recipients:
 
     def clear(self):
         """ Clear the list of recipients """
-        self._recipients = []
+        self._recipients = ()
         self._track_changes()
 
     def add(self, recipients):
@@ -231,6 +312,8 @@ class Recipients:
         """
 
         if recipients:
+            if not isinstance(self._recipients, list):
+                self._recipients = list(self._recipients)
             if isinstance(recipients, str):
                 self._recipients.append(
                     Recipient(address=recipients, parent=self._parent,
@@ -321,6 +404,311 @@ class HandleRecipientsMixin:
         return data
 
 
+class ModelField:
+    """ Declares how a model attribute is read from and written to the cloud
+
+    A model lists them in ``_fields`` and loads / dumps them with
+    :class:`FieldTableMixin`.
+    """
+    __slots__ = ('name', 'attribute', 'parser', 'serializer', 'default', 'read_only')
+
+    def __init__(self, name, attribute, *, parser=None, serializer=None,
+                 default=None, read_only=False):
+        """ A model field
+
+        :param str name: the cloud (camelCase) key. It's converted with the
+         protocol casing
+        :param str attribute: the instance attribute (name mangled if private)
+        :param parser: ``callable(value, component)`` applied to the cloud value
+         when the key is present
+        :param serializer: ``callable(value, component)`` applied to the
+         attribute value when dumping
+        :param default: value when the key is missing. If callable
+         (ie. list) it's called to build a new value
+        :param bool read_only: if True the field is not dumped
+        """
+        self.name = name
+        self.attribute = attribute
+        self.parser = parser
+        self.serializer = serializer
+        self.default = default
+        self.read_only = read_only
+
+    def __repr__(self):
+        return 'ModelField({!r}, {!r})'.format(self.name, self.attribute)
+
+    @staticmethod
+    def datetime_parser(value, component):
+        """ Parser for cloud timestamps into the protocol timezone """
+        return parse_datetime(value).astimezone(component.protocol.timezone) if value else None
+
+    @staticmethod
+    def list_parser(value, component):
+        """ Parser that turns a null cloud value into an empty list """
+        return value or []
+
+    @staticmethod
+    def enum_parser(enum, default=None):
+        """ Returns a parser for cloud values of a :class:`CaseEnum`
+
+        :param enum: the CaseEnum subclass
+        :param str default: cloud value used when the value is null
+        """
+        def parser(value, component):
+            if value is None:
+                value = default
+            return enum.from_value(value)
+        return parser
+
+
+_compiled_field_tables = {}
+
+
+class FieldTableMixin:
+    """ Loads and dumps the ``_fields`` (a sequence of :class:`ModelField`)
+    of a model.
+
+    The table is compiled once per class and protocol casing into tuples of
+    precomputed cloud keys, so loading and dumping are a plain loop.
+
+    ``_state_fields`` lists the attributes loaded by hand (ids, dates,
+    facets...) that ``to_api_data`` doesn't return. With them the current
+    state of a model can be dumped back into cloud data, so no model needs
+    to keep the raw cloud dict around.
+    """
+
+    _fields = ()
+    _state_fields = ()
+
+    @classmethod
+    def _compile_fields(cls, protocol):
+        cache_key = (cls, protocol.use_default_casing, protocol.casing_function)
+        compiled = _compiled_field_tables.get(cache_key)
+        if compiled is None:
+            load = tuple(
+                (protocol.convert_case(field.name), field.attribute, field.parser,
+                 field.default, callable(field.default))
+                for field in cls._fields)
+            dump = tuple(
+                (protocol.convert_case(field.name), field.attribute, field.serializer)
+                for field in cls._fields if not field.read_only)
+            state = tuple(
+                (protocol.convert_case(field.name), field.attribute, field.serializer)
+                for field in cls._fields + cls._state_fields)
+            compiled = _compiled_field_tables[cache_key] = (load, dump, state)
+        return compiled
+
+    def _load_fields(self, cloud_data):
+        """ Sets all the table fields from the cloud data
+
+        :param dict cloud_data: the raw cloud data
+        """
+        load, _, _ = self._compile_fields(self.protocol)
+        missing = object()
+        for key, attribute, parser, default, default_factory in load:
+            value = cloud_data.get(key, missing)
+            if value is missing:
+                value = default() if default_factory else default
+            elif parser is not None:
+                value = parser(value, self)
+            setattr(self, attribute, value)
+
+    def _dump_fields(self):
+        """ Returns the writable table fields in cloud format
+
+        :rtype: dict
+        """
+        _, dump, _ = self._compile_fields(self.protocol)
+        data = {}
+        for key, attribute, serializer in dump:
+            value = getattr(self, attribute)
+            data[key] = serializer(value, self) if serializer is not None else value
+        return data
+
+    def _dump_state(self, keys=None):
+        """ Returns the current state of the model in cloud format: all the
+        table and state fields plus ``to_api_data``. Loading it into a new
+        model rebuilds this one.
+
+        :param set keys: cloud keys to restrict the returned data to.
+         ``to_api_data`` is only called when the tables don't hold them all
+        :rtype: dict
+        :raises ValueError: if a field value can't be converted to cloud data
+        """
+        _, _, state = self._compile_fields(self.protocol)
+        data = {}
+        for key, attribute, serializer in state:
+            if keys is None or key in keys:
+                value = getattr(self, attribute)
+                data[key] = (serializer(value, self) if serializer is not None
+                             else _cloud_value(value, self))
+        if hasattr(self, 'to_api_data') and (keys is None or not data.keys() >= keys):
+            for key, value in self.to_api_data().items():
+                if key not in data and (keys is None or key in keys):
+                    data[key] = value
+        return data
+
+
+def _cloud_value(value, component):
+    """ Converts an attribute value into cloud data """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return component._cc(value.value)
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_cloud_value(item, component) for item in value]
+    if isinstance(value, dict):
+        return {key: _cloud_value(item, component) for key, item in value.items()}
+    if isinstance(value, FieldTableMixin):
+        return value._dump_state()
+    if hasattr(value, 'to_api_data'):
+        return value.to_api_data()
+    raise ValueError("A '{}' value of '{}' can't be converted to cloud data".format(
+        type(value).__name__, type(component).__name__))
+
+
+class LazyDecodeMixin:
+    """ Allows a model to defer decoding of its expensive fields
+
+    Subclasses declare ``_lazy_fields``: a dict mapping the (name mangled)
+    attribute name to a decoder ``callable(self, cloud_data)``.
+    When created in lazy mode the raw cloud data is kept and each field is
+    decoded the first time it's accessed. After that it behaves as a plain
+    attribute, so setters and change tracking work as usual.
+    """
+
+    _lazy_fields = {}
+
+    def _init_lazy_fields(self, cloud_data, lazy=False):
+        """ Decodes all the lazy fields now or defers them to first access
+
+        :param dict cloud_data: the raw cloud data
+        :param bool lazy: whether to defer the decoding or not
+        """
+        if lazy:
+            self._lazy_cloud_data = cloud_data
+        else:
+            self._lazy_cloud_data = None
+            for attribute, decoder in self._lazy_fields.items():
+                setattr(self, attribute, decoder(self, cloud_data))
+
+    def __getattr__(self, name):
+        # only called when normal attribute lookup fails
+        cloud_data = self.__dict__.get('_lazy_cloud_data')
+        decoder = self._lazy_fields.get(name) if cloud_data is not None else None
+        if decoder is None:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                self.__class__.__name__, name))
+        value = decoder(self, cloud_data)
+        setattr(self, name, value)
+        return value
+
+
+class IdentityMap:
+    """ A bounded (LRU + TTL) cache of api objects keyed by resource kind
+    and object id.
+
+    It's shared by all the components of an Account through its Connection
+    (``Account(credentials, identity_map=True)``), so repeated lookups of
+    the same folder, drive, plan... return the cached instance.
+    Objects are invalidated when deleted, moved or updated through the library.
+    """
+
+    def __init__(self, max_size=1000, ttl=300):
+        """ An identity map
+
+        :param int max_size: max number of cached objects (least recently
+         used are dropped first)
+        :param float ttl: seconds an object is valid. None to never expire
+        """
+        #: Max number of cached objects. |br| **Type:** int
+        self.max_size = max_size
+        #: Seconds an object is valid. |br| **Type:** float
+        self.ttl = ttl
+        #: Number of lookups served from the cache. |br| **Type:** int
+        self.hits = 0
+        #: Number of lookups not found in the cache. |br| **Type:** int
+        self.misses = 0
+        self._objects = OrderedDict()  # (kind, object_id) -> (object, expires at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __repr__(self):
+        return 'IdentityMap: {} objects'.format(len(self._objects))
+
+    def get(self, kind, object_id):
+        """ Returns the cached object or None
+
+        :param str kind: the resource kind (ie. 'mail_folder')
+        :param str object_id: the object id
+        """
+        key = (kind, object_id)
+        with self._lock:
+            entry = self._objects.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                del self._objects[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._objects.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def add(self, kind, object_id, obj):
+        """ Caches an object
+
+        :param str kind: the resource kind (ie. 'mail_folder')
+        :param str object_id: the object id
+        :param obj: the object to cache. None is ignored
+        """
+        if obj is None or object_id is None:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        key = (kind, object_id)
+        with self._lock:
+            self._objects[key] = (obj, expires)
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+
+    def get_or_fetch(self, kind, object_id, fetch):
+        """ Returns the cached object or calls fetch and caches the result
+
+        :param str kind: the resource kind (ie. 'mail_folder')
+        :param str object_id: the object id
+        :param fetch: callable that retrieves the object from the cloud
+        """
+        obj = self.get(kind, object_id)
+        if obj is None:
+            obj = fetch()
+            self.add(kind, object_id, obj)
+        return obj
+
+    def invalidate(self, kind=None, object_id=None):
+        """ Removes an object, all the objects of a kind or everything
+
+        :param str kind: the resource kind. None removes everything
+        :param str object_id: the object id. None removes all the objects of kind
+        """
+        with self._lock:
+            if kind is None:
+                self._objects.clear()
+            elif object_id is not None:
+                self._objects.pop((kind, object_id), None)
+            else:
+                for key in [key for key in self._objects if key[0] == kind]:
+                    del self._objects[key]
+
+    def clear(self):
+        """ Removes all the cached objects """
+        self.invalidate()
+
+
 class ApiComponent:
     """ Base class for all object interactions with the Cloud Service API
 
@@ -329,6 +717,10 @@ class ApiComponent:
 
     _cloud_data_key = '__cloud_data__'  # wraps cloud data with this dict key
     _endpoints = {}  # dict of all API service endpoints needed
+    # property name -> cloud keys needed to build it (for fields=...)
+    _select_map = {}
+    # cloud keys always selected when using fields=...
+    _select_required = ('id',)
 
     def __init__(self, *, protocol=None, main_resource=None, **kwargs):
         """ Object initialization
@@ -444,7 +836,7 @@ class ApiComponent:
                 timezone = local_tz
             date_time = date_time_time_zone.get(self._cc('dateTime'), None)
             try:
-                date_time = parse(date_time).replace(tzinfo=timezone) if date_time else None
+                date_time = parse_datetime(date_time).replace(tzinfo=timezone) if date_time else None
             except OverflowError as e:
                 log.debug(f'Could not parse dateTimeTimeZone: {date_time_time_zone}. Error: {e}')
                 date_time = None
@@ -457,7 +849,7 @@ class ApiComponent:
         else:
             # Outlook v1.0 api compatibility (fallback to datetime string)
             try:
-                date_time = parse(date_time_time_zone).replace(tzinfo=local_tz) if date_time_time_zone else None
+                date_time = parse_datetime(date_time_time_zone).replace(tzinfo=local_tz) if date_time_time_zone else None
             except Exception as e:
                 log.debug(f'Could not parse dateTimeTimeZone: {date_time_time_zone}. Error: {e}')
                 date_time = None
@@ -501,12 +893,263 @@ class ApiComponent:
 
     q = new_query  # alias for new query
 
+    def _identity_lookup(self, kind, object_id, fetch):
+        """ Returns the object from the account identity map (when enabled)
+        or fetches it and caches it
+
+        :param str kind: the resource kind (ie. 'mail_folder')
+        :param str object_id: the object id
+        :param fetch: callable that retrieves the object from the cloud
+        """
+        identity_map = getattr(getattr(self, 'con', None), 'identity_map', None)
+        if identity_map is None or not object_id:
+            return fetch()
+        return identity_map.get_or_fetch(kind, object_id, fetch)
+
+    def _identity_invalidate(self, kind, object_id=None):
+        """ Removes an object (or all the objects of kind) from the account
+        identity map (when enabled) """
+        identity_map = getattr(getattr(self, 'con', None), 'identity_map', None)
+        if identity_map is not None:
+            identity_map.invalidate(kind, object_id)
+
+    def _apply_fields(self, params, constructor, fields):
+        """ Adds to params the $select needed by the fields of the listing
+
+        :param dict params: the request params (after applying the query)
+        :param constructor: the model class of the listed items
+        :param fields: property names or a LearnedProjection
+        :type fields: list[str] or LearnedProjection or None
+        """
+        select = select_fields(constructor, fields, self.protocol)
+        if not select:
+            return
+        if params.get('$select'):
+            select = list(dict.fromkeys(params['$select'].split(',') + select))
+        params['$select'] = ','.join(select)
+
+
+def _selectable_fields(constructor):
+    """ Returns the cloud keys of each selectable name of a model: the
+    attributes of its field tables (the private ones by the property
+    exposing them) and its ``_select_map`` """
+    selectable = {}
+    for field in (getattr(constructor, '_fields', ()) +
+                  getattr(constructor, '_state_fields', ())):
+        name = field.attribute
+        if name.startswith('_'):
+            name = name.rpartition('__')[2]  # ie. _Message__subject is exposed as subject
+            if not isinstance(inspect.getattr_static(constructor, name, None), property):
+                continue
+        selectable[name] = (field.name,)
+    selectable.update(getattr(constructor, '_select_map', {}))
+    return selectable
+
+
+def select_fields(constructor, fields, protocol):
+    """ Returns the minimal cloud keys to $select in order to build the
+    given properties of a model
+
+    :param constructor: the model class
+    :param fields: property names or a LearnedProjection
+    :type fields: list[str] or LearnedProjection or None
+    :param Protocol protocol: protocol used to convert the keys casing
+    :return: the cloud keys or None to select all
+    :rtype: list[str] or None
+    """
+    if isinstance(fields, LearnedProjection):
+        fields = fields.fields
+    if not fields:
+        return None
+    select_map = _selectable_fields(constructor)
+    select = dict.fromkeys(getattr(constructor, '_select_required', ('id',)))
+    for field in fields:
+        keys = select_map.get(field)
+        if keys is None:
+            raise ValueError("'{}' is not a field of {}".format(field, constructor.__name__))
+        select.update(dict.fromkeys(keys))
+    return [protocol.convert_case(key) for key in select]
+
+
+class _RecordingProxy:
+    """ Wraps an object observed by a LearnedProjection and records the
+    fields read through it. The object itself is left untouched, so the
+    library code working on it (to_api_data, __repr__...) is not recorded
+    """
+
+    __slots__ = ('_item', '_recordable', '_accessed')
+
+    def __init__(self, item, recordable, accessed):
+        object.__setattr__(self, '_item', item)
+        object.__setattr__(self, '_recordable', recordable)
+        object.__setattr__(self, '_accessed', accessed)
+
+    @property
+    def __class__(self):
+        return type(self._item)  # isinstance checks see the wrapped class
+
+    def __getattr__(self, name):
+        if name in self._recordable:
+            self._accessed.add(name)
+        return getattr(self._item, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._item, name, value)
+
+    def __delattr__(self, name):
+        delattr(self._item, name)
+
+    def __repr__(self):
+        return repr(self._item)
+
+    def __str__(self):
+        return str(self._item)
+
+    def __eq__(self, other):
+        return self._item == other
+
+    def __hash__(self):
+        return hash(self._item)
+
+    def __reduce_ex__(self, protocol):
+        return self._item.__reduce_ex__(protocol)  # pickles the wrapped object
+
+
+class LearnedProjection:
+    """ Learns which model properties are used in order to narrow the
+    $select of later listings.
+
+    Pass the same instance as ``fields`` to successive listing calls.
+    Until ``sample_size`` objects have been observed the listings select
+    every property and return the objects wrapped in a proxy that records
+    the properties accessed. After that the listings only select the
+    recorded ones (so any other property will hold its default value).
+    """
+
+    def __init__(self, sample_size=25):
+        """ A learned projection
+
+        :param int sample_size: number of objects to observe before narrowing
+        """
+        #: Number of objects to observe. |br| **Type:** int
+        self.sample_size = sample_size
+        #: Number of objects observed. |br| **Type:** int
+        self.observed = 0
+        #: The properties accessed on the observed objects. |br| **Type:** set[str]
+        self.accessed = set()
+        self._recordable = {}
+
+    def __repr__(self):
+        return 'LearnedProjection: {}'.format(
+            sorted(self.accessed) if self.learned else 'learning')
+
+    @property
+    def learned(self):
+        """ True once the sample has been observed
+
+        :rtype: bool
+        """
+        return self.observed >= self.sample_size
+
+    @property
+    def fields(self):
+        """ The properties to select or None while learning
+
+        :rtype: list[str] or None
+        """
+        return sorted(self.accessed) if self.learned else None
+
+    def _recordable_fields(self, cls):
+        recordable = self._recordable.get(cls)
+        if recordable is None:
+            # only model fields are recorded, never the ApiComponent
+            # internals (con, protocol, main_resource...)
+            internals = set(dir(ApiComponent))
+            recordable = self._recordable[cls] = frozenset(
+                name for name in _selectable_fields(cls) if name not in internals)
+        return recordable
+
+    def watch(self, items):
+        """ Records the property accesses on the items while learning
+
+        :param items: the model objects returned by a listing
+        :return: the items. While learning they are wrapped in a proxy
+         that behaves as the item
+        """
+        for item in items:
+            if not self.learned and hasattr(item, '__dict__') and not isinstance(
+                    item, _RecordingProxy):
+                item = _RecordingProxy(item, self._recordable_fields(type(item)), self.accessed)
+                self.observed += 1
+            yield item
+
+
+class _PagePrefetcher:
+    """ Fetches the next pages of a Pagination in a background thread.
+    At most 'depth' pages are buffered ahead of the consumer """
+
+    def __init__(self, con, next_link, depth, remaining=None):
+        self._queue = queue.Queue(maxsize=depth)
+        self._cancelled = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(target=self._run,
+                                        args=(con, next_link, remaining),
+                                        name='PaginationPrefetch', daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, con, next_link, remaining):
+        try:
+            while next_link and not self._cancelled.is_set():
+                response = con.get(next_link)
+                data = response.json() if response else None
+                if not self._put(data) or data is None:
+                    return
+                next_link = data.get(NEXT_LINK_KEYWORD, None) or None
+                if remaining is not None:
+                    remaining -= len(data.get('value', []))
+                    if remaining <= 0:
+                        break
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(None)
+
+    def get(self):
+        """ Returns the json data of the next page or None when exhausted """
+        if self._done:
+            return None
+        item = self._queue.get()
+        if item is None or isinstance(item, Exception):
+            self._done = True
+            if item is not None:
+                raise item
+        return item
+
+    def cancel(self):
+        """ Stops the background thread and drops the buffered pages """
+        self._cancelled.set()
+        self._done = True
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
 
 class Pagination(ApiComponent):
     """ Utility class that allows batching requests to the server """
 
     def __init__(self, *, parent=None, data=None, constructor=None,
-                 next_link=None, limit=None, **kwargs):
+                 next_link=None, limit=None, raw=False, prefetch=0, on_page=None, **kwargs):
         """Returns an iterator that returns data until it's exhausted.
         Then will request more data (same amount as the original request)
         to the server until this data is exhausted as well.
@@ -519,6 +1162,13 @@ class Pagination(ApiComponent):
          It can be a function.
         :param str next_link: the link to request more data to
         :param int limit: when to stop retrieving more data
+        :param raw: return the cloud dicts instead of calling the
+         constructor. Use 'snake_case' to also convert the keys to snake_case
+        :type raw: bool or str
+        :param int prefetch: number of pages to fetch ahead in a background
+         thread while the current one is being consumed. 0 disables it.
+        :param on_page: called with the cloud values of each new page before
+         building the objects from them
         :param kwargs: any extra key-word arguments to pass to the
          constructor.
         """
@@ -537,6 +1187,15 @@ class Pagination(ApiComponent):
         self.next_link = next_link
         #: The limit of when to stop. |br| **Type:** int
         self.limit = limit
+        #: Return raw cloud dicts ('snake_case' to convert the keys). |br| **Type:** bool or str
+        self.raw = raw
+        #: Pages to fetch ahead in the background (0 disables it). |br| **Type:** int
+        self.prefetch = prefetch
+        self.on_page = on_page
+        self._prefetcher = None
+        # link of the current page and items to skip on the next page (resume)
+        self._page_link = None
+        self._skip = 0
         #: The start data. |br| **Type:** any
         self.data = data = list(data) if data else []
 
@@ -571,27 +1230,61 @@ class Pagination(ApiComponent):
     def __iter__(self):
         return self
 
-    def __next__(self):
-        if self.state < self.data_count:
-            value = self.data[self.state]
-            self.state += 1
-            return value
-        else:
-            if self.limit and self.total_count >= self.limit:
-                raise StopIteration()
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """ Cancels any background prefetch of the next pages """
+        prefetcher = getattr(self, '_prefetcher', None)
+        if prefetcher is not None:
+            prefetcher.cancel()
+            self._prefetcher = None
+
+    def _start_prefetch(self):
+        """ Starts fetching the next pages in the background, so the
+        current page is processed while the next one is downloaded """
+        if (self.prefetch and self._prefetcher is None and self.next_link
+                and not (self.limit and self.total_count >= self.limit)):
+            remaining = self.limit - self.total_count if self.limit else None
+            self._prefetcher = _PagePrefetcher(self.con, self.next_link,
+                                               self.prefetch, remaining)
+
+    def _fetch_next_page(self):
+        """ Returns the json data of the page at next_link or None """
+        if not self.prefetch:
+            response = self.con.get(self.next_link)
+            return response.json() if response else None
+
+        self._start_prefetch()
+        return self._prefetcher.get()
+
+    def _load_next_page(self):
+        """ Requests the page at next_link and makes it the current page
+
+        :return: False when there is no more data
+        :rtype: bool
+        """
+        if self.limit and self.total_count >= self.limit:
+            self.close()
+            return False
 
         if self.next_link is None:
-            raise StopIteration()
-
-        response = self.con.get(self.next_link)
-        if not response:
-            raise StopIteration()
+            self.close()
+            return False
 
-        data = response.json()
+        page_link = self.next_link
+        data = self._fetch_next_page()
+        if not data:
+            self.close()
+            return False
 
         self.next_link = data.get(NEXT_LINK_KEYWORD, None) or None
         data = data.get('value', [])
-        if self.constructor:
+        if self.on_page is not None:
+            self.on_page(data)
+        if self.raw:
+            self.data = raw_cloud_values(data, self.raw)
+        elif self.constructor:
             # Everything  from cloud must be passed as self._cloud_data_key
             self.data = []
             kwargs = {}
@@ -615,14 +1308,194 @@ class Pagination(ApiComponent):
                 self.next_link = None  # stop batching
                 items_count = items_count + dif
         if items_count:
+            self._page_link = page_link
             self.data_count = items_count
             self.total_count += items_count
-            self.state = 0
-            value = self.data[self.state]
-            self.state += 1
-            return value
+            self.state = min(self._skip, items_count)
+            self._skip = 0
+            if self.state < self.data_count:
+                return True
+            return self._load_next_page()
         else:
+            self.close()
+            return False
+
+    def __next__(self):
+        if self._prefetcher is None:
+            self._start_prefetch()
+        if self.state >= self.data_count and not self._load_next_page():
             raise StopIteration()
+        value = self.data[self.state]
+        self.state += 1
+        return value
+
+    def pages(self):
+        """ Returns a generator of whole pages (lists of items).
+        The first page holds the items not yet consumed from the current one
+
+        :rtype: generator of list
+        """
+        self._start_prefetch()
+        while self.state < self.data_count or self._load_next_page():
+            page = self.data[self.state:self.data_count]
+            self.state = self.data_count
+            yield page
+
+    @property
+    def cursor(self):
+        """ A json serializable checkpoint of this iteration.
+        Pass it to :meth:`from_cursor` to resume the iteration later on.
+        It's None if the current page is the first one and it's not
+        fully consumed (so the listing must start over).
+
+        :rtype: dict or None
+        """
+        if self.state >= self.data_count:
+            # the current page is completed: resume on the next one
+            return {'next_link': self.next_link, 'total_count': self.total_count,
+                    'limit': self.limit, 'state': 0}
+        if self._page_link is None:
+            return None
+        return {'next_link': self._page_link,
+                'total_count': self.total_count - self.data_count,
+                'limit': self.limit, 'state': self.state}
+
+    @classmethod
+    def from_cursor(cls, cursor, *, parent=None, constructor=None, **kwargs):
+        """ Rebuilds a Pagination from a cursor to resume the iteration
+
+        :param dict cursor: a cursor obtained from :attr:`cursor`
+        :param parent: the parent class. Must implement attributes:
+         con, api_version, main_resource
+        :param constructor: the data constructor for the next batch.
+         It can be a function.
+        :param kwargs: any other Pagination argument (raw, prefetch...)
+         or extra key-word arguments to pass to the constructor.
+        :rtype: Pagination
+        """
+        pagination = cls(parent=parent, constructor=constructor,
+                         next_link=cursor.get('next_link'),
+                         limit=cursor.get('limit'), **kwargs)
+        pagination.total_count = cursor.get('total_count', 0)
+        pagination._skip = cursor.get('state', 0)
+        return pagination
+
+
+class _Descending:
+    """ Inverts the ordering of a sort key """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class _SourceReader:
+    """ Reads a source of merge_iterators in chunks (one chunk at a time) """
+
+    def __init__(self, index, source, chunk_size):
+        self.index = index
+        self.source = source
+        self.chunk_size = chunk_size
+        self.iterator = None
+
+    def read(self):
+        if self.iterator is None:
+            # callables are evaluated here, so the first request is concurrent too
+            source = self.source() if callable(self.source) else self.source
+            self.iterator = iter(source)
+        return list(islice(self.iterator, self.chunk_size))
+
+
+def _item_key(key):
+    if key is None or callable(key):
+        return key
+
+    def get_key(item):
+        return item[key] if isinstance(item, dict) else getattr(item, key)
+    return get_key
+
+
+def merge_iterators(sources, *, key=None, reverse=False, max_workers=4, chunk_size=50):
+    """ Iterates several listings concurrently and merges their items into
+    a single stream.
+
+    Each source is read in chunks by a pool of at most max_workers threads,
+    keeping one chunk read ahead per source.
+    When key is given the sources must already be sorted by it
+    (use the same order_by on every listing) and the items are k-way merged
+    into one sorted stream. Otherwise items are yielded as soon as any source
+    delivers them.
+
+    >>> messages = merge_iterators(
+    ...     [lambda f=folder: f.get_messages(limit=None, order_by='receivedDateTime desc')
+    ...      for folder in folders], key='received', reverse=True)
+
+    :param sources: the listings to merge. Iterables (ie. Pagination or
+     generators) or callables returning them. Callables are called from the
+     worker threads.
+    :param key: sort key of the sources: a callable or an attribute
+     (or dict key, for raw listings) name. None yields unordered.
+    :type key: callable or str or None
+    :param bool reverse: the sources are sorted in descending order
+    :param int max_workers: max number of concurrent requests
+    :param int chunk_size: number of items each worker reads from a source
+     at a time (use the page size of the sources)
+    :return: the items of all sources
+    :rtype: generator
+    """
+    readers = [_SourceReader(index, source, chunk_size)
+               for index, source in enumerate(sources)]
+    key = _item_key(key)
+    executor = ThreadPoolExecutor(max_workers=max_workers,
+                                  thread_name_prefix='MergeIterators')
+    try:
+        pending = {executor.submit(reader.read): reader for reader in readers}
+
+        if key is None:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    reader = pending.pop(future)
+                    chunk = future.result()
+                    if chunk:
+                        pending[executor.submit(reader.read)] = reader
+                        yield from chunk
+            return
+
+        wrap = _Descending if reverse else (lambda value: value)
+        futures = {reader.index: future for future, reader in pending.items()}
+        buffers = {}
+        heap = []  # holds the head item of each source: (key, source index, item)
+        exhausted = object()
+
+        def push(index):
+            item = next(buffers.get(index, iter(())), exhausted)
+            if item is exhausted:
+                if index not in futures:
+                    return
+                # use the read ahead chunk and start reading the next one
+                chunk = futures.pop(index).result()
+                if not chunk:
+                    return
+                futures[index] = executor.submit(readers[index].read)
+                buffers[index] = iter(chunk)
+                item = next(buffers[index])
+            heapq.heappush(heap, (wrap(key(item)), index, item))
+
+        for reader in readers:
+            push(reader.index)
+        while heap:
+            _, index, item = heapq.heappop(heap)
+            yield item
+            push(index)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Query:
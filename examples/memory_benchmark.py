@@ -0,0 +1,67 @@
+"""Measures the memory kept alive by Message objects built from cloud data.
+
+The api response is decoded while tracing and dropped once the messages are
+built, so the cloud data a message keeps (ie. in lazy mode) is counted.
+
+Usage: python examples/memory_benchmark.py [count]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from O365.connection import MSGraphProtocol
+from O365.message import Message
+
+
+def cloud_message(index):
+    return {
+        "id": "AAMkAGI2TG93AAA={}".format(index),
+        "createdDateTime": "2024-01-01T10:00:00Z",
+        "lastModifiedDateTime": "2024-01-01T10:00:00Z",
+        "receivedDateTime": "2024-01-01T10:00:00Z",
+        "sentDateTime": "2024-01-01T10:00:00Z",
+        "subject": "Message {}".format(index),
+        "bodyPreview": "Hello",
+        "isRead": False,
+        "importance": "normal",
+        "hasAttachments": False,
+        "from": {"emailAddress": {"name": "Sender", "address": "sender@example.com"}},
+        "sender": {"emailAddress": {"name": "Sender", "address": "sender@example.com"}},
+        "toRecipients": [{"emailAddress": {"name": "Me", "address": "me@example.com"}}],
+        "ccRecipients": [],
+        "bccRecipients": [],
+        "replyTo": [],
+        "categories": [],
+        "flag": {"flagStatus": "notFlagged"},
+    }
+
+
+def measure(count, **kwargs):
+    protocol = MSGraphProtocol()
+    response = json.dumps({"value": [cloud_message(index) for index in range(count)]})
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = json.loads(response)["value"]
+    messages = [
+        Message(con=object(), protocol=protocol, **{Message._cloud_data_key: item}, **kwargs)
+        for item in data
+    ]
+    del data  # only what the messages reference stays alive
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del messages
+    return used / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("messages: {}".format(count))
+    print("eager: {:.0f} bytes per message".format(measure(count)))
+    print("lazy:  {:.0f} bytes per message".format(measure(count, lazy=True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Fake connection and responses shared by the tests that don't hit the api"""
+import threading
+
+
+class MockResponse:
+    def __init__(self, data=None, content=b"", status_code=200, chunk_size=None):
+        self.data = data
+        self.content = content
+        self.status_code = status_code
+        self.chunk_size = chunk_size  # forces the chunk size of iter_content
+        self.chunk_sizes = []
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def json(self):
+        return self.data
+
+    def iter_content(self, chunk_size=None):
+        chunk_size = self.chunk_size or chunk_size or max(len(self.content), 1)
+        for start in range(0, len(self.content), chunk_size):
+            self.chunk_sizes.append(chunk_size)
+            yield self.content[start:start + chunk_size]
+
+
+class MockConnection:
+    """Records the GET requests and answers them from `pages`: a dict of
+    cloud data by url, or a list of cloud data served in order. Exceptions
+    found in the pages are raised. Subclasses override `respond`"""
+
+    def __init__(self, pages=None):
+        self.pages = pages
+        self.calls = []  # (url, params, kwargs)
+        self.lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return [url for url, _, _ in self.calls]
+
+    @property
+    def params(self):
+        return [params for _, params, _ in self.calls]
+
+    def get(self, url, params=None, **kwargs):
+        with self.lock:
+            self.calls.append((url, params, kwargs))
+        return self.respond(url, params, **kwargs)
+
+    def respond(self, url, params=None, **kwargs):
+        with self.lock:
+            page = self.pages.pop(0) if isinstance(self.pages, list) else self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return MockResponse(page)
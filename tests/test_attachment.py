@@ -0,0 +1,234 @@
+import io
+
+from mocks import MockConnection, MockResponse
+from requests.exceptions import ConnectionError
+
+from O365.connection import MSGraphProtocol
+from O365.mailbox import Folder
+from O365.message import Message
+
+CONTENT = b"x" * 2500
+
+
+class AttachmentsConnection(MockConnection):
+    def respond(self, url, params=None, **kwargs):
+        if url.endswith("/$value"):
+            return MockResponse(content=CONTENT)
+        return MockResponse({"value": [
+            {"@odata.type": "#microsoft.graph.fileAttachment", "id": "att1",
+             "name": "report.pdf", "size": len(CONTENT)},
+        ]})
+
+
+def message(con):
+    return Message(con=con, protocol=MSGraphProtocol(), main_resource="me",
+                   **{Message._cloud_data_key: {"id": "msg1", "hasAttachments": True}})
+
+
+class TestAttachmentDownload:
+    def test_metadata_only_listing(self):
+        con = AttachmentsConnection()
+        msg = message(con)
+        assert msg.attachments.download_attachments(metadata_only=True)
+        url, params, _ = con.calls[0]
+        assert url.endswith("/me/messages/msg1/attachments")
+        assert "contentBytes" not in params["$select"]
+        attachment = msg.attachments[0]
+        assert attachment.name == "report.pdf"
+        assert attachment.content is None
+
+    def test_stream_to_file(self, tmp_path):
+        con = AttachmentsConnection()
+        msg = message(con)
+        msg.attachments.download_attachments(metadata_only=True)
+        attachment = msg.attachments[0]
+        assert msg.attachments.download_attachment(attachment, tmp_path, chunk_size=1000)
+
+        url, _, kwargs = con.calls[-1]
+        assert url.endswith("/me/messages/msg1/attachments/att1/$value")
+        assert kwargs == {"stream": True}
+        assert (tmp_path / "report.pdf").read_bytes() == CONTENT
+        assert attachment.on_disk
+        assert attachment.size == len(CONTENT)
+
+    def test_stream_to_sink(self):
+        msg = message(AttachmentsConnection())
+        msg.attachments.download_attachments(metadata_only=True)
+        sink = io.BytesIO()
+        assert msg.attachments.download_attachment(msg.attachments[0], output=sink)
+        assert sink.getvalue() == CONTENT
+
+
+class UploadConnection:
+    def __init__(self):
+        self.puts = []
+
+    def post(self, url, data=None, **kwargs):
+        return MockResponse({"uploadUrl": "https://upload/session"})
+
+    def naive_request(self, url, method, data=None, headers=None):
+        self.puts.append((headers["Content-Range"], data))
+        response = MockResponse({"nextExpectedRanges": []})
+        response.status_code = 200
+        return response
+
+
+class TestLazyAttachmentUpload:
+    def test_file_is_read_on_demand(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"content")
+        msg = message(AttachmentsConnection())
+        msg.attachments.add(str(path))
+        attachment = msg.attachments[0]
+        assert attachment._content is None
+        assert attachment.size == 7
+        assert attachment.to_api_data()["contentBytes"] == "Y29udGVudA=="
+
+    def test_save_to_its_own_path(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"content")
+        msg = message(AttachmentsConnection())
+        msg.attachments.add(str(path))
+        assert msg.attachments[0].save(tmp_path)
+        assert path.read_bytes() == b"content"
+
+    def test_large_file_streams_to_upload_session(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("O365.utils.attachment.UPLOAD_SIZE_LIMIT_SIMPLE", 1000)
+        path = tmp_path / "big.bin"
+        path.write_bytes(CONTENT)
+        con = UploadConnection()
+        msg = message(con)
+        msg.attachments.add(str(path))
+        assert msg.attachments._update_attachments_to_cloud(chunk_size=1000)
+        assert [content_range for content_range, _ in con.puts] == [
+            "bytes 0-999/2500", "bytes 1000-1999/2500", "bytes 2000-2499/2500"]
+        assert b"".join(data for _, data in con.puts) == CONTENT
+        # the file was never encoded
+        assert msg.attachments[0]._content is None
+
+    def test_large_in_memory_object_is_not_encoded(self, monkeypatch):
+        monkeypatch.setattr("O365.utils.attachment.UPLOAD_SIZE_LIMIT_SIMPLE", 1000)
+        msg = message(AttachmentsConnection())
+        msg.attachments.add([(io.BytesIO(CONTENT), "big.bin")])
+        attachment = msg.attachments[0]
+        assert attachment._content is None
+        assert b"".join(attachment.iter_bytes(1000)) == CONTENT
+
+
+class FlakyUploadConnection(UploadConnection):
+    """Fails the second chunk once after storing half of it"""
+
+    def __init__(self):
+        super().__init__()
+        self.received = 0
+        self.failed = False
+
+    def naive_request(self, url, method, data=None, headers=None):
+        if method == "GET":
+            return MockResponse({"nextExpectedRanges": ["{}-".format(self.received)]})
+        start = int(headers["Content-Range"].split()[1].split("-")[0])
+        assert start == self.received
+        if start == 1000 and not self.failed:
+            self.failed = True
+            self.received += 500
+            raise ConnectionError("connection reset")
+        self.puts.append((headers["Content-Range"], data))
+        self.received = start + len(data)
+        response = MockResponse({"nextExpectedRanges": ["{}-".format(self.received)]})
+        response.status_code = 201 if self.received == len(CONTENT) else 200
+        return response
+
+
+class TestParallelAttachmentUpload:
+    def test_resume_and_progress(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("O365.utils.attachment.UPLOAD_SIZE_LIMIT_SIMPLE", 1000)
+        monkeypatch.setattr("O365.utils.attachment.time.sleep", lambda seconds: None)
+        path = tmp_path / "big.bin"
+        path.write_bytes(CONTENT)
+        con = FlakyUploadConnection()
+        msg = message(con)
+        msg.attachments.add(str(path))
+        calls = []
+        assert msg.attachments._update_attachments_to_cloud(
+            chunk_size=1000, progress=lambda attachment, done, total: calls.append(done))
+        assert [content_range for content_range, _ in con.puts] == [
+            "bytes 0-999/2500", "bytes 1500-2499/2500"]
+        assert calls == [1000, 2500]
+        assert msg.attachments[0].on_cloud
+
+    def test_concurrent_attachments(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("O365.utils.attachment.UPLOAD_SIZE_LIMIT_SIMPLE", 1000)
+        sessions = []
+
+        class SessionConnection(UploadConnection):
+            def post(self, url, data=None, **kwargs):
+                sessions.append(data["attachmentItem"]["name"])
+                return MockResponse({"uploadUrl": "https://upload/" + data["attachmentItem"]["name"]})
+
+        msg = message(SessionConnection())
+        for index in range(3):
+            path = tmp_path / "big{}.bin".format(index)
+            path.write_bytes(CONTENT)
+            msg.attachments.add(str(path))
+        assert msg.attachments._update_attachments_to_cloud(chunk_size=1000, max_workers=3)
+        assert sorted(sessions) == ["big0.bin", "big1.bin", "big2.bin"]
+        assert all(attachment.on_cloud for attachment in msg.attachments)
+
+
+class PrefetchConnection(MockConnection):
+    """Lists two pages of messages with expanded attachments and answers $batch requests"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    @staticmethod
+    def page(message_id, next_link=None):
+        data = {"value": [{"id": message_id, "hasAttachments": True, "attachments": [
+            {"@odata.type": "#microsoft.graph.fileAttachment", "id": "small", "name": "a.txt", "size": 10},
+            {"@odata.type": "#microsoft.graph.fileAttachment", "id": "big", "name": "b.bin", "size": 5000},
+        ]}]}
+        if next_link:
+            data["@odata.nextLink"] = next_link
+        return data
+
+    def respond(self, url, params=None, **kwargs):
+        if url == "page/2":
+            return MockResponse(self.page("msg2"))
+        return MockResponse(self.page("msg1", next_link="page/2"))
+
+    def post(self, url, data=None, **kwargs):
+        assert url.endswith("/$batch")
+        self.batches.append([request["url"] for request in data["requests"]])
+        return MockResponse({"responses": [
+            {"id": request["id"], "status": 200, "body": {
+                "@odata.type": "#microsoft.graph.fileAttachment", "id": "small", "name": "a.txt",
+                "size": 10, "contentBytes": "aGVsbG8="}}
+            for request in data["requests"]]})
+
+
+class TestAttachmentPrefetch:
+    def test_expand_and_batch_small_contents(self):
+        con = PrefetchConnection()
+        folder = Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+        messages = list(folder.get_messages(limit=None, batch=1, prefetch_attachments=True,
+                                            attachment_size_limit=1000))
+        assert con.params[0]["$expand"] == (
+            "attachments($select=id,name,contentType,size,isInline,lastModifiedDateTime)")
+        # one listing request per page and no per message attachment request
+        assert con.urls == ["https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages", "page/2"]
+        assert con.batches == [["/me/messages/msg1/attachments/small"],
+                               ["/me/messages/msg2/attachments/small"]]
+
+        for msg in messages:
+            small, big = msg.attachments
+            assert small.content == "aGVsbG8="
+            assert big.content is None  # left for a streamed download
+            assert big.size == 5000
+
+    def test_expand_everything(self):
+        con = PrefetchConnection()
+        folder = Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+        list(folder.get_messages(limit=1, prefetch_attachments=True, attachment_size_limit=None))
+        assert con.params[0]["$expand"] == "attachments"
+        assert con.batches == []
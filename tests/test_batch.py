@@ -0,0 +1,88 @@
+from mocks import MockConnection, MockResponse
+from requests import Response
+from requests.exceptions import HTTPError
+
+from O365.connection import MSGraphProtocol
+from O365.mailbox import Folder
+from O365.utils import execute_batch
+
+
+class BatchConnection(MockConnection):
+    """Answers $batch requests, throttling the first try of the given urls"""
+
+    def __init__(self, throttled=(), failed=()):
+        super().__init__()
+        self.throttled = set(throttled)
+        self.failed = set(failed)
+        self.batches = []
+
+    def post(self, url, data=None, **kwargs):
+        assert url == "https://graph.microsoft.com/v1.0/$batch"
+        with self.lock:
+            self.batches.append(data["requests"])
+        responses = []
+        for request in data["requests"]:
+            if request["url"] in self.throttled:
+                with self.lock:
+                    self.throttled.discard(request["url"])
+                responses.append({"id": request["id"], "status": 429, "headers": {"Retry-After": "0"}})
+            elif request["url"] in self.failed:
+                responses.append({"id": request["id"], "status": 404,
+                                  "body": {"error": {"code": "ErrorItemNotFound", "message": "Not found"}}})
+            else:
+                responses.append({"id": request["id"], "status": 200, "body": {"url": request["url"]}})
+        return MockResponse({"responses": list(reversed(responses))})
+
+
+def folder(con):
+    return Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+
+
+class TestBatch:
+    def test_chunks_and_order(self):
+        con = BatchConnection()
+        requests = [{"method": "delete", "url": "/me/messages/{}".format(i)} for i in range(45)]
+        results = execute_batch(con, MSGraphProtocol(), requests, max_workers=2)
+        assert [len(batch) for batch in con.batches] == [20, 20, 5]
+        assert [result.body["url"] for result in results] == [request["url"] for request in requests]
+        assert all(results)
+
+    def test_retry_throttled(self):
+        con = BatchConnection(throttled={"/me/messages/3"})
+        requests = [{"method": "DELETE", "url": "/me/messages/{}".format(i)} for i in range(5)]
+        results = execute_batch(con, MSGraphProtocol(), requests)
+        assert all(result.ok for result in results)
+        assert [request["url"] for request in con.batches[-1]] == ["/me/messages/3"]
+
+    def test_retry_throttled_batch_request(self):
+        con = BatchConnection()
+        post = con.post
+        throttled = Response()
+        throttled.status_code = 429
+        throttled.headers["Retry-After"] = "0"
+
+        def post_once_throttled(url, data=None, **kwargs):
+            con.post = post
+            raise HTTPError("429 Too Many Requests", response=throttled)
+
+        con.post = post_once_throttled
+        requests = [{"method": "DELETE", "url": "/me/messages/{}".format(i)} for i in range(3)]
+        results = execute_batch(con, MSGraphProtocol(), requests)
+        assert all(result.ok for result in results)
+        assert len(con.batches) == 1
+
+    def test_folder_bulk_operations(self):
+        con = BatchConnection(failed={"/me/messages/b/move"})
+        results = folder(con).bulk_move(["a", "b"], "archive")
+        assert [result.ok for result in results] == [True, False]
+        assert results[1].error == "Not found"
+        request = con.batches[0][0]
+        assert request["method"] == "POST"
+        assert request["url"] == "/me/messages/a/move"
+        assert request["body"] == {"destinationId": "archive"}
+        assert request["headers"]["Content-Type"] == "application/json"
+
+        folder(con).bulk_set_categories(["a"], ["Red"])
+        assert con.batches[-1][0]["body"] == {"categories": ["Red"]}
+        folder(con).bulk_delete(["a"])
+        assert con.batches[-1][0] == {"id": "0", "method": "DELETE", "url": "/me/messages/a"}
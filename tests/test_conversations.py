@@ -0,0 +1,104 @@
+import base64
+import uuid
+
+from mocks import MockConnection, MockResponse
+
+from O365.connection import MSGraphProtocol
+from O365.conversations import ConversationIndex, ThreadIndex
+from O365.mailbox import MailBox
+from O365.message import Message
+from O365.utils import RemovedItem
+
+GUID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+ROOT = b"\x01" + (0x01D9A1B2C3).to_bytes(5, "big") + GUID.bytes
+
+
+def index(*blocks):
+    return base64.b64encode(ROOT + b"".join(bytes([block]) * 5 for block in blocks)).decode()
+
+
+def cloud_message(object_id, conversation_index, conversation_id="conv1"):
+    return {
+        "id": object_id,
+        "subject": "Re: Hello",
+        "conversationId": conversation_id,
+        "conversationIndex": conversation_index,
+        "receivedDateTime": "2024-01-01T10:00:00Z",
+        "from": {"emailAddress": {"address": "jane@example.com"}},
+    }
+
+
+def message(*args, **kwargs):
+    return Message(con=object(), protocol=MSGraphProtocol(), main_resource="me",
+                   **{Message._cloud_data_key: cloud_message(*args, **kwargs)})
+
+
+class MessagesConnection(MockConnection):
+    def __init__(self, messages):
+        super().__init__()
+        self.messages = messages
+
+    def respond(self, url, params=None, **kwargs):
+        return MockResponse({"value": self.messages})
+
+
+class TestConversationIndex:
+    def test_parse(self):
+        root = ConversationIndex(index())
+        reply = ConversationIndex(index(1, 2))
+        assert root.depth == 0
+        assert reply.depth == 2
+        assert reply.guid == GUID
+        assert reply.started.year >= 2023
+        assert reply.parent.parent == root
+        assert root.parent is None
+        assert root < reply
+
+
+class TestThreadIndex:
+    def test_thread_order(self):
+        threads = ThreadIndex()
+        threads.add([
+            message("c", index(1, 2)),
+            message("a", index()),
+            message("b", index(1)),
+            message("d", index(3)),
+            message("x", index(), conversation_id="other"),
+        ])
+        assert [ref.object_id for ref in threads.get_thread("c")] == ["a", "b", "c", "d"]
+        assert threads.missing_members("conv1") == []
+        assert len(threads) == 5
+
+        threads.add([RemovedItem("b")])
+        assert "b" not in threads
+        assert threads.missing_members("conv1") == [ConversationIndex(index(1))]
+
+    def test_fetch_only_when_missing(self):
+        con = MessagesConnection([cloud_message("a", index()), cloud_message("b", index(1)),
+                              cloud_message("c", index(1, 2))])
+        box = MailBox(con=con, protocol=MSGraphProtocol(), main_resource="me")
+        threads = ThreadIndex()
+        threads.add([message("c", index(1, 2))])
+
+        thread = threads.get_thread("c", mailbox=box)
+        assert [ref.object_id for ref in thread] == ["a", "b", "c"]
+        assert con.params[0]["$filter"] == "conversationId eq 'conv1'"
+        assert "conversationIndex" in con.params[0]["$select"]
+
+        threads.get_thread("c", mailbox=box)
+        assert len(con.params) == 1
+
+    def test_unresolvable_gaps_are_fetched_once(self):
+        # the replied message is not in the mailbox anymore
+        con = MessagesConnection([cloud_message("c", index(1, 2))])
+        box = MailBox(con=con, protocol=MSGraphProtocol(), main_resource="me")
+        threads = ThreadIndex()
+        threads.add([message("c", index(1, 2))])
+
+        for _ in range(3):
+            assert [ref.object_id for ref in threads.get_thread("c", mailbox=box)] == ["c"]
+        assert len(con.params) == 1
+
+        threads.add([message("e", index(4, 5))])  # a new gap is fetched
+        threads.get_thread("c", mailbox=box)
+        assert len(con.params) == 2
@@ -0,0 +1,127 @@
+from mocks import MockConnection, MockResponse
+
+from O365.connection import MSGraphProtocol
+from O365.dedupe import DedupeIndex
+from O365.mailbox import Folder
+from O365.message import Message
+
+BASE = "https://graph.microsoft.com/v1.0/"
+
+
+def cloud_message(object_id, internet_message_id, subject="Hello"):
+    return {
+        "id": object_id,
+        "internetMessageId": internet_message_id,
+        "subject": subject,
+        "sentDateTime": "2024-01-01T10:00:00Z",
+        "from": {"emailAddress": {"address": "jane@example.com"}},
+    }
+
+
+class MessagesConnection(MockConnection):
+    def __init__(self, messages):
+        super().__init__()
+        self.messages = messages
+
+    @property
+    def fetched(self):
+        return [url for url in self.urls if not url.endswith("/messages")]
+
+    def respond(self, url, params=None, **kwargs):
+        if url.endswith("/$value"):
+            return MockResponse(content=b"Subject: Hello\r\n\r\nHi\r\n")
+        if url.endswith("/messages"):
+            return MockResponse({"value": self.messages})
+        object_id = url.rsplit("/", 1)[-1]
+        return MockResponse(next(message for message in self.messages if message["id"] == object_id))
+
+
+def folder(con, user):
+    return Folder(con=con, protocol=MSGraphProtocol(), main_resource="users/" + user,
+                  folder_id="inbox")
+
+
+class TestDedupeIndex:
+    def test_keys(self):
+        index = DedupeIndex(":memory:")
+        data = cloud_message("1", "<abc@example.com>")
+        message = Message(con=object(), protocol=MSGraphProtocol(), main_resource="me",
+                          **{Message._cloud_data_key: data})
+        assert index.key_of(data) == index.key_of(message) == index.key_of(
+            cloud_message("2", " <abc@example.com>"))
+        no_id = cloud_message("3", "")
+        assert index.key_of(no_id) != index.key_of(cloud_message("4", "", subject="Other"))
+
+        assert index.add([data, message, no_id]) == 2
+        assert message in index
+        assert len(index) == 2
+
+    def test_persistent(self, tmp_path):
+        path = tmp_path / "seen.db"
+        index = DedupeIndex(path)
+        index.add([cloud_message("1", "<a@x>")])
+        index.close()
+        assert DedupeIndex(path).seen(cloud_message("9", "<a@x>"))
+
+    def test_new_messages_across_mailboxes(self):
+        index = DedupeIndex(":memory:")
+        first = MessagesConnection([cloud_message("1", "<a@x>"), cloud_message("2", "<b@x>"),
+                                cloud_message("3", "<a@x>")])
+        second = MessagesConnection([cloud_message("9", "<b@x>"), cloud_message("8", "<c@x>")])
+
+        assert [m.object_id for m in index.new_messages(folder(first, "jane"))] == ["1", "2"]
+        assert "internetMessageId" in first.params[0]["$select"]
+        assert "body" not in first.params[0]["$select"].split(",")
+
+        new = list(index.new_messages(folder(second, "john"), fetch=True))
+        assert [m.object_id for m in new] == ["8"]
+        assert second.fetched == [BASE + "users/john/messages/8"]
+        assert len(index) == 3
+
+    def test_marks_in_batches(self):
+        index = DedupeIndex(":memory:")
+        commits = []
+        add = index.add
+        index.add = lambda messages: commits.append(len(messages)) or add(messages)
+        messages = [cloud_message(str(i), "<{}@x>".format(i)) for i in range(5)]
+
+        assert len(list(index.filter_new(messages + messages[:1], batch=2))) == 5
+        assert commits == [2, 2, 1]
+        assert len(index) == 5
+
+        # closing the generator early commits what was yielded
+        new = index.filter_new([cloud_message("6", "<6@x>"), cloud_message("7", "<7@x>")])
+        next(new)
+        new.close()
+        assert commits[3:] == [1]
+        assert index.seen(cloud_message("6", "<6@x>"))
+
+    def test_export_skips_duplicates(self, tmp_path):
+        index = DedupeIndex(":memory:")
+        index.add([cloud_message("x", "<a@x>")])
+        con = MessagesConnection([cloud_message("1", "<a@x>"), cloud_message("2", "<b@x>"),
+                              cloud_message("3", "<b@x>")])
+        result = folder(con, "jane").export_mime(tmp_path, dedupe=index)
+        assert result == {"exported": 1, "skipped": 0, "duplicated": 2, "failed": {}}
+        assert con.fetched == [BASE + "users/jane/messages/2/$value"]
+        assert index.seen(cloud_message("2", "<b@x>"))
+
+    def test_failed_export_releases_its_key(self, tmp_path):
+        index = DedupeIndex(":memory:")
+        con = MessagesConnection([cloud_message("1", "<a@x>"), cloud_message("2", "<a@x>")])
+        get = con.get
+
+        def get_failing_first(url, params=None, **kwargs):
+            if url.endswith("/1/$value"):
+                raise ConnectionError("network down")
+            return get(url, params=params, **kwargs)
+
+        con.get = get_failing_first
+        result = folder(con, "jane").export_mime(tmp_path, dedupe=index)
+        assert result == {"exported": 0, "skipped": 0, "duplicated": 1,
+                          "failed": {"1": "network down"}}
+        assert not index.seen(cloud_message("1", "<a@x>"))
+
+        con.get = get
+        result = folder(con, "jane").export_mime(tmp_path, dedupe=index)
+        assert (result["exported"], result["duplicated"]) == (1, 1)
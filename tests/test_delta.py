@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+from mocks import MockConnection
+
+from O365.connection import MSGraphProtocol
+from O365.mailbox import Folder
+from O365.message import Message
+from O365.utils import (
+    FileSystemDeltaStateBackend,
+    MemoryDeltaStateBackend,
+    RemovedItem,
+    SQLiteDeltaStateBackend,
+)
+from O365.utils.utils import DELTA_LINK_KEYWORD, NEXT_LINK_KEYWORD
+
+
+class DefaultHeadersConnection(MockConnection):
+    """Merges its default headers into the request ones, like Connection"""
+
+    default_headers = {"Prefer": 'outlook.timezone="UTC"'}
+
+    def get(self, url, params=None, **kwargs):
+        if "headers" not in kwargs:
+            kwargs["headers"] = {**self.default_headers}
+        else:
+            prefer = kwargs["headers"]["Prefer"]
+            kwargs["headers"]["Prefer"] = "{}, {}".format(prefer, self.default_headers["Prefer"])
+        return super().get(url, params, **kwargs)
+
+
+FIRST_URL = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages/delta"
+
+
+def folder(con):
+    return Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+
+
+class TestMessagesDelta:
+    def test_sync_and_resume(self):
+        con = MockConnection({
+            FIRST_URL: {"value": [{"id": "1"}, {"id": "2"}], NEXT_LINK_KEYWORD: "skip/1"},
+            "skip/1": {"value": [{"id": "3"}], DELTA_LINK_KEYWORD: "delta/1"},
+            "delta/1": {
+                "value": [{"id": "2", "@removed": {"reason": "deleted"}}, {"id": "4"}],
+                DELTA_LINK_KEYWORD: "delta/2",
+            },
+        })
+        inbox = folder(con)
+        state = MemoryDeltaStateBackend()
+
+        changes = inbox.get_messages_delta(state_backend=state, batch=10)
+        first = [next(changes), next(changes)]
+        assert all(isinstance(message, Message) for message in first)
+        assert con.calls == [(FIRST_URL, None, {"headers": {"Prefer": "odata.maxpagesize=10"}})]
+        # the first page is not processed yet
+        assert state.load_link("me/mailFolders/inbox/messages") is None
+        assert [message.object_id for message in changes] == ["3"]
+        assert state.load_link("me/mailFolders/inbox/messages") == "delta/1"
+
+        changes = list(inbox.get_messages_delta(state_backend=state))
+        assert changes[0] == RemovedItem("2")
+        assert changes[0].reason == "deleted"
+        assert changes[1].object_id == "4"
+        assert con.calls[-1][0] == "delta/1"
+        assert state.load_link("me/mailFolders/inbox/messages") == "delta/2"
+
+    def test_interrupted_sync_resumes_at_page(self):
+        con = MockConnection({
+            FIRST_URL: {"value": [{"id": "1"}], NEXT_LINK_KEYWORD: "skip/1"},
+            "skip/1": {"value": [{"id": "2"}], DELTA_LINK_KEYWORD: "delta/1"},
+        })
+        inbox = folder(con)
+        changes = inbox.get_messages_delta()
+        next(changes)
+        next(changes)  # the first page is completed
+        changes.close()
+
+        assert [message.object_id for message in inbox.get_messages_delta()] == ["2"]
+        assert con.calls[-1][0] == "skip/1"
+
+    def test_headers_are_not_shared_between_pages(self):
+        pages = {
+            FIRST_URL: {"value": [{"id": "1"}], NEXT_LINK_KEYWORD: "skip/1"},
+            "skip/1": {"value": [{"id": "2"}], DELTA_LINK_KEYWORD: "delta/1"},
+        }
+        con = DefaultHeadersConnection(pages)
+        assert len(list(folder(con).get_messages_delta(batch=5))) == 2
+        assert [kwargs["headers"]["Prefer"] for _, _, kwargs in con.calls] == [
+            'odata.maxpagesize=5, outlook.timezone="UTC"'] * 2
+
+        con = DefaultHeadersConnection(pages)
+        assert len(list(folder(con).get_messages_delta())) == 2
+        assert [kwargs["headers"] for _, _, kwargs in con.calls] == [con.default_headers] * 2
+
+
+class TestDeltaStateBackends:
+    def test_backends(self, tmp_path):
+        backends = [
+            MemoryDeltaStateBackend(),
+            FileSystemDeltaStateBackend(tmp_path / "state" / "delta.json"),
+            SQLiteDeltaStateBackend(str(tmp_path / "delta.db")),
+        ]
+        for backend in backends:
+            assert backend.load_link("inbox") is None
+            backend.save_link("inbox", "delta/1")
+            backend.save_link("inbox", "delta/2")
+            backend.save_link("sent", "delta/3")
+            assert backend.load_link("inbox") == "delta/2"
+            backend.delete_link("inbox")
+            assert backend.load_link("inbox") is None
+            assert backend.load_link("sent") == "delta/3"
+
+        # the persistent backends keep the state between instances
+        assert FileSystemDeltaStateBackend(tmp_path / "state" / "delta.json").load_link("sent") == "delta/3"
+        assert SQLiteDeltaStateBackend(str(tmp_path / "delta.db")).load_link("sent") == "delta/3"
+
+    def test_shared_connection_lock(self):
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        lock = threading.Lock()
+        backend = SQLiteDeltaStateBackend(":memory:", connection=connection, lock=lock)
+        with lock:
+            writer = threading.Thread(target=backend.save_link, args=("inbox", "delta/1"))
+            writer.start()
+            writer.join(0.1)
+            assert writer.is_alive()  # waits for the owner of the connection
+        writer.join()
+        assert backend.load_link("inbox") == "delta/1"
@@ -0,0 +1,89 @@
+import mailbox
+import zipfile
+
+from mocks import MockConnection, MockResponse
+
+from O365.connection import MSGraphProtocol
+from O365.mailbox import Folder
+
+BASE = "https://graph.microsoft.com/v1.0/me/"
+MESSAGE_IDS = ["AAA/1+", "AAA/2+", "AAA/3+"]
+
+
+def mime(message_id):
+    return "Subject: {}\r\n\r\nHello\r\nFrom here\r\n".format(message_id).encode()
+
+
+def downloaded_id(url):
+    return url[len(BASE + "messages/"):-len("/$value")]
+
+
+class ExportConnection(MockConnection):
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+
+    @property
+    def downloads(self):
+        return [downloaded_id(url) for url in self.urls if url.endswith("/$value")]
+
+    def respond(self, url, params=None, **kwargs):
+        if url.endswith("/$value"):
+            message_id = downloaded_id(url)
+            assert kwargs == {"stream": True}
+            if message_id in self.failing:
+                return MockResponse(status_code=500)
+            return MockResponse(content=mime(message_id), chunk_size=7)
+        return MockResponse({"value": [
+            {"id": message_id, "receivedDateTime": "2024-01-01T10:00:00Z"} for message_id in MESSAGE_IDS
+        ]})
+
+
+def folder(con):
+    return Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+
+
+class TestExportMime:
+    def test_file_names(self):
+        # ids differing only in case don't collide on case insensitive file systems
+        names = {Folder._mime_file_name(message_id).casefold() for message_id in ("AAb/1+", "AAB/1+")}
+        assert len(names) == 2
+        assert all(name.endswith(".eml") and "/" not in name for name in names)
+
+    def test_export_eml_and_resume(self, tmp_path):
+        con = ExportConnection(failing={"AAA/2+"})
+        result = folder(con).export_mime(tmp_path)
+        assert con.params[0]["$select"] == "id,isDraft,receivedDateTime"
+        assert result["exported"] == 2
+        assert list(result["failed"]) == ["AAA/2+"]
+        assert (tmp_path / Folder._mime_file_name("AAA/1+")).read_bytes() == mime("AAA/1+")
+        assert not list(tmp_path.glob("*.part"))
+
+        con = ExportConnection()
+        result = folder(con).export_mime(tmp_path)
+        assert con.downloads == ["AAA/2+"]
+        assert result == {"exported": 1, "skipped": 2, "failed": {}}
+
+    def test_export_zip(self, tmp_path):
+        path = tmp_path / "inbox.zip"
+        result = folder(ExportConnection()).export_mime(path, archive="zip", limit=3)
+        assert result["exported"] == 3
+        with zipfile.ZipFile(path) as archive:
+            assert archive.read(Folder._mime_file_name("AAA/3+")) == mime("AAA/3+")
+
+        con = ExportConnection()
+        assert folder(con).export_mime(path, archive="zip")["skipped"] == 3
+        assert con.downloads == []
+
+    def test_export_mbox(self, tmp_path):
+        path = tmp_path / "inbox.mbox"
+        exported = []
+        folder(ExportConnection(failing={"AAA/3+"})).export_mime(
+            path, archive="mbox", progress=lambda message_id, count: exported.append(message_id))
+        assert exported == ["AAA/1+", "AAA/2+"]
+        result = folder(ExportConnection()).export_mime(path, archive="mbox")
+        assert result == {"exported": 1, "skipped": 2, "failed": {}}
+
+        messages = list(mailbox.mbox(str(path)))
+        assert [message["Subject"] for message in messages] == MESSAGE_IDS[:2] + ["AAA/3+"]
+        assert ">From here" in messages[0].get_payload()
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+from requests import Response
+from requests.exceptions import HTTPError, ReadTimeout
+
+from O365.fanout import FanOutError, MailboxFanOut
+from O365.utils import (
+    FileSystemDeltaStateBackend,
+    MemoryDeltaStateBackend,
+    SQLiteDeltaStateBackend,
+)
+
+
+def throttled_error(retry_after="0", status_code=429):
+    response = Response()
+    response.status_code = status_code
+    response.headers["Retry-After"] = retry_after
+    return HTTPError("{} Error".format(status_code), response=response)
+
+
+class FakeMailbox:
+    def __init__(self, resource):
+        self.main_resource = resource
+
+
+class FakeAccount:
+    def mailbox(self, resource=None):
+        return FakeMailbox(resource)
+
+
+class TestMailboxFanOut:
+    def test_bounded_concurrency_and_results(self):
+        lock = threading.Lock()
+        active = [0, 0]
+        finished = [0]
+
+        def resources():
+            for index in range(10):
+                # resources are pulled lazily, as workers get free
+                assert index - finished[0] < 3
+                yield "users/user{}@example.com".format(index)
+
+        def scan(mailbox, checkpoint):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+                finished[0] += 1
+            yield mailbox.main_resource.upper()
+
+        result = MailboxFanOut(FakeAccount(), max_workers=3).run(resources(), scan)
+        assert result.ok
+        assert active[1] <= 3
+        assert len(result.results) == 10
+        assert result.results["users/user1@example.com"] == ["USERS/USER1@EXAMPLE.COM"]
+
+    def test_throttled_mailbox_resumes_from_checkpoint(self):
+        calls = []
+
+        def scan(mailbox, checkpoint):
+            calls.append((mailbox.main_resource, checkpoint.state))
+            if mailbox.main_resource == "a" and checkpoint.state is None:
+                checkpoint.save({"page": 2})
+                raise throttled_error()
+            return "done"
+
+        result = MailboxFanOut(FakeAccount()).run(["a", "b", "a"], scan)
+        assert result.results == {"a": "done", "b": "done"}
+        assert result.throttled == 1
+        assert ("a", {"page": 2}) in calls
+        assert len(calls) == 3
+
+    def test_read_errors_are_retried(self):
+        errors = [ReadTimeout("read timed out"), throttled_error(status_code=504)]
+
+        def scan(mailbox, checkpoint):
+            if errors:
+                raise errors.pop(0)
+            return "done"
+
+        result = MailboxFanOut(FakeAccount(), backoff=0.01).run(["a"], scan)
+        assert result.results == {"a": "done"}
+        assert result.throttled == 2
+
+        result = MailboxFanOut(FakeAccount()).run(["a"], lambda mailbox, checkpoint: 1 / 0)
+        assert isinstance(result.errors["a"], ZeroDivisionError)
+
+    def test_checkpoints_apart_from_links(self, tmp_path):
+        backends = [MemoryDeltaStateBackend(), FileSystemDeltaStateBackend(tmp_path / "state.json"),
+                    SQLiteDeltaStateBackend(tmp_path / "state.db")]
+        for backend in backends:
+            backend.save_link("fan_out:a", "https://graph/delta")
+            fan_out = MailboxFanOut(FakeAccount(), state_backend=backend)
+            fan_out.checkpoint("a").save({"page": 2})
+            assert backend.load_link("fan_out:a") == "https://graph/delta"
+            assert fan_out.checkpoint("a").state == {"page": 2}
+            fan_out.checkpoint("a").reset()
+            assert backend.load_checkpoint("fan_out:a") is None
+            assert backend.load_link("fan_out:a") == "https://graph/delta"
+
+    def test_errors_and_resumed_runs(self, tmp_path):
+        backend = FileSystemDeltaStateBackend(tmp_path / "checkpoints.json")
+        progress = []
+
+        def scan(mailbox, checkpoint):
+            if mailbox.main_resource == "bad":
+                raise ValueError("no mailbox")
+            return 1
+
+        fan_out = MailboxFanOut(FakeAccount(), state_backend=backend,
+                                progress=lambda resource, value: progress.append(resource))
+        result = fan_out.run(["good", "bad"], scan)
+        assert list(result.errors) == ["bad"]
+        assert sorted(progress) == ["bad", "good"]
+        with pytest.raises(FanOutError):
+            result.raise_for_errors()
+
+        # a new run only processes the mailboxes not completed
+        second = MailboxFanOut(FakeAccount(), state_backend=backend).run(["good", "bad"], scan)
+        assert second.skipped == ["good"]
+        assert list(second.errors) == ["bad"]
+        third = MailboxFanOut(FakeAccount(), state_backend=backend).run(["good"], scan, restart=True)
+        assert third.results == {"good": 1}
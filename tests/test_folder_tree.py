@@ -0,0 +1,68 @@
+from mocks import MockConnection, MockResponse
+
+from O365.connection import MSGraphProtocol
+from O365.mailbox import MailBox
+from O365.utils.utils import NEXT_LINK_KEYWORD
+
+BASE = "https://graph.microsoft.com/v1.0/me/mailFolders"
+
+
+def folder(folder_id, name, parent_id, children=0):
+    return {"id": folder_id, "displayName": name, "parentFolderId": parent_id,
+            "childFolderCount": children}
+
+
+PAGES = {
+    BASE: {"value": [folder("inbox", "Inbox", "root", 2)], NEXT_LINK_KEYWORD: "page/2"},
+    "page/2": {"value": [folder("sent", "Sent Items", "root")]},
+    BASE + "/inbox/childFolders": {"value": [folder("customers", "Customers", "inbox", 1),
+                                             folder("news", "News", "inbox")]},
+    BASE + "/customers/childFolders": {"value": [folder("acme", "ACME", "customers")]},
+    BASE + "/delta": {"value": [folder("acme", "ACME", "customers"), folder("inbox", "Inbox", "root", 1)],
+                      NEXT_LINK_KEYWORD: "delta/2"},
+    "delta/2": {"value": [folder("customers", "Customers", "inbox", 1)]},
+}
+
+
+def mailbox(con):
+    return MailBox(con=con, protocol=MSGraphProtocol(), main_resource="me")
+
+
+class TestFolderTree:
+    def test_tree(self):
+        con = MockConnection(PAGES)
+        box = mailbox(con)
+        tree = box.get_folder_tree()
+        assert len(tree) == 5
+        # only folders with children are requested
+        assert sorted(con.urls) == sorted([BASE, "page/2", BASE + "/inbox/childFolders",
+                                            BASE + "/customers/childFolders"])
+
+        acme = tree["Inbox/Customers/ACME"]
+        assert acme.folder_id == "acme"
+        assert tree.get("/inbox/customers/acme/") is acme
+        assert tree.get("Inbox/Missing") is None
+        assert tree.get_by_id("customers") is acme.parent
+        assert tree.path_of(acme) == "Inbox/Customers/ACME"
+        assert tree.get("Inbox").parent is box
+        assert [f.name for f in tree.children_of("Inbox")] == ["Customers", "News"]
+        assert [path for path, _ in tree.walk()] == [
+            "Inbox", "Inbox/Customers", "Inbox/Customers/ACME", "Inbox/News", "Sent Items"]
+
+        assert box.get_folder_tree() is tree
+        assert box.get_folder_tree(refresh=True) is not tree
+
+    def test_invalidated_by_folder_changes(self):
+        con = MockConnection(PAGES)
+        box = mailbox(con)
+        tree = box.get_folder_tree()
+        con.post = lambda url, data=None, **kwargs: MockResponse(folder("new", "New", "acme"))
+        tree["Inbox/Customers/ACME"].create_child_folder("New")
+        assert tree.stale
+        assert box.get_folder_tree() is not tree
+
+    def test_delta(self):
+        con = MockConnection(PAGES)
+        tree = mailbox(con).get_folder_tree(use_delta=True)
+        assert con.urls == [BASE + "/delta", "delta/2"]
+        assert tree.path_of("acme") == "Inbox/Customers/ACME"
@@ -0,0 +1,99 @@
+import pytest
+from mocks import MockConnection
+
+from O365.connection import MSGraphProtocol
+from O365.mail_index import MailIndex
+from O365.mailbox import Folder
+from O365.message import Message
+from O365.utils import RemovedItem
+from O365.utils.utils import DELTA_LINK_KEYWORD, NEXT_LINK_KEYWORD
+
+
+def cloud_message(object_id, subject, body, sender="jane@example.com", **data):
+    return dict({
+        "id": object_id,
+        "subject": subject,
+        "parentFolderId": "inbox",
+        "receivedDateTime": "2024-01-01T10:00:00Z",
+        "body": {"contentType": "html", "content": "<html><body><p>{}</p></body></html>".format(body)},
+        "from": {"emailAddress": {"name": "Jane", "address": sender}},
+        "toRecipients": [{"emailAddress": {"name": "Support", "address": "support@example.com"}}],
+        "categories": ["Customers"],
+    }, **data)
+
+
+def message(*args, **kwargs):
+    return Message(con=object(), protocol=MSGraphProtocol(), main_resource="me",
+                   **{Message._cloud_data_key: cloud_message(*args, **kwargs)})
+
+
+class TestMailIndex:
+    def setup_method(self):
+        self.index = MailIndex(":memory:")
+        self.index.add([
+            message("1", "Invoice 42", "The payment is due tomorrow"),
+            message("2", "Lunch", "Pizza or sushi?", sender="john@contoso.com"),
+        ])
+
+    def teardown_method(self):
+        self.index.close()
+
+    def search(self, text, **kwargs):
+        return [m.object_id for m in self.index.search(text, con=object(), protocol=MSGraphProtocol(), **kwargs)]
+
+    def test_search_fields(self):
+        assert len(self.index) == 2
+        assert self.search("payment") == ["1"]
+        assert self.search("subject:lunch") == ["2"]
+        assert self.search("sender:contoso") == ["2"]
+        assert sorted(self.search("recipients:support")) == ["1", "2"]
+        assert self.search("categories:customers", limit=1) in (["1"], ["2"])
+        assert self.search("payment", folder_id="sent") == []
+
+    def test_search_hydrates_messages(self):
+        found = next(self.index.search("invoice", con=object(), protocol=MSGraphProtocol()))
+        assert isinstance(found, Message)
+        assert found.subject == "Invoice 42"
+        assert found.sender.address == "jane@example.com"
+
+    def test_fetch_needs_a_parent(self):
+        with pytest.raises(ValueError):
+            self.index.search("invoice", fetch=True)
+
+    def test_update_and_remove(self):
+        self.index.add(message("1", "Invoice 43", "Paid"))
+        assert self.search("payment") == []
+        assert self.search("paid") == ["1"]
+        self.index.add([RemovedItem("2")])
+        assert self.search("lunch") == []
+        assert len(self.index) == 1
+
+    def test_sync(self, tmp_path):
+        index = MailIndex(tmp_path / "mail.db")
+        con = MockConnection([
+            {"value": [cloud_message("1", "Invoice", "due")], DELTA_LINK_KEYWORD: "delta/1"},
+            {"value": [{"id": "1", "@removed": {"reason": "deleted"}}], DELTA_LINK_KEYWORD: "delta/2"},
+        ])
+        inbox = Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+        assert index.sync(inbox) == 1
+        assert len(index) == 1
+        assert index.sync(inbox) == 1
+        assert len(index) == 0
+        assert con.urls[-1] == "delta/1"
+        index.close()
+
+    def test_interrupted_sync_keeps_committed_pages(self):
+        index = MailIndex(":memory:")
+        con = MockConnection([
+            {"value": [cloud_message("1", "Invoice", "due")], NEXT_LINK_KEYWORD: "skip/1"},
+            ConnectionError("network down"),
+            {"value": [cloud_message("2", "Lunch", "pizza")], DELTA_LINK_KEYWORD: "delta/1"},
+        ])
+        inbox = Folder(con=con, protocol=MSGraphProtocol(), main_resource="me", folder_id="inbox")
+        with pytest.raises(ConnectionError):
+            index.sync(inbox)
+        assert len(index) == 1  # the first page was committed before moving on
+        assert index.sync(inbox) == 1
+        assert con.urls[-1] == "skip/1"  # the state lives in the same database
+        assert len(index) == 2
+        index.close()
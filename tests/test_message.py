@@ -64,6 +64,33 @@ class TestMessageData:
         assert msg.flag.status is Flag.NotFlagged
         assert msg.importance is ImportanceLevel.Normal
 
+    def test_lazy(self):
+        cloud_data = {
+            "id": "123",
+            "subject": "Test",
+            "receivedDateTime": "2024-01-01T10:00:00Z",
+            "from": {"emailAddress": {"address": "alice@example.com"}},
+            "toRecipients": [{"emailAddress": {"address": "bob@example.com"}}],
+            "importance": "high",
+            "flag": {"flagStatus": "flagged"},
+        }
+        eager = message(__cloud_data__=cloud_data)
+        msg = message(__cloud_data__=cloud_data, lazy=True)
+        assert "_Message__received" not in msg.__dict__
+        assert msg.subject == "Test"
+        assert "_Message__to" not in msg.__dict__
+
+        assert msg.received == eager.received
+        assert msg.sender.address == "alice@example.com"
+        assert [r.address for r in msg.to] == ["bob@example.com"]
+        assert msg.importance is ImportanceLevel.High
+        assert msg.flag.status is Flag.Flagged
+        assert not msg._track_changes
+
+        msg.to.add("carol@example.com")
+        assert msg._track_changes == {"toRecipients"}
+        assert len(msg.to) == 2
+
     def test_changes(self):
         msg = message()
         msg.is_read = True
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+from requests import Response
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, ReadTimeout
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from O365 import Account
+from O365.outbox import Outbox
+from O365.utils import is_retryable
+
+
+def throttled_error(retry_after="0", status_code=429):
+    response = Response()
+    response.status_code = status_code
+    response.headers["Retry-After"] = retry_after
+    return HTTPError("429 Too Many Requests", response=response)
+
+
+class FakeMessage:
+    """Records the concurrent sends per mailbox"""
+
+    lock = threading.Lock()
+
+    def __init__(self, mailbox, counters, errors=()):
+        self.main_resource = mailbox
+        self.counters = counters
+        self.errors = list(errors)
+        self.sent = False
+
+    def send(self, save_to_sent_folder=True):
+        with self.lock:
+            active = self.counters.setdefault(self.main_resource, [0, 0])
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.01)
+        with self.lock:
+            active[0] -= 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent = True
+        return True
+
+
+class TestOutbox:
+    def test_sends_across_mailboxes(self):
+        counters = {}
+        messages = [FakeMessage("users/box{}".format(i % 3), counters) for i in range(30)]
+        with Outbox(max_workers=9, mailbox_concurrency=2) as outbox:
+            futures = outbox.send_many(messages)
+            assert outbox.join(timeout=10)
+        assert all(future.result() for future in futures)
+        assert all(message.sent for message in messages)
+        # never over the per mailbox limit
+        assert max(peak for _, peak in counters.values()) <= 2
+
+        stats = outbox.stats
+        assert stats["sent"] == 30
+        assert stats["queued"] == 0
+        assert stats["throughput"] > 0
+        assert stats["latency_avg"] > 0
+        assert stats["latency_p95"] > 0
+        assert stats["mailboxes"]["users/box0"]["sent"] == 10
+
+    def test_retries_throttled(self):
+        counters = {}
+        throttled = FakeMessage("users/a", counters, errors=[throttled_error(), throttled_error()])
+        failing = FakeMessage("users/b", counters, errors=[ValueError("invalid")])
+        with Outbox(max_retries=3) as outbox:
+            sent = outbox.submit(throttled)
+            failed = outbox.submit(failing)
+        assert sent.result() is True
+        with pytest.raises(ValueError):
+            failed.result()
+        stats = outbox.stats
+        assert stats["retried"] == 2
+        assert stats["failed"] == 1
+        assert stats["mailboxes"]["users/a"]["throttled"] == 2
+
+    def test_gives_up_after_max_retries(self):
+        message = FakeMessage("users/a", {}, errors=[throttled_error() for _ in range(3)])
+        with Outbox(max_retries=1) as outbox:
+            future = outbox.submit(message)
+        with pytest.raises(HTTPError):
+            future.result()
+
+    def test_only_unsent_requests_are_retried(self):
+        refused = MaxRetryError(None, "/sendMail", NewConnectionError(None, "refused"))
+        assert is_retryable(throttled_error(status_code=503))
+        assert is_retryable(ConnectTimeout())
+        assert is_retryable(ConnectionError(refused))
+        assert not is_retryable(throttled_error(status_code=504))
+        assert not is_retryable(ReadTimeout())
+        assert not is_retryable(ConnectionError(ProtocolError("Connection aborted.")))
+
+        message = FakeMessage("users/a", {}, errors=[ReadTimeout()])
+        with Outbox(max_retries=3) as outbox:
+            future = outbox.submit(message)
+        with pytest.raises(ReadTimeout):
+            future.result()
+        assert outbox.stats["retried"] == 0
+
+    def test_closed(self):
+        outbox = Outbox()
+        outbox.close()
+        with pytest.raises(RuntimeError):
+            outbox.submit(FakeMessage("users/a", {}))
+
+    def test_account_outbox(self):
+        account = Account(("client_id", "client_secret"), auth_flow_type="credentials",
+                          tenant_id="tenant_id")
+        outbox = account.outbox(max_workers=2)
+        assert outbox.parent is account
+        assert outbox.max_workers == 2
+
+        message = outbox.new_message("users/a@example.com")
+        assert message.con is account.con
+        assert message.main_resource == "users/a@example.com"
+        with pytest.raises(ValueError):
+            outbox.submit(FakeMessage("users/a", {}))
+        with pytest.raises(RuntimeError):
+            Outbox().new_message()
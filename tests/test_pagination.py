@@ -0,0 +1,136 @@
+import json
+import time
+from types import SimpleNamespace
+
+from mocks import MockConnection, MockResponse
+
+from O365.connection import MSGraphProtocol
+from O365.utils import Pagination, merge_iterators
+from O365.utils.utils import NEXT_LINK_KEYWORD
+
+
+class PagesConnection(MockConnection):
+    """Serves `pages` pages of `size` items, linked by next links"""
+
+    def __init__(self, pages=5, size=3):
+        super().__init__(pages)
+        self.size = size
+
+    def page(self, number):
+        data = {"value": [{"id": number * self.size + i} for i in range(self.size)]}
+        if number + 1 < self.pages:
+            data[NEXT_LINK_KEYWORD] = "page/{}".format(number + 1)
+        return data
+
+    def respond(self, url, params=None, **kwargs):
+        return MockResponse(self.page(int(url.split("/")[1])))
+
+
+def parent(con):
+    return SimpleNamespace(con=con, protocol=MSGraphProtocol(), main_resource="me")
+
+
+def pagination(con, **kwargs):
+    first = con.page(0)
+    return Pagination(
+        parent=parent(con),
+        data=first["value"],
+        next_link=first[NEXT_LINK_KEYWORD],
+        **kwargs
+    )
+
+
+class TestPagination:
+    def test_iterates_all_pages(self):
+        con = PagesConnection()
+        assert [item["id"] for item in pagination(con)] == list(range(15))
+        assert con.urls == ["page/1", "page/2", "page/3", "page/4"]
+
+    def test_prefetch(self):
+        con = PagesConnection()
+        pages = pagination(con, prefetch=2)
+        assert [item["id"] for item in pages] == list(range(15))
+        assert con.urls == ["page/1", "page/2", "page/3", "page/4"]
+        assert pages._prefetcher is None
+
+    def test_prefetch_overlaps_first_page(self):
+        con = PagesConnection()
+        pages = pagination(con, prefetch=1)
+        assert next(pages)["id"] == 0
+        # the second page is requested while the first one is consumed
+        deadline = time.monotonic() + 2
+        while not con.urls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert con.urls[:1] == ["page/1"]
+        assert [item["id"] for item in pages] == list(range(1, 15))
+        assert con.urls == ["page/1", "page/2", "page/3", "page/4"]
+
+    def test_prefetch_stops_at_limit(self):
+        con = PagesConnection(pages=10)
+        pages = pagination(con, limit=7, prefetch=3)
+        assert [item["id"] for item in pages] == list(range(7))
+        # only the pages needed to reach the limit are requested
+        assert con.urls == ["page/1", "page/2"]
+
+    def test_prefetch_close(self):
+        con = PagesConnection(pages=100)
+        pages = pagination(con, prefetch=2)
+        next(pages)  # starts the prefetch thread
+        thread = pages._prefetcher._thread
+        pages.close()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+        assert len(con.urls) < 100
+
+    def test_pages(self):
+        con = PagesConnection()
+        pages = pagination(con)
+        next(pages)
+        assert [[item["id"] for item in page] for page in pages.pages()] == [
+            [1, 2], [3, 4, 5], [6, 7, 8], [9, 10, 11], [12, 13, 14]
+        ]
+
+    def test_cursor_resume(self):
+        con = PagesConnection()
+        pages = pagination(con, limit=13)
+        for _ in range(3):
+            next(pages)
+        assert pages.cursor == {"next_link": "page/1", "total_count": 3, "limit": 13, "state": 0}
+        next(pages)
+        next(pages)
+        # the current page is not completed: resume inside it
+        cursor = json.loads(json.dumps(pages.cursor))
+        assert cursor == {"next_link": "page/1", "total_count": 3, "limit": 13, "state": 2}
+
+        resumed = Pagination.from_cursor(cursor, parent=parent(con))
+        assert [item["id"] for item in resumed] == list(range(5, 13))
+
+    def test_cursor_first_page(self):
+        pages = pagination(PagesConnection())
+        next(pages)
+        assert pages.cursor is None
+
+
+class TestMergeIterators:
+    def test_ordered(self):
+        sources = [range(0, 30, 3), range(1, 30, 3), lambda: iter(range(2, 30, 3)), []]
+        merged = merge_iterators(sources, key=lambda item: item, max_workers=2, chunk_size=4)
+        assert list(merged) == list(range(30))
+
+    def test_ordered_descending_by_attribute(self):
+        sources = [
+            [{"received": value} for value in (9, 5, 1)],
+            [{"received": value} for value in (8, 7, 2)],
+        ]
+        merged = merge_iterators(sources, key="received", reverse=True, chunk_size=2)
+        assert [item["received"] for item in merged] == [9, 8, 7, 5, 2, 1]
+
+    def test_unordered(self):
+        sources = [range(i * 10, i * 10 + 10) for i in range(5)]
+        merged = merge_iterators(sources, max_workers=3, chunk_size=3)
+        assert sorted(merged) == list(range(50))
+
+    def test_close_early(self):
+        merged = merge_iterators([range(1000), range(1000)], key=lambda item: item)
+        assert [next(merged) for _ in range(3)] == [0, 0, 1]
+        merged.close()
@@ -0,0 +1,99 @@
+import datetime as dt
+
+import pytest
+
+from O365.connection import MSGraphProtocol
+from O365.message import Message
+from O365.utils import QueryBuilder, compile_filter, compile_order_by
+from O365.utils.query import IterableFilter, LogicalFilter
+
+builder = QueryBuilder(MSGraphProtocol())
+
+
+def cloud_message(object_id, subject, sender, received, is_read=False, to=(), categories=()):
+    return {
+        "id": object_id,
+        "subject": subject,
+        "isRead": is_read,
+        "receivedDateTime": received,
+        "from": {"emailAddress": {"address": sender}},
+        "toRecipients": [{"emailAddress": {"address": address}} for address in to],
+        "categories": list(categories),
+    }
+
+
+MESSAGES = [
+    cloud_message("1", "Invoice March", "billing@acme.com", "2024-03-01T10:00:00Z",
+                  to=["jane@example.com"], categories=["Finance"]),
+    cloud_message("2", "Lunch?", "bob@example.com", "2024-03-02T12:00:00Z", is_read=True,
+                  to=["jane@example.com", "team@example.com"]),
+    cloud_message("3", "Re: invoice march", "jane@example.com", "2024-02-28T08:00:00Z",
+                  to=["billing@acme.com"]),
+]
+
+
+def ids(query, items=MESSAGES):
+    predicate = compile_filter(query)
+    return [item["id"] for item in items if predicate(item)]
+
+
+class TestCompileFilter:
+    def test_logical_and_functions(self):
+        assert ids(builder.equals("is_read", False)) == ["1", "3"]
+        assert ids(builder.contains("subject", "INVOICE")) == ["1", "3"]
+        assert ids(builder.startswith("subject", "re:")) == ["3"]
+        assert ids(builder.equals("from", "bob@example.com")) == ["2"]
+        assert ids(builder.greater_equal("received_date_time", dt.datetime(
+            2024, 3, 1, tzinfo=dt.timezone.utc))) == ["1", "2"]
+
+    def test_chain_negate_group(self):
+        query = builder.group(builder.contains("subject", "invoice") | builder.equals("is_read", True))
+        assert ids(query) == ["1", "2", "3"]
+        query = builder.negate(builder.equals("is_read", True)) & builder.endswith("from", "acme.com")
+        assert ids(query) == ["1"]
+
+    def test_iterables(self):
+        # toRecipients/any(a: a/emailAddress/address eq 'team@example.com')
+        query = IterableFilter("any", "toRecipients",
+                               LogicalFilter("eq", "emailAddress/address", "'team@example.com'"))
+        assert ids(query) == ["2"]
+        # categories/any(a: a eq 'finance')
+        assert ids(IterableFilter("any", "categories", LogicalFilter("eq", None, "'finance'"))) == ["1"]
+        # recipients path fans out over the collection
+        assert ids(builder.equals("to", "jane@example.com")) == ["1", "2"]
+
+    def test_model_objects(self):
+        messages = [Message(con=object(), protocol=MSGraphProtocol(), main_resource="me",
+                            **{Message._cloud_data_key: data}) for data in MESSAGES]
+        messages[0].subject = "Hello"  # pending changes are seen by the predicate
+        predicate = compile_filter(builder.contains("subject", "invoice"))
+        assert [message.object_id for message in messages if predicate(message)] == ["3"]
+
+        messages[0].is_read = True  # not serialized by to_api_data
+        predicate = compile_filter(builder.equals("is_read", True))
+        assert [message.object_id for message in messages if predicate(message)] == ["1", "2"]
+
+        # saved changes are seen too: the objects don't keep their cloud data
+        messages[1]._track_changes.clear()
+        messages[1].sender = "alice@example.com"
+        messages[1]._track_changes.clear()
+        predicate = compile_filter(builder.equals("from", "alice@example.com"))
+        assert [message.object_id for message in messages if predicate(message)] == ["2"]
+        key = compile_order_by(builder.orderby(("subject", True)))
+        assert [message.object_id for message in sorted(messages, key=key)] == ["1", "2", "3"]
+
+    def test_search_is_rejected(self):
+        with pytest.raises(ValueError):
+            compile_filter(builder.search("invoice"))
+
+
+class TestCompileOrderBy:
+    def test_sort_key(self):
+        query = builder.orderby(("is_read", True), ("receivedDateTime", False))
+        assert [item["id"] for item in sorted(MESSAGES, key=compile_order_by(query))] == ["1", "3", "2"]
+        query = builder.equals("is_read", False) & builder.orderby("subject")
+        key = query.as_sort_key()
+        assert [item["id"] for item in sorted(filter(query.as_predicate(), MESSAGES), key=key)] == ["1", "3"]
+
+    def test_no_order(self):
+        assert compile_order_by(builder.equals("is_read", False)) is None
@@ -1,6 +1,6 @@
 import pytest
 
-from O365.utils import Recipient
+from O365.utils import Recipient, Recipients
 
 
 class TestRecipient:
@@ -19,3 +19,13 @@ class TestRecipient:
 
         recipient = Recipient(address="john@example.com", name="John Doe")
         assert str(recipient) == "John Doe <john@example.com>"
+
+    def test_compact(self):
+        assert not hasattr(Recipient(), "__dict__")
+
+        first, second = Recipients(), Recipients()
+        assert first._recipients is second._recipients  # shared empty
+        first.add("john@example.com")
+        assert len(first) == 1 and len(second) == 0
+        first.clear()
+        assert not first
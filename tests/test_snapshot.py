@@ -0,0 +1,120 @@
+import io
+import json
+
+import pytest
+from mocks import MockResponse
+
+from O365.calendar import Event
+from O365.connection import MSGraphProtocol
+from O365.message import Message
+from O365.utils import dump_snapshot, dump_snapshots, load_snapshot, load_snapshots
+
+CLOUD_MESSAGE = {
+    "id": "123",
+    "subject": "Hello",
+    "receivedDateTime": "2024-01-01T10:00:00Z",
+    "isDraft": False,
+    "from": {"emailAddress": {"name": "Jane", "address": "jane@example.com"}},
+    "toRecipients": [{"emailAddress": {"address": "john@example.com"}}],
+}
+
+
+def message(**data):
+    return Message(
+        con=object(), protocol=MSGraphProtocol(), main_resource="users/jane",
+        **{Message._cloud_data_key: dict(CLOUD_MESSAGE, **data)}
+    )
+
+
+class TestSnapshot:
+    def test_round_trip(self):
+        original = message()
+        original._track_changes.clear()
+        original.subject = "Changed"
+
+        snapshot = dump_snapshot(original)
+        assert isinstance(snapshot, bytes)
+
+        con = object()
+        loaded = load_snapshot(snapshot, con=con, protocol=MSGraphProtocol())
+        assert type(loaded) is Message
+        assert loaded.con is con
+        assert loaded.main_resource == "users/jane"
+        assert loaded.object_id == "123"
+        assert loaded.subject == "Changed"
+        assert loaded.received == original.received
+        assert loaded.sender.address == "jane@example.com"
+        assert loaded._track_changes == {"subject"}
+
+    def test_pending_changes_without_api_data(self):
+        original = message()
+        original._track_changes.clear()
+        original.is_read = True  # to_api_data doesn't serialize isRead
+        loaded = load_snapshot(dump_snapshot(original), con=object(), protocol=MSGraphProtocol())
+        assert loaded.is_read is True
+        assert loaded._track_changes == {"isRead"}
+
+    def test_saved_changes(self):
+        class SaveConnection:
+            def post(self, url, data=None, **kwargs):
+                return MockResponse({"id": "new", "parentFolderId": "drafts",
+                                     "createdDateTime": "2024-01-02T10:00:00Z"})
+
+            def patch(self, url, data=None, **kwargs):
+                return MockResponse({})
+
+        draft = Message(con=SaveConnection(), protocol=MSGraphProtocol(), main_resource="me")
+        draft.subject = "Draft"
+        assert draft.save_draft()
+        loaded = load_snapshot(dump_snapshot(draft), con=object(), protocol=MSGraphProtocol())
+        assert (loaded.object_id, loaded.subject, loaded.folder_id) == ("new", "Draft", "drafts")
+        assert loaded.created == draft.created
+        assert loaded.is_draft
+
+        existing = message(subject="Old")
+        existing.con = SaveConnection()
+        existing.subject = "New"
+        assert existing.save_draft()
+        loaded = load_snapshot(dump_snapshot(existing), con=object(), protocol=MSGraphProtocol())
+        assert loaded.subject == "New"
+        assert not loaded._track_changes
+        assert not hasattr(existing, "_snapshot_data")
+
+    def test_event(self):
+        original = Event(con=object(), protocol=MSGraphProtocol(), main_resource="me", **{
+            Event._cloud_data_key: {
+                "id": "ev1", "subject": "Review", "showAs": "free", "isAllDay": False,
+                "start": {"dateTime": "2024-01-01T10:00:00", "timeZone": "UTC"},
+                "end": {"dateTime": "2024-01-01T11:00:00", "timeZone": "UTC"},
+                "organizer": {"emailAddress": {"address": "jane@example.com"}},
+                "responseStatus": {"response": "accepted", "time": "2024-01-01T09:00:00Z"},
+            }})
+        loaded = load_snapshot(dump_snapshot(original), con=object(), protocol=MSGraphProtocol())
+        assert type(loaded) is Event
+        assert (loaded.object_id, loaded.subject) == ("ev1", "Review")
+        assert loaded.show_as is original.show_as
+        assert (loaded.start, loaded.end) == (original.start, original.end)
+        assert loaded.organizer.address == "jane@example.com"
+        assert loaded.response_status.status is original.response_status.status
+        assert loaded.response_status.response_time == original.response_status.response_time
+
+    def test_unknown_types_are_refused(self):
+        snapshot = json.loads(dump_snapshot(message()))
+        snapshot["type"] = "os.system"
+        with pytest.raises(ValueError):
+            load_snapshot(json.dumps(snapshot), con=object(), protocol=MSGraphProtocol())
+        loaded = load_snapshot(json.dumps(snapshot), con=object(), protocol=MSGraphProtocol(),
+                               constructor=Message)
+        assert loaded.subject == "Hello"
+
+    def test_bulk(self, tmp_path):
+        messages = [message(id=str(i)) for i in range(3)]
+        for path in (str(tmp_path / "page.jsonl"), str(tmp_path / "page.jsonl.gz")):
+            assert dump_snapshots(messages, path) == 3
+            loaded = list(load_snapshots(path, con=object(), protocol=MSGraphProtocol()))
+            assert [m.object_id for m in loaded] == ["0", "1", "2"]
+
+        buffer = io.StringIO()
+        dump_snapshots(messages, buffer)
+        buffer.seek(0)
+        assert len(list(load_snapshots(buffer, con=object(), protocol=MSGraphProtocol()))) == 3
@@ -0,0 +1,178 @@
+import datetime as dt
+import pickle
+import time
+
+import pytest
+
+from O365.utils import (
+    IdentityMap,
+    LearnedProjection,
+    parse_datetime,
+    raw_cloud_values,
+    select_fields,
+    snake_case_keys,
+)
+
+
+class TestParseDatetime:
+    def test_graph_formats(self):
+        utc = dt.timezone.utc
+        assert parse_datetime("2024-01-01T10:00:00Z") == dt.datetime(2024, 1, 1, 10, tzinfo=utc)
+        assert parse_datetime("2024-01-01T10:00:00.1234567Z") == dt.datetime(
+            2024, 1, 1, 10, 0, 0, 123456, tzinfo=utc
+        )
+        assert parse_datetime("2024-01-01T10:00:00.5Z") == dt.datetime(
+            2024, 1, 1, 10, 0, 0, 500000, tzinfo=utc
+        )
+        assert parse_datetime("2024-01-01T10:00:00+02:00").utcoffset() == dt.timedelta(hours=2)
+
+    def test_naive_and_date_only(self):
+        assert parse_datetime("2024-01-01T10:00:00.0000000") == dt.datetime(2024, 1, 1, 10)
+        assert parse_datetime("2024-01-01") == dt.datetime(2024, 1, 1)
+
+    def test_fallback(self):
+        assert parse_datetime("Jan 1 2024 10:00") == dt.datetime(2024, 1, 1, 10)
+
+
+class TestRawCloudValues:
+    def test_snake_case_keys(self):
+        data = {"receivedDateTime": "x", "from": {"emailAddress": {"name": "n"}},
+                "toRecipients": [{"emailAddress": {"address": "a"}}]}
+        assert snake_case_keys(data) == {
+            "received_date_time": "x",
+            "from": {"email_address": {"name": "n"}},
+            "to_recipients": [{"email_address": {"address": "a"}}],
+        }
+
+    def test_raw_cloud_values(self):
+        values = [{"isRead": True}]
+        assert raw_cloud_values(values) == values
+        assert raw_cloud_values(values, "snake_case") == [{"is_read": True}]
+
+
+class TestFieldTable:
+    def contact(self, data):
+        from O365.address_book import Contact
+        from O365.connection import MSGraphProtocol
+
+        return Contact(con=object(), protocol=MSGraphProtocol(), **{Contact._cloud_data_key: data})
+
+    def test_load_and_dump(self):
+        contact = self.contact({
+            "id": "1",
+            "createdDateTime": "2024-01-01T10:00:00Z",
+            "givenName": "Jane",
+            "businessPhones": None,
+            "parentFolderId": "folder",
+            "emailAddresses": [{"name": "Jane", "address": "jane@example.com"}],
+        })
+        assert contact.name == "Jane"
+        assert contact.display_name == ""
+        assert contact.business_phones == []
+        assert contact.folder_id == "folder"
+        assert contact.created == dt.datetime(2024, 1, 1, 10, tzinfo=dt.timezone.utc)
+
+        data = contact.to_api_data()
+        assert data["givenName"] == "Jane"
+        assert data["emailAddresses"] == [{"name": "Jane", "address": "jane@example.com"}]
+        assert "parentFolderId" not in data and "createdDateTime" not in data
+
+        contact.surname = "Doe"
+        assert contact.to_api_data(restrict_keys=contact._track_changes) == {
+            "givenName": "Jane", "surname": "Doe"
+        }
+
+    def test_defaults_are_not_shared(self):
+        first, second = self.contact({}), self.contact({})
+        first.categories.append("red")
+        assert second.categories == []
+
+    def test_event_enum_fields(self):
+        from O365.calendar import Event, EventShowAs
+        from O365.connection import MSGraphProtocol
+        from O365.utils import ImportanceLevel
+
+        event = Event(con=object(), protocol=MSGraphProtocol(),
+                      **{Event._cloud_data_key: {"showAs": "free", "importance": None}})
+        assert event.show_as is EventShowAs.Free
+        assert event.importance is ImportanceLevel.Normal
+        assert event.is_reminder_on and event.remind_before_minutes == 15
+
+
+class TestSelectFields:
+    def test_select_fields(self):
+        from O365.connection import MSGraphProtocol
+        from O365.message import Message
+
+        protocol = MSGraphProtocol()
+        assert select_fields(Message, None, protocol) is None
+        assert select_fields(Message, ["sender", "subject", "to"], protocol) == [
+            "id", "isDraft", "from", "subject", "toRecipients"
+        ]
+        with pytest.raises(ValueError):
+            select_fields(Message, ["subjet"], protocol)
+
+    def test_learned_projection(self):
+        from O365.connection import MSGraphProtocol
+        from O365.message import Message
+
+        protocol = MSGraphProtocol()
+        projection = LearnedProjection(sample_size=2)
+        messages = [
+            Message(con=object(), protocol=protocol,
+                    **{Message._cloud_data_key: {"id": str(i), "subject": "s"}})
+            for i in range(3)
+        ]
+        assert projection.fields is None
+        for message in projection.watch(messages):
+            assert message.subject == "s"
+            message.body  # noqa
+            message.is_read  # noqa
+            message.mark_as_read  # noqa: methods are not recorded
+            message.con, message.protocol, message.main_resource  # noqa: internals
+            message.to_api_data(), repr(message)  # noqa: the library reads other fields
+            message.web_link  # noqa
+            assert isinstance(message, Message)
+            assert pickle.loads(pickle.dumps(message)).subject == "s"
+        assert all(type(message) is Message for message in messages)  # left untouched
+        assert projection.learned
+        assert projection.fields == ["body", "is_read", "subject", "web_link"]
+        assert select_fields(Message, projection, protocol) == [
+            "id", "isDraft", "body", "isRead", "subject", "webLink"
+        ]
+
+
+class TestIdentityMap:
+    def test_lru_and_ttl(self, monkeypatch):
+        identity_map = IdentityMap(max_size=2, ttl=10)
+        identity_map.add("folder", "1", "one")
+        identity_map.add("folder", "2", "two")
+        assert identity_map.get("folder", "1") == "one"
+        identity_map.add("folder", "3", "three")  # drops the least recently used
+        assert identity_map.get("folder", "2") is None
+        assert identity_map.get("folder", "1") == "one"
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert identity_map.get("folder", "1") is None
+        assert len(identity_map) == 1
+
+    def test_get_or_fetch_and_invalidate(self):
+        identity_map = IdentityMap()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return object()
+
+        first = identity_map.get_or_fetch("plan", "1", fetch)
+        assert identity_map.get_or_fetch("plan", "1", fetch) is first
+        assert len(calls) == 1
+        identity_map.add("bucket", "1", "bucket")
+        identity_map.invalidate("plan", "1")
+        assert identity_map.get_or_fetch("plan", "1", fetch) is not first
+        identity_map.invalidate("plan")
+        assert identity_map.get("plan", "1") is None
+        assert identity_map.get("bucket", "1") == "bucket"
+        identity_map.clear()
+        assert len(identity_map) == 0